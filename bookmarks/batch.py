@@ -0,0 +1,115 @@
+"""
+Tambah/hapus banyak bookmark sekaligus dan cek status bookmark.
+
+Target ditulis sebagai {"app_label", "model", "id"} seperti di add_bookmark.
+id dinormalisasi ke bentuk string pk model (mis. UUID huruf kecil) sebelum
+disimpan atau dicari, supaya cocok dengan unique index
+(user, content_type, object_id). Saat menghapus, id mentah ikut dicocokkan
+(lihat stored_ids) untuk bookmark lama.
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Bookmark
+from .resolver import to_pk
+
+MAX_BATCH_SIZE = 200
+
+
+class InvalidTarget(ValueError):
+    pass
+
+
+def content_type_of(app_label, model_name):
+    try:
+        # get_by_natural_key memakai cache ContentType
+        content_type = ContentType.objects.get_by_natural_key(app_label, model_name)
+    except ContentType.DoesNotExist:
+        raise InvalidTarget(f'Invalid content type: {app_label}.{model_name}')
+    if content_type.model_class() is None:
+        raise InvalidTarget(f'Invalid content type: {app_label}.{model_name}')
+    return content_type
+
+
+def stored_ids(model, object_id):
+    """
+    Semua object_id yang bisa dipakai bookmark untuk target ini: bentuk pk
+    yang dinormalisasi dan id mentah dari client, untuk bookmark lama yang
+    disimpan sebelum normalisasi (mis. UUID huruf besar atau tanpa tanda -).
+    """
+    pk = to_pk(model, object_id)
+    return {str(object_id)} if pk is None else {str(pk), str(object_id)}
+
+
+def group_targets(items):
+    """
+    Kelompokkan target per ContentType: {content_type: {object_id: id asli}}.
+    object_id adalah string pk yang sudah dinormalisasi.
+    """
+    if not isinstance(items, list):
+        raise InvalidTarget('Targets must be a list')
+    if len(items) > MAX_BATCH_SIZE:
+        raise InvalidTarget(f'At most {MAX_BATCH_SIZE} targets per request')
+    groups = defaultdict(dict)
+    for item in items:
+        if not isinstance(item, dict) or not all(item.get(key) for key in ('app_label', 'model', 'id')):
+            raise InvalidTarget('Each target needs app_label, model and id')
+        content_type = content_type_of(item['app_label'], item['model'])
+        pk = to_pk(content_type.model_class(), item['id'])
+        if pk is None:
+            raise InvalidTarget(f'Invalid id: {item["id"]}')
+        groups[content_type][str(pk)] = item['id']
+    return groups
+
+
+def apply_batch(user, add=(), remove=()):
+    """
+    Satu transaksi: bookmark target di `add` yang ada (bulk_create, duplikat
+    diabaikan), lalu hapus semua target di `remove` dengan satu DELETE.
+    Mengembalikan (jumlah target add yang valid, jumlah terhapus, id add
+    yang targetnya tidak ada).
+    """
+    to_add = group_targets(list(add))
+    to_remove = group_targets(list(remove))
+
+    rows, missing = [], []
+    for content_type, ids in to_add.items():
+        model = content_type.model_class()
+        existing = {
+            str(pk) for pk in model._default_manager.filter(pk__in=list(ids)).values_list('pk', flat=True)
+        }
+        for object_id, original in ids.items():
+            if object_id in existing:
+                rows.append(Bookmark(user=user, content_type=content_type, object_id=object_id))
+            else:
+                missing.append(original)
+
+    condition = Q()
+    for content_type, ids in to_remove.items():
+        model = content_type.model_class()
+        object_ids = set().union(*(stored_ids(model, original) for original in ids.values()))
+        condition |= Q(content_type=content_type, object_id__in=object_ids)
+
+    removed = 0
+    with transaction.atomic():
+        Bookmark.objects.bulk_create(rows, ignore_conflicts=True)
+        if to_remove:
+            removed, _ = Bookmark.objects.filter(condition, user=user).delete()
+    return len(rows), removed, missing
+
+
+def bookmarked_ids(user, app_label, model_name, ids):
+    """Subset `ids` (sesuai bentuk yang dikirim client) yang sudah di-bookmark `user`."""
+    content_type = content_type_of(app_label, model_name)
+    groups = group_targets([{'app_label': app_label, 'model': model_name, 'id': value} for value in ids])
+    wanted = groups.get(content_type, {})
+    if not wanted:
+        return []
+    found = set(
+        Bookmark.objects.filter(user=user, content_type=content_type, object_id__in=list(wanted))
+        .values_list('object_id', flat=True)
+    )
+    return [original for object_id, original in wanted.items() if object_id in found]
@@ -0,0 +1,125 @@
+"""
+Kartu bookmark per tipe konten.
+
+Setiap tipe yang bisa di-bookmark didaftarkan di CARD_TYPES dengan
+queryset dasarnya (select_related/only) dan fungsi serializer kartu.
+bookmark_cards() memuat semua target satu halaman lewat resolve_bookmarks,
+jadi payload lengkap (judul, thumbnail, rating, tanggal, ...) didapat
+dengan satu query per tipe, tanpa request lanjutan dari client.
+"""
+from typing import Callable, NamedTuple
+
+from django.contrib.contenttypes.models import ContentType
+
+from events.models import Event
+from resources.models import Resource
+from sportswear.models import SportswearBrand
+from studio.models import Studio
+from timeline.models import Post
+
+from .resolver import resolve_bookmarks
+
+POST_SNIPPET_LENGTH = 140
+
+
+class CardType(NamedTuple):
+    name: str
+    model: type
+    queryset: Callable
+    serialize: Callable
+
+
+def _studio(studio):
+    return {
+        'title': studio.nama_studio,
+        'thumbnail': studio.thumbnail or '',
+        'subtitle': f'{studio.area}, {studio.kota}',
+        'rating': studio.rating,
+        'link': studio.gmaps_link or '',
+    }
+
+
+def _event(event):
+    return {
+        'title': event.name,
+        'thumbnail': event.poster or '',
+        'subtitle': event.location.nama_studio if event.location else '',
+        'date': event.date.isoformat(),
+    }
+
+
+def _resource(resource):
+    return {
+        'title': resource.title,
+        'thumbnail': resource.thumbnail_url or '',
+        'subtitle': resource.get_level_display(),
+        'link': resource.youtube_url,
+    }
+
+
+def _brand(brand):
+    return {
+        'title': brand.brand_name,
+        'thumbnail': brand.thumbnail_url or '',
+        'subtitle': brand.category_tag,
+        'rating': float(brand.average_rating),
+        'rating_count': brand.rating_count,
+        'link': brand.link,
+    }
+
+
+def _post(post):
+    return {
+        'title': post.text[:POST_SNIPPET_LENGTH],
+        'thumbnail': post.image.url if post.image else '',
+        'subtitle': post.author.username,
+        'date': post.created_at.isoformat(),
+        'like_count': post.like_count,
+        'comment_count': post.comment_count,
+    }
+
+
+CARD_TYPES = [
+    CardType('studio', Studio, lambda: Studio.objects.only(
+        'nama_studio', 'thumbnail', 'area', 'kota', 'rating', 'gmaps_link',
+    ), _studio),
+    CardType('event', Event, lambda: Event.objects.select_related('location').only(
+        'name', 'poster', 'date', 'location__nama_studio',
+    ), _event),
+    CardType('resource', Resource, lambda: Resource.objects.only(
+        'title', 'thumbnail_url', 'level', 'youtube_url',
+    ), _resource),
+    CardType('sportswearbrand', SportswearBrand, lambda: SportswearBrand.objects.only(
+        'brand_name', 'thumbnail_url', 'category_tag', 'average_rating', 'rating_count', 'link',
+    ), _brand),
+    CardType('post', Post, lambda: Post.objects.select_related('author').only(
+        'text', 'image', 'created_at', 'like_count', 'comment_count', 'author__username',
+    ), _post),
+]
+BY_NAME = {kind.name: kind for kind in CARD_TYPES}
+BY_MODEL = {kind.model: kind for kind in CARD_TYPES}
+
+
+def content_type_for(name):
+    """ContentType untuk nilai `type=`, atau None jika tipe tidak dikenal."""
+    kind = BY_NAME.get(name)
+    return ContentType.objects.get_for_model(kind.model) if kind else None
+
+
+def bookmark_cards(bookmarks):
+    """Payload bookmark beserta kartu targetnya; bookmark yang menggantung dibuang."""
+    querysets = {kind.model: kind.queryset() for kind in CARD_TYPES}
+    data = []
+    for bookmark in resolve_bookmarks(bookmarks, querysets):
+        target = bookmark.content_object
+        kind = BY_MODEL.get(type(target)._meta.concrete_model)
+        card = kind.serialize(target) if kind else {'title': str(target)}
+        data.append({
+            'id': bookmark.id,
+            'content_type': bookmark.content_type.model,
+            'object_id': bookmark.object_id,
+            'created_at': bookmark.created_at.isoformat(),
+            'title': card['title'],
+            'card': card,
+        })
+    return data
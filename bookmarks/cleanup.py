@@ -0,0 +1,50 @@
+"""
+Membersihkan bookmark yang targetnya sudah tidak ada.
+
+Model yang bisa di-bookmark (Studio, Event, Resource, SportswearBrand, Post)
+punya GenericRelation `bookmarks`, sehingga collector Django menghapus
+bookmark-nya dengan satu DELETE per batch setiap kali object dihapus,
+termasuk lewat QuerySet.delete() dan cascade.
+
+Yang lolos (raw SQL, data lama, object_id dengan format lain) dibersihkan
+compact(): per content type satu DELETE ... WHERE NOT EXISTS (anti-join)
+ke tabel target, bukan cek per baris.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import CharField, Exists, OuterRef, Value
+from django.db.models.functions import Cast, Lower, Replace
+
+from .models import Bookmark
+
+
+def _key(expression):
+    # Bentuk pembanding yang sama untuk pk int dan UUID: SQLite menyimpan
+    # UUID sebagai hex tanpa '-', Postgres sebagai uuid yang di-cast ke text
+    return Replace(Lower(Cast(expression, CharField())), Value('-'), Value(''))
+
+
+def orphans(content_type):
+    """Bookmark `content_type` yang targetnya tidak ada."""
+    bookmarks = Bookmark.objects.filter(content_type=content_type)
+    model = content_type.model_class()
+    if model is None:
+        # Model sudah dihapus dari kode
+        return bookmarks
+    targets = model._base_manager.annotate(bookmark_key=_key('pk')).filter(
+        bookmark_key=_key(OuterRef('object_id'))
+    )
+    return bookmarks.filter(~Exists(targets))
+
+
+def compact(dry_run=False):
+    """Hapus (atau hitung saja) orphan per content type; mengembalikan {label: jumlah}."""
+    counts = {}
+    content_type_ids = Bookmark.objects.order_by().values_list('content_type_id', flat=True).distinct()
+    for content_type in ContentType.objects.filter(pk__in=list(content_type_ids)):
+        label = f'{content_type.app_label}.{content_type.model}'
+        queryset = orphans(content_type)
+        if dry_run:
+            counts[label] = queryset.count()
+            continue
+        counts[label], _ = queryset.delete()
+    return counts
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from bookmarks.cleanup import compact
+
+class Command(BaseCommand):
+    help = 'Delete bookmarks whose target object no longer exists, one anti-join per content type'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count orphaned bookmarks')
+
+    def handle(self, *args, **options):
+        counts = compact(dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        for label, count in sorted(counts.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'{verb} {sum(counts.values())} orphaned bookmarks'))
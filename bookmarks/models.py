@@ -13,6 +13,11 @@ class Bookmark(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ('user', 'content_type', 'object_id')
+        indexes = [
+            # Halaman bookmark (cursor created_at, id), semua tipe atau per ?type=
+            models.Index(fields=['user', '-created_at', '-id'], name='bookmarks_user_time_idx'),
+            models.Index(fields=['user', 'content_type', '-created_at', '-id'], name='bookmarks_user_type_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} bookmarked {self.content_object}"
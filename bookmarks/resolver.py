@@ -0,0 +1,65 @@
+"""
+Resolve content_object banyak bookmark sekaligus.
+
+Bookmark dikelompokkan per content_type, lalu object setiap model diambil
+dengan satu in_bulk. object_id (CharField) dikonversi ke tipe pk model
+(UUID untuk Studio, int untuk yang lain) sebelum query. Bookmark yang
+targetnya sudah terhapus, atau object_id-nya tidak valid untuk model itu,
+dibuang di langkah yang sama.
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+
+from .models import Bookmark
+
+_content_object = Bookmark._meta.get_field('content_object')
+
+
+def to_pk(model, object_id):
+    """object_id sebagai tipe pk `model`, atau None jika tidak valid."""
+    try:
+        return model._meta.pk.to_python(object_id)
+    except (TypeError, ValueError, ValidationError):
+        return None
+
+
+def resolve_bookmarks(bookmarks, querysets=None):
+    """
+    Kembalikan list bookmark yang targetnya masih ada, urutan dipertahankan.
+    `bookmark.content_object` dan `bookmark.content_type` sudah terisi
+    sehingga tidak memicu query lagi.
+
+    `querysets` (opsional) memetakan model ke queryset dasar, mis. untuk
+    select_related/only per tipe.
+    """
+    querysets = querysets or {}
+    bookmarks = list(bookmarks)
+    groups = defaultdict(list)
+    for bookmark in bookmarks:
+        groups[bookmark.content_type_id].append(bookmark)
+
+    found = {}
+    for content_type_id, group in groups.items():
+        # get_for_id memakai cache ContentType, bukan query per bookmark
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        model = content_type.model_class()
+        if model is None:
+            continue
+        keys = {}
+        for bookmark in group:
+            pk = to_pk(model, bookmark.object_id)
+            if pk is not None:
+                keys[bookmark.pk] = pk
+        queryset = querysets.get(model, model._default_manager.all())
+        objects = queryset.in_bulk(set(keys.values())) if keys else {}
+        for bookmark in group:
+            target = objects.get(keys.get(bookmark.pk))
+            if target is None:
+                continue
+            bookmark.content_type = content_type
+            _content_object.set_cached_value(bookmark, target)
+            found[bookmark.pk] = bookmark
+
+    return [bookmark for bookmark in bookmarks if bookmark.pk in found]
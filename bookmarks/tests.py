@@ -1,3 +1,254 @@
+import datetime
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from events.models import Event
+from resources.models import Resource
+from sportswear.models import SportswearBrand
+from studio.models import Studio
+from timeline.models import Post
+from .cleanup import compact
+from .models import Bookmark
+from .resolver import resolve_bookmarks
+
+
+def bookmark(user, obj):
+    return Bookmark.objects.create(
+        user=user, content_type=ContentType.objects.get_for_model(obj), object_id=str(obj.pk)
+    )
+
+
+class BookmarkResolverTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='saver', password='password123')
+        self.studios = [
+            Studio.objects.create(
+                nama_studio=f'Studio {i}', kota='Jakarta', area='Selatan', alamat='Jl. A',
+                nomor_telepon='0812', rating=4.5,
+            )
+            for i in range(3)
+        ]
+        self.events = [
+            Event.objects.create(name=f'Event {i}', description='Desc', date=datetime.date(2026, 1, 1))
+            for i in range(3)
+        ]
+        self.resource = Resource.objects.create(title='Resource', thumbnail_url='http://r.com/t.jpg')
+        for obj in [*self.studios, *self.events, self.resource]:
+            bookmark(self.user, obj)
+
+    def test_one_query_per_content_type(self):
+        ContentType.objects.clear_cache()
+        ContentType.objects.get_for_models(Studio, Event, Resource)
+        with self.assertNumQueries(4):
+            resolved = resolve_bookmarks(Bookmark.objects.filter(user=self.user))
+            titles = {str(b.content_object) for b in resolved}
+            models = {b.content_type.model for b in resolved}
+        self.assertEqual(len(resolved), 7)
+        self.assertIn('Studio 0', titles)
+        self.assertEqual(models, {'studio', 'event', 'resource'})
+
+    def test_drops_dangling_and_invalid_ids(self):
+        self.studios[0].delete()
+        self.events[0].delete()
+        Bookmark.objects.create(
+            user=self.user, content_type=ContentType.objects.get_for_model(Studio), object_id='not-a-uuid',
+        )
+        Bookmark.objects.create(
+            user=self.user, content_type=ContentType.objects.get_for_model(Event), object_id='abc',
+        )
+        resolved = resolve_bookmarks(Bookmark.objects.filter(user=self.user))
+        self.assertEqual(len(resolved), 5)
+        self.assertNotIn('Studio 0', {str(b.content_object) for b in resolved})
+
+    def test_get_bookmarks_view(self):
+        self.client.force_login(self.user)
+        self.studios[1].delete()
+        response = self.client.get(reverse('get_bookmarks'))
+        data = response.json()['bookmarks']
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[0]['title'], 'Resource')
+        self.assertEqual({item['content_type'] for item in data}, {'studio', 'event', 'resource'})
+
+
+class BookmarkCardsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='saver', password='password123')
+        self.client.force_login(self.user)
+        studio = Studio.objects.create(
+            nama_studio='Studio Satu', kota='Bandung', area='Dago', alamat='Jl. B',
+            nomor_telepon='0812', rating=4.8,
+        )
+        event = Event.objects.create(
+            name='Morning Flow', description='Desc', date=datetime.date(2026, 3, 1), location=studio, owner=self.user,
+        )
+        brand = SportswearBrand.objects.create(brand_name='Flowwear', description='Desc', link='http://f.com')
+        post = Post.objects.create(author=self.user, text='Hello timeline')
+        resource = Resource.objects.create(title='Stretching', thumbnail_url='http://r.com/t.jpg', level='advanced')
+        for obj in (studio, event, brand, post, resource):
+            bookmark(self.user, obj)
+
+    def test_cards_per_type_in_one_request(self):
+        ContentType.objects.get_for_models(Studio, Event, Resource, SportswearBrand, Post)
+        # bookmark + satu query per tipe (+ session/user)
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('get_bookmarks'))
+        cards = {item['content_type']: item['card'] for item in response.json()['bookmarks']}
+        self.assertEqual(cards['studio']['subtitle'], 'Dago, Bandung')
+        self.assertEqual(cards['studio']['rating'], 4.8)
+        self.assertEqual(cards['event']['subtitle'], 'Studio Satu')
+        self.assertEqual(cards['event']['date'], '2026-03-01')
+        self.assertEqual(cards['resource']['subtitle'], 'Advanced')
+        self.assertEqual(cards['sportswearbrand']['title'], 'Flowwear')
+        self.assertEqual(cards['post']['subtitle'], 'saver')
+
+    def test_type_filter_and_cursor_pages(self):
+        response = self.client.get(reverse('get_bookmarks'), {'type': 'event'})
+        self.assertEqual([item['title'] for item in response.json()['bookmarks']], ['Morning Flow'])
+        response = self.client.get(reverse('get_bookmarks'), {'type': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+        titles, next_url = [], '?limit=2'
+        while next_url is not None:
+            data = self.client.get(reverse('get_bookmarks') + next_url).json()
+            titles += [item['title'] for item in data['bookmarks']]
+            next_url = data['next']
+        self.assertEqual(titles, ['Stretching', 'Hello timeline', 'Flowwear', 'Morning Flow', 'Studio Satu'])
+        response = self.client.get(reverse('get_bookmarks'), {'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BookmarkBatchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='saver', password='password123')
+        self.client.force_login(self.user)
+        self.studios = [
+            Studio.objects.create(
+                nama_studio=f'Studio {i}', kota='Jakarta', area='Selatan', alamat='Jl. A',
+                nomor_telepon='0812', rating=4.5,
+            )
+            for i in range(4)
+        ]
+        self.event = Event.objects.create(name='Event', description='Desc', date=datetime.date(2026, 1, 1))
+
+    def target(self, obj, **overrides):
+        meta = obj._meta
+        return {'app_label': meta.app_label, 'model': meta.model_name, 'id': str(obj.pk), **overrides}
+
+    def batch(self, **body):
+        return self.client.post(reverse('batch_bookmarks'), json.dumps(body), content_type='application/json')
+
+    def test_batch_add_and_remove(self):
+        bookmark(self.user, self.studios[3])
+        missing_id = '00000000-0000-0000-0000-000000000000'
+        response = self.batch(
+            add=[self.target(s) for s in self.studios[:3]] + [self.target(self.event), self.target(self.studios[0])]
+            + [self.target(self.studios[0], id=missing_id)],
+            remove=[self.target(self.studios[3])],
+        )
+        data = response.json()
+        self.assertEqual((data['added'], data['removed'], data['missing']), (4, 1, [missing_id]))
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 4)
+
+        # Duplikat diabaikan, tidak error
+        response = self.batch(add=[self.target(self.studios[0])])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 4)
+
+    def test_invalid_batch_changes_nothing(self):
+        response = self.batch(add=[self.target(self.studios[0]), {'app_label': 'nope', 'model': 'x', 'id': '1'}])
+        self.assertEqual(response.status_code, 400)
+        response = self.batch(add=[self.target(self.event, id='abc')])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_remove_by_object_accepts_non_canonical_ids(self):
+        post = lambda name, body: self.client.post(reverse(name), json.dumps(body), content_type='application/json')
+        studio_id = str(self.studios[0].pk).upper()
+        post('add_bookmark', self.target(self.studios[0], id=studio_id))
+        post('add_bookmark', self.target(self.event, id=f'0{self.event.pk}'))
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 2)
+
+        response = post('remove_bookmark_by_object', self.target(self.studios[0], id=studio_id))
+        self.assertEqual(response.status_code, 200)
+        response = post('remove_bookmark_by_object', self.target(self.event, id=f'0{self.event.pk}'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Bookmark.objects.exists())
+        response = post('remove_bookmark_by_object', self.target(self.event))
+        self.assertEqual(response.status_code, 404)
+
+    def test_batch_remove_matches_legacy_raw_ids(self):
+        # Bookmark lama yang disimpan dengan id mentah, sebelum normalisasi
+        raw_id = str(self.studios[0].pk).upper()
+        Bookmark.objects.create(
+            user=self.user, content_type=ContentType.objects.get_for_model(Studio), object_id=raw_id,
+        )
+        bookmark(self.user, self.studios[1])
+        response = self.batch(remove=[self.target(self.studios[0], id=raw_id), self.target(self.studios[1])])
+        self.assertEqual(response.json()['removed'], 2)
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_status_returns_bookmarked_subset(self):
+        bookmark(self.user, self.studios[1])
+        bookmark(self.user, self.studios[2])
+        ids = [str(s.pk) for s in self.studios]
+        ids[2] = ids[2].upper()
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('bookmark_status'), {'app_label': 'studio', 'model': 'studio', 'ids': ','.join(ids)},
+            )
+        self.assertEqual(response.json()['bookmarked'], [ids[1], ids[2]])
+        response = self.client.get(reverse('bookmark_status'), {'app_label': 'studio', 'model': 'studio', 'ids': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BookmarkCleanupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='saver', password='password123')
+        self.studio = Studio.objects.create(
+            nama_studio='Studio', kota='Jakarta', area='Selatan', alamat='Jl. A', nomor_telepon='0812', rating=4.5,
+        )
+        self.event = Event.objects.create(name='Event', description='Desc', date=datetime.date(2026, 1, 1))
+        self.brand = SportswearBrand.objects.create(brand_name='Brand', description='Desc', link='http://b.com')
+        self.resource = Resource.objects.create(title='Resource', thumbnail_url='http://r.com/t.jpg')
+        author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(author=author, text='Hi')
+        for obj in (self.studio, self.event, self.brand, self.resource, self.post):
+            bookmark(self.user, obj)
+
+    def test_deleting_targets_removes_bookmarks(self):
+        self.studio.delete()
+        Event.objects.all().delete()
+        self.brand.delete()
+        self.resource.delete()
+        # Cascade dari user ke post
+        User.objects.get(username='author').delete()
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_compaction_removes_only_orphans(self):
+        studio_type = ContentType.objects.get_for_model(Studio)
+        event_type = ContentType.objects.get_for_model(Event)
+        Bookmark.objects.filter(content_type=studio_type).update(object_id=str(self.studio.pk).upper())
+        gone = ContentType.objects.create(app_label='gone', model='removed')
+        orphans = [
+            Bookmark(user=self.user, content_type=studio_type, object_id='00000000-0000-0000-0000-000000000000'),
+            Bookmark(user=self.user, content_type=studio_type, object_id='not-a-uuid'),
+            Bookmark(user=self.user, content_type=event_type, object_id=str(self.event.pk + 100)),
+            Bookmark(user=self.user, content_type=event_type, object_id='abc'),
+            Bookmark(user=self.user, content_type=gone, object_id='1'),
+        ]
+        Bookmark.objects.bulk_create(orphans)
 
-# Create your tests here.
+        self.assertEqual(compact(dry_run=True), {
+            'studio.studio': 2, 'events.event': 2, 'gone.removed': 1,
+            'sportswear.sportswearbrand': 0, 'resources.resource': 0, 'timeline.post': 0,
+        })
+        self.assertEqual(Bookmark.objects.count(), 10)
+        call_command('compact_bookmarks', stdout=io.StringIO())
+        self.assertEqual(Bookmark.objects.count(), 5)
+        self.assertEqual(sum(compact().values()), 0)
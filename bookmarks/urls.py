@@ -6,4 +6,6 @@ urlpatterns = [
     path('add/', views.add_bookmark, name='add_bookmark'),
     path('remove/<int:bookmark_id>/', views.remove_bookmark, name='remove_bookmark_by_id'),
     path('remove/', views.remove_bookmark, name='remove_bookmark_by_object'),
+    path('batch/', views.batch_bookmarks, name='batch_bookmarks'),
+    path('status/', views.bookmark_status, name='bookmark_status'),
 ]
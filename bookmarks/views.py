@@ -2,36 +2,45 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
+from timeline.feed import InvalidCursor, next_query, paginate, parse_limit
 from .models import Bookmark
+from .batch import InvalidTarget, apply_batch, bookmarked_ids, content_type_of, stored_ids
+from .cards import bookmark_cards, content_type_for
+from .resolver import to_pk
 import json
 
+BOOKMARK_PAGE_SIZE = 20
+
 @csrf_exempt
 @login_required(login_url='/users/login/')
 @require_http_methods(["GET"])
 def get_bookmarks(request):
+    """
+    Bookmark user terbaru dulu, per halaman (?cursor=&limit=), opsional
+    difilter ?type=studio|event|resource|sportswearbrand|post. Setiap item
+    membawa kartu targetnya.
+    """
     bookmarks = Bookmark.objects.filter(user=request.user)
-    data = []
-    
-    for bookmark in bookmarks:
-        # Prevent errors if referenced object is deleted
-        if bookmark.content_object:
-            item = {
-                'id': bookmark.id,
-                'content_type': bookmark.content_type.model,
-                'object_id': bookmark.object_id,
-                'created_at': bookmark.created_at.isoformat(),
-            }
 
-            try:
-                item['title'] = str(bookmark.content_object)
-            except:
-                item['title'] = "Unknown Object"
-                
-            data.append(item)
-            
-    return JsonResponse({'status': 'success', 'bookmarks': data})
+    kind = request.GET.get('type')
+    if kind:
+        content_type = content_type_for(kind)
+        if content_type is None:
+            return JsonResponse({'status': 'error', 'message': 'Unknown type'}, status=400)
+        bookmarks = bookmarks.filter(content_type=content_type)
+
+    limit = parse_limit(request.GET.get('limit'), BOOKMARK_PAGE_SIZE)
+    try:
+        page = paginate(bookmarks, request.GET.get('cursor'), limit)
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+
+    return JsonResponse({
+        'status': 'success',
+        'bookmarks': bookmark_cards(page.items),
+        'next': next_query(page, limit, type=kind),
+    })
 
 @csrf_exempt
 @login_required(login_url='/users/login/')
@@ -47,19 +56,21 @@ def add_bookmark(request):
             return JsonResponse({'status': 'error', 'message': 'Missing required fields'}, status=400)
 
         try:
-            content_type = ContentType.objects.get(app_label=app_label, model=model_name)
-        except ContentType.DoesNotExist:
+            content_type = content_type_of(app_label, model_name)
+        except InvalidTarget:
             return JsonResponse({'status': 'error', 'message': 'Invalid content type'}, status=400)
 
         # Check if object exists
         model_class = content_type.model_class()
-        if not model_class.objects.filter(pk=object_id).exists():
+        pk = to_pk(model_class, object_id)
+        if pk is None or not model_class.objects.filter(pk=pk).exists():
              return JsonResponse({'status': 'error', 'message': 'Object not found'}, status=404)
 
+        # object_id disimpan dalam bentuk normal supaya cocok dengan bookmark_status
         bookmark, created = Bookmark.objects.get_or_create(
             user=request.user,
             content_type=content_type,
-            object_id=str(object_id)
+            object_id=str(pk)
         )
 
         if created:
@@ -94,18 +105,61 @@ def remove_bookmark(request, bookmark_id=None):
         
         if all([app_label, model_name, object_id]):
             try:
-                content_type = ContentType.objects.get(app_label=app_label, model=model_name)
-                bookmark = Bookmark.objects.get(
-                    user=request.user,
-                    content_type=content_type,
-                    object_id=str(object_id)
-                )
-                bookmark.delete()
-                return JsonResponse({'status': 'success', 'message': 'Bookmark removed'})
-            except (ContentType.DoesNotExist, Bookmark.DoesNotExist):
+                content_type = content_type_of(app_label, model_name)
+            except InvalidTarget:
+                return JsonResponse({'status': 'error', 'message': 'Bookmark or Type not found'}, status=404)
+            deleted, _ = Bookmark.objects.filter(
+                user=request.user,
+                content_type=content_type,
+                object_id__in=stored_ids(content_type.model_class(), object_id),
+            ).delete()
+            if not deleted:
                 return JsonResponse({'status': 'error', 'message': 'Bookmark or Type not found'}, status=404)
+            return JsonResponse({'status': 'success', 'message': 'Bookmark removed'})
     except:
         pass
 
     return JsonResponse({'status': 'error', 'message': 'Invalid request'}, status=400)
 
+@csrf_exempt
+@login_required(login_url='/users/login/')
+@require_http_methods(["POST"])
+def batch_bookmarks(request):
+    """
+    Tambah/hapus banyak bookmark dalam satu transaksi.
+    Body: {"add": [{"app_label", "model", "id"}, ...], "remove": [...]}
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    try:
+        added, removed, missing = apply_batch(request.user, data.get('add', []), data.get('remove', []))
+    except InvalidTarget as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    return JsonResponse({'status': 'success', 'added': added, 'removed': removed, 'missing': missing})
+
+@csrf_exempt
+@login_required(login_url='/users/login/')
+@require_http_methods(["GET"])
+def bookmark_status(request):
+    """
+    Subset id yang sudah di-bookmark, mis.
+    ?app_label=studio&model=studio&ids=<id>,<id>,...
+    """
+    app_label = request.GET.get('app_label')
+    model_name = request.GET.get('model')
+    ids = [value for value in request.GET.get('ids', '').split(',') if value.strip()]
+    if not (app_label and model_name):
+        return JsonResponse({'status': 'error', 'message': 'Missing required fields'}, status=400)
+
+    try:
+        bookmarked = bookmarked_ids(request.user, app_label, model_name, ids)
+    except InvalidTarget as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    return JsonResponse({'status': 'success', 'bookmarked': bookmarked})
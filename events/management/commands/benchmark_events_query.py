@@ -0,0 +1,94 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from events.models import Event
+from events.queries import event_queryset, paginate_events, serialize_event
+from souline.benchmark import BenchmarkCommand
+from studio.models import KOTA_CHOICES, Studio
+
+
+def legacy_events_json(ref_date, kota):
+    # Path lama events_json: iexact ke kota, owner tidak di-join
+    qs = Event.objects.select_related('location').all().order_by('date')
+    qs = qs.filter(date__gte=ref_date, date__lte=ref_date + timedelta(days=7))
+    qs = qs.filter(location__kota__iexact=kota)
+    return [
+        {'location': e.location.nama_studio if e.location else '', 'owner': e.owner.username if e.owner else ''}
+        for e in qs
+    ]
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare events_json queries (old iexact path vs indexed query layer), on synthetic data that is rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100000)
+        parser.add_argument('--studios', type=int, default=10, help='Studios per city')
+        parser.add_argument('--owners', type=int, default=500)
+        parser.add_argument('--days', type=int, default=730, help='Spread events over this many days')
+        parser.add_argument('--reads', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=20)
+
+    def timed(self, label, reads, fn):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(reads):
+                rows = fn()
+            elapsed = (time.perf_counter() - start) / reads * 1000
+        self.stdout.write(f'{label:<36} {elapsed:8.2f} ms {len(queries) // reads:6d} queries {len(rows):6d} rows')
+        return elapsed
+
+    def run(self, options):
+        rng = random.Random(42)
+        cities = [kota for kota, _ in KOTA_CHOICES]
+
+        start = time.perf_counter()
+        owners = User.objects.bulk_create(
+            [User(username=f'{self.prefix}_{i}', password='!') for i in range(options['owners'])], batch_size=500
+        )
+        studios = Studio.objects.bulk_create([
+            Studio(
+                nama_studio=f'{self.prefix}_{kota} {i}', kota=kota, area='Area', alamat='Jl.',
+                nomor_telepon='0', rating=4.5,
+            )
+            for kota in cities
+            for i in range(options['studios'])
+        ])
+        first_day = date.today() - timedelta(days=options['days'] // 2)
+        Event.objects.bulk_create(
+            [
+                Event(
+                    name=f'Event {i}', description='Benchmark',
+                    date=first_day + timedelta(days=rng.randrange(options['days'])),
+                    location=rng.choice(studios), owner=rng.choice(owners),
+                )
+                for i in range(options['events'])
+            ],
+            batch_size=2000,
+        )
+        self.stdout.write(
+            f'Seeded {options["events"]} events, {len(studios)} studios in {len(cities)} cities '
+            f'in {time.perf_counter() - start:.1f}s'
+        )
+
+        reads = options['reads']
+        limit = options['limit']
+        today = date.today()
+        kota = rng.choice(cities)
+
+        legacy_ms = self.timed('legacy soon + kota (iexact, N+1)', reads, lambda: legacy_events_json(today, kota.upper()))
+        soon_ms = self.timed('indexed soon + kota (all rows)', reads, lambda: [
+            serialize_event(e) for e in event_queryset(today, 'soon', kota.upper())
+        ])
+        self.timed(f'indexed upcoming + kota, page of {limit}', reads, lambda: [
+            serialize_event(e) for e in paginate_events(event_queryset(today, '', kota), None, limit)
+        ])
+        cursor = paginate_events(event_queryset(today, '', kota), None, limit * 50).next_cursor
+        self.timed('indexed upcoming + kota, page 51', reads, lambda: [
+            serialize_event(e) for e in paginate_events(event_queryset(today, '', kota), cursor, limit)
+        ])
+        self.stdout.write(self.style.SUCCESS(f'soon + kota: {legacy_ms / soon_ms:.1f}x faster'))
@@ -1,5 +1,6 @@
 from django.conf import settings 
 from django.db import models
+from django.contrib.contenttypes.fields import GenericRelation
 from studio.models import Studio
 
 class Event(models.Model):
@@ -22,6 +23,14 @@ class Event(models.Model):
         blank=True,
         related_name='created_events'
     )
+    bookmarks = GenericRelation('bookmarks.Bookmark')
+
+    class Meta:
+        indexes = [
+            # Urutan (date, id) untuk keyset paging di events.queries
+            models.Index(fields=['date', 'id'], name='events_event_date_idx'),
+            models.Index(fields=['location', 'date', 'id'], name='events_event_location_date_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,66 @@
+"""
+Query event untuk events_json.
+
+Event diurutkan (date, id) naik dan di-page dengan keyset
+(timeline.feed.paginate, ascending=True): halaman berikutnya diambil dengan
+`WHERE (date, id) > cursor` pada index events_event_date_idx /
+events_event_location_date_idx, tanpa OFFSET.
+Filter kota dinormalisasi ke nilai KOTA_CHOICES lalu dicocokkan dengan
+`=` (bukan iexact/LIKE) sehingga index studio_kota_idx bisa dipakai.
+owner dan location ikut di-join supaya serialisasi tidak N+1.
+"""
+from datetime import timedelta
+
+from studio.models import KOTA_CHOICES
+from timeline.feed import paginate
+from .models import Event
+
+SOON_DAYS = 7
+EVENTS_PAGE_SIZE = 20
+EVENT_FIELDS = (
+    'name', 'date', 'description', 'poster',
+    'location__nama_studio', 'location__kota', 'owner__username',
+)
+KOTA_LOOKUP = {kota.lower(): kota for kota, _ in KOTA_CHOICES}
+
+
+def normalize_kota(value):
+    """Nilai kota kanonik (mis. ' jakarta ' -> 'Jakarta'), atau None jika tidak dikenal."""
+    return KOTA_LOOKUP.get(' '.join((value or '').split()).lower())
+
+
+def event_queryset(ref_date, filter_type='', kota=None):
+    events = Event.objects.select_related('location', 'owner').only(*EVENT_FIELDS)
+
+    soon_limit = ref_date + timedelta(days=SOON_DAYS)
+    if filter_type == 'soon':
+        events = events.filter(date__gte=ref_date, date__lte=soon_limit)
+    elif filter_type == 'later':
+        events = events.filter(date__gt=soon_limit)
+    else:
+        events = events.filter(date__gte=ref_date)
+
+    if kota:
+        canonical = normalize_kota(kota)
+        if canonical is None:
+            return events.none()
+        events = events.filter(location__kota=canonical)
+    return events.order_by('date', 'id')
+
+
+def paginate_events(events, cursor=None, limit=EVENTS_PAGE_SIZE):
+    return paginate(events, cursor, limit, time_field='date', ascending=True)
+
+
+def serialize_event(e):
+    return {
+        "id": str(e.id),
+        "name": e.name,
+        "date": e.date.isoformat(),
+        "description": e.description,
+        "poster": e.poster or "",
+        "location": e.location.nama_studio if e.location else "",
+        "location_id": str(e.location.id) if e.location else "",
+        "location_kota": e.location.kota if e.location else "",
+        "owner": e.owner.username if e.owner else "",
+    }
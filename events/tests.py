@@ -1,8 +1,12 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from datetime import datetime, date, timedelta
+from studio.models import Studio
 from .models import Event
+from .queries import normalize_kota
 
 class EventViewsTest(TestCase):
     def setUp(self):
@@ -78,4 +82,51 @@ class EventViewsTest(TestCase):
         self.assertTrue(all(
             datetime.strptime(d["date"], "%d %B %Y").date() > date.today() + timedelta(days=7)
             for d in data
-        ))
\ No newline at end of file
+        ))
+
+
+class EventsJsonQueryTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='organizer', password='password123')
+        self.jakarta = Studio.objects.create(
+            nama_studio='Studio Jakarta', kota='Jakarta', area='Selatan', alamat='Jl. A', nomor_telepon='0', rating=4.5,
+        )
+        self.bogor = Studio.objects.create(
+            nama_studio='Studio Bogor', kota='Bogor', area='Kota', alamat='Jl. B', nomor_telepon='0', rating=4.5,
+        )
+        self.ref = date(2026, 5, 1)
+        for i in range(6):
+            Event.objects.create(
+                name=f'Jakarta {i}', description='Desc', date=self.ref + timedelta(days=i),
+                location=self.jakarta, owner=self.owner,
+            )
+        Event.objects.create(name='Bogor', description='Desc', date=self.ref, location=self.bogor, owner=self.owner)
+        Event.objects.create(name='Past', description='Desc', date=self.ref - timedelta(days=1), location=self.jakarta)
+
+    def get(self, **params):
+        return self.client.get(reverse('events:events_json'), {'ref_date': self.ref.isoformat(), **params})
+
+    def test_normalize_kota(self):
+        self.assertEqual(normalize_kota('  jakarta '), 'Jakarta')
+        self.assertIsNone(normalize_kota('Surabaya'))
+
+    def test_kota_filter_is_normalized_and_joined(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(kota='JAKARTA').json()
+        self.assertEqual([e['name'] for e in data], [f'Jakarta {i}' for i in range(6)])
+        self.assertEqual(data[0]['owner'], 'organizer')
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('LIKE', queries[0]['sql'])
+        self.assertEqual(self.get(kota='Surabaya').json(), [])
+
+    def test_cursor_paging(self):
+        data = self.get(limit=4).json()
+        self.assertEqual([e['name'] for e in data['results']], ['Jakarta 0', 'Bogor', 'Jakarta 1', 'Jakarta 2'])
+        # Link berikutnya membawa filter yang sama
+        data = self.client.get(reverse('events:events_json') + data['next']).json()
+        self.assertEqual([e['name'] for e in data['results']], ['Jakarta 3', 'Jakarta 4', 'Jakarta 5'])
+        self.assertIsNone(data['next'])
+        data = self.get(kota='jakarta', limit=5).json()
+        data = self.client.get(reverse('events:events_json') + data['next']).json()
+        self.assertEqual([e['name'] for e in data['results']], ['Jakarta 5'])
+        self.assertEqual(self.get(cursor='!!').status_code, 400)
@@ -8,7 +8,9 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from .models import Event
 from .forms import EventForm
+from .queries import EVENTS_PAGE_SIZE, event_queryset, paginate_events, serialize_event
 from studio.models import Studio
+from timeline.feed import InvalidCursor, next_query, parse_limit
 
 
 def show_events(request):
@@ -22,6 +24,7 @@ def show_events(request):
         events = Event.objects.filter(date__gt=soon_limit)
     else:
         events = Event.objects.filter(date__gte=today)
+    events = events.select_related('location', 'owner')
 
     return render(
         request,
@@ -61,6 +64,9 @@ def events_json(request):
       - filter: '', 'soon', 'later'
       - kota: optional, e.g. 'Jakarta'
       - ref_date: optional, YYYY-MM-DD (user-selected date)
+      - limit, cursor: optional paging; jika diisi responsnya
+        {"results": [...], "next": "?cursor=...&limit=..."} (lihat
+        timeline.feed.next_query), tanpa keduanya list polos
     """
     filter_type = request.GET.get('filter', '').strip()
     kota = request.GET.get('kota', '').strip()
@@ -72,38 +78,23 @@ def events_json(request):
     except Exception:
         ref_date = timezone.now().date()
 
-    soon_limit = ref_date + timedelta(days=7)
+    qs = event_queryset(ref_date, filter_type, kota)
 
-    qs = Event.objects.select_related('location').all().order_by('date')
+    # Tanpa limit/cursor semua event dikembalikan seperti sebelumnya
+    cursor = request.GET.get('cursor')
+    if not (cursor or request.GET.get('limit')):
+        return JsonResponse([serialize_event(e) for e in qs], safe=False)
 
-    # filter berdasarkan tanggal
-    if filter_type == 'soon':
-        qs = qs.filter(date__gte=ref_date, date__lte=soon_limit)
-    elif filter_type == 'later':
-        qs = qs.filter(date__gt=soon_limit)
-    else:
-        qs = qs.filter(date__gte=ref_date)
-
-    # filter berdasarkan kota
-    if kota:
-        qs = qs.filter(location__kota__iexact=kota)
-
-    # serialize data ke JSON
-    data = []
-    for e in qs:
-        data.append({
-            "id": str(e.id),
-            "name": e.name,
-            "date": e.date.isoformat(),
-            "description": e.description,
-            "poster": e.poster or "",
-            "location": e.location.nama_studio if e.location else "",
-            "location_id": str(e.location.id) if e.location else "",
-            "location_kota": e.location.kota if e.location else "",
-            "owner": e.owner.username if e.owner else "",
-        })
-
-    return JsonResponse(data, safe=False)
+    limit = parse_limit(request.GET.get('limit'), EVENTS_PAGE_SIZE)
+    try:
+        page = paginate_events(qs, cursor, limit)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    return JsonResponse({
+        'results': [serialize_event(e) for e in page],
+        'next': next_query(page, limit, filter=filter_type, kota=kota, ref_date=ref_date_str),
+    })
 
 @login_required(login_url='/users/login/')
 def edit_event(request, id):
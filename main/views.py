@@ -39,7 +39,7 @@ def show_main(request):
     posts = (
         Post.objects
         .select_related('author')
-        .prefetch_related('likes', 'comments__author')
+        .prefetch_related('comments__author')
         .order_by('-created_at')[:2]
     )
     post_form = PostForm()
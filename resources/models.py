@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.contenttypes.fields import GenericRelation
 
 class Resource(models.Model):
     DIFFICULTY_CHOICES = [
@@ -17,6 +18,7 @@ class Resource(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     thumbnail_url = models.URLField(blank=True, null=True)
+    bookmarks = GenericRelation('bookmarks.Bookmark')
 
     def save(self, *args, **kwargs):
         # Generate thumbnail otomatis dari link YouTube
@@ -0,0 +1,30 @@
+"""
+Basis untuk command benchmark_*.
+
+Data sintetis dibuat di dalam satu transaksi yang selalu di-rollback,
+jadi benchmark bisa dijalankan di database development tanpa meninggalkan
+sisa. Subclass cukup mengisi run(options); `self.prefix` unik per run dan
+dipakai untuk menamai objek seed.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class _Rollback(Exception):
+    pass
+
+
+class BenchmarkCommand(BaseCommand):
+    def handle(self, *args, **options):
+        self.prefix = f'bench{int(time.time())}'
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def run(self, options):
+        raise NotImplementedError
@@ -132,6 +132,27 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+if PRODUCTION:
+    # Production: file-based supaya versi cache dipakai bersama oleh semua worker gunicorn
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / '.django_cache')),
+        }
+    }
+else:
+    # Development: cache di memori proses
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'souline',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -181,3 +202,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Image proxy studio (studio.image_proxy)
+IMAGE_PROXY_CACHE_DIR = MEDIA_ROOT / 'image_proxy'
+IMAGE_PROXY_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_PROXY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+IMAGE_PROXY_MAX_AGE = 60 * 60 * 24
+
+# Cache lookup Google Places untuk command import_studios
+PLACES_CACHE_PATH = BASE_DIR / '.places_cache.sqlite3'
+PLACES_CACHE_TTL_DAYS = 30
+
+# Sumber fan-out home feed (timeline.fanout), dipisah koma di env. 'kota' =
+# user di kota yang sama dengan penulis; 'resource'/'sportswear' = user yang
+# mem-bookmark resource/brand yang dilampirkan di post. Kosong (default) =
+# fan-out mati dan home feed dibaca langsung dari tabel Post.
+TIMELINE_FEED_SOURCES = tuple(s for s in os.getenv('TIMELINE_FEED_SOURCES', '').split(',') if s)
+# Fan-out home feed di luar request. Mode: 'thread' (thread pool di proses
+# web), 'queue' (perlu proses `manage.py process_fanout_queue --watch`), 'sync'.
+TIMELINE_FANOUT_MODE = os.getenv('TIMELINE_FANOUT_MODE', 'thread')
+TIMELINE_FANOUT_WORKERS = 1
+
+# Antrian ingestion gambar timeline (timeline.ingest). Mode: 'thread' (thread
+# pool di proses web, job yang tertinggal di-sweep ulang), 'queue' (perlu
+# proses `manage.py process_image_queue --watch` terpisah), 'sync'.
+TIMELINE_INGEST_DIR = BASE_DIR / '.timeline_ingest'
+TIMELINE_INGEST_MODE = os.getenv('TIMELINE_INGEST_MODE', 'thread')
+TIMELINE_INGEST_WORKERS = 2
+TIMELINE_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+TIMELINE_IMAGE_MAX_DIMENSION = 1600
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from sportswear.search import ensure_sqlite_index
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and 'sportswear_sportswearbrand' in connection.introspection.table_names():
+        ensure_sqlite_index(connection)
 
 
 class SportswearConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sportswear'
+
+    def ready(self):
+        from sportswear import signals  # noqa: F401
+
+        post_migrate.connect(ensure_search_index, sender=self)
@@ -11,8 +11,7 @@ class SportswearBrandForm(forms.ModelForm):
             'description', 
             'link', 
             'thumbnail_url',
-            'category_tag', 
-            'average_rating'
+            'category_tag',
         ]
         
         widgets = {
@@ -20,4 +19,13 @@ class SportswearBrandForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'link': forms.URLInput(attrs={'class': 'form-control'}),
             'thumbnail_url': forms.URLInput(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+    def save(self, commit=True):
+        brand = super().save(commit=False)
+        if commit:
+            # Agregat rating (termasuk average_rating) dijaga sportswear.ratings
+            # dan tidak ada di form; saat edit hanya field form yang ditulis
+            # supaya nilai instance yang basi tidak menimpanya
+            brand.save(update_fields=self._meta.fields if brand.pk else None)
+        return brand
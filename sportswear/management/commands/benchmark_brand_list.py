@@ -0,0 +1,63 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from souline.benchmark import BenchmarkCommand
+from sportswear.models import BrandReview, SportswearBrand
+from sportswear.serializers import serialize_brand_detail, serialize_brand_list
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare the brand list payload (full reviews per brand vs bounded previews), on synthetic data that is rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brands', type=int, default=500)
+        parser.add_argument('--reviews', type=int, default=200, help='Reviews per brand')
+        parser.add_argument('--reviewers', type=int, default=200)
+
+    def measure(self, label, fn):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            data = fn()
+            elapsed = (time.perf_counter() - start) * 1000
+        size = sum(len(brand['reviews']) for brand in data)
+        self.stdout.write(f'{label:<24} {elapsed:9.1f} ms {len(queries):6d} queries {size:8d} reviews')
+        return elapsed
+
+    def run(self, options):
+        rng = random.Random(42)
+
+        start = time.perf_counter()
+        reviewers = User.objects.bulk_create(
+            [User(username=f'{self.prefix}_{i}', password='!') for i in range(options['reviewers'])], batch_size=500
+        )
+        brands = SportswearBrand.objects.bulk_create(
+            [
+                SportswearBrand(brand_name=f'{self.prefix}_brand {i}', description='Benchmark', link='https://example.com')
+                for i in range(options['brands'])
+            ],
+            batch_size=500,
+        )
+        reviews = [
+            BrandReview(
+                brand=brand,
+                reviewer=rng.choice(reviewers),
+                rating_value=rng.randint(1, 5),
+                review_text=f'Review {i}',
+            )
+            for brand in brands
+            for i in range(options['reviews'])
+        ]
+        BrandReview.objects.bulk_create(reviews, batch_size=2000)
+        self.stdout.write(
+            f'Seeded {len(brands)} brands, {len(reviews)} reviews in {time.perf_counter() - start:.1f}s'
+        )
+
+        queryset = SportswearBrand.objects.filter(brand_name__startswith=f'{self.prefix}_').order_by('brand_name')
+        full_ms = self.measure('full reviews per brand', lambda: [
+            serialize_brand_detail(brand) for brand in queryset
+        ])
+        list_ms = self.measure('preview + review_count', lambda: serialize_brand_list(queryset))
+        self.stdout.write(self.style.SUCCESS(f'brand list: {full_ms / list_ms:.1f}x faster'))
@@ -0,0 +1,71 @@
+import random
+import time
+
+from django.db.models import Q
+from souline.benchmark import BenchmarkCommand
+from sportswear.models import SportswearBrand
+from sportswear.search import SEARCH_LIMIT, search_brands
+
+COMMON_WORDS = (
+    'yoga pilates legging bra mat tank hoodie jogger running training studio breathable '
+    'seamless organic cotton recycled compression flex stretch active outdoor trail lite'
+).split()
+SYLLABLES = ('ka', 'ri', 'mo', 'ta', 'lu', 'ne', 'so', 'vi', 'da', 'pe', 'zu', 'ro', 'ma', 'ki')
+TAGS = ('Yoga', 'Pilates', 'Running', 'Gym')
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Compare brand search latency (full-text index vs icontains scan, both capped at SEARCH_LIMIT), '
+        'on synthetic data that is rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brands', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=100, help='Queries per query mix')
+
+    def timed(self, label, queries, fn):
+        start = time.perf_counter()
+        matches = sum(len(fn(query)) for query in queries)
+        elapsed = (time.perf_counter() - start) / len(queries) * 1000
+        self.stdout.write(f'{label:<20} {elapsed:8.2f} ms/query {matches:8d} results')
+        return elapsed
+
+    def run(self, options):
+        rng = random.Random(42)
+        # Kosakata nama brand: kata buatan yang jarang muncul
+        rare_words = sorted({''.join(rng.choices(SYLLABLES, k=4)) for _ in range(20000)})
+
+        start = time.perf_counter()
+        SportswearBrand.objects.bulk_create(
+            [
+                SportswearBrand(
+                    brand_name=f'{self.prefix} {rng.choice(rare_words)} {i}',
+                    description=' '.join(rng.choices(COMMON_WORDS, k=8) + rng.choices(rare_words, k=4)),
+                    category_tag=rng.choice(TAGS),
+                    link='https://example.com',
+                )
+                for i in range(options['brands'])
+            ],
+            batch_size=1000,
+        )
+        self.stdout.write(f'Seeded {options["brands"]} brands in {time.perf_counter() - start:.1f}s')
+
+        def current(query):
+            # Path lama list_brands_api tanpa ranking, dengan LIMIT yang sama
+            # supaya kedua sisi mengembalikan jumlah baris yang sebanding
+            return list(
+                SportswearBrand.objects.filter(Q(brand_name__icontains=query) | Q(description__icontains=query))
+                .order_by('brand_name')[:SEARCH_LIMIT]
+            )
+
+        mixes = {
+            'selective word': [rng.choice(rare_words) for _ in range(options['queries'])],
+            'typeahead prefix': [rng.choice(rare_words)[:5] for _ in range(options['queries'])],
+            'common word': [rng.choice(COMMON_WORDS) for _ in range(options['queries'])],
+        }
+        for mix, queries in mixes.items():
+            self.stdout.write(f'-- {mix}')
+            scan_ms = self.timed('icontains scan', queries, current)
+            index_ms = self.timed('full-text index', queries, lambda query: list(search_brands(query)))
+            self.stdout.write(self.style.SUCCESS(f'{mix}: {scan_ms / index_ms:.1f}x'))
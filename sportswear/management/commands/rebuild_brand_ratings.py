@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from sportswear.ratings import rebuild_ratings
+
+class Command(BaseCommand):
+    help = 'Recompute SportswearBrand rating aggregates (sum, count, histogram, average) from BrandReview'
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings for {updated} brands'))
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:46
+
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+
+def populate_ratings(apps, schema_editor):
+    SportswearBrand = apps.get_model('sportswear', 'SportswearBrand')
+    BrandReview = apps.get_model('sportswear', 'BrandReview')
+
+    totals = defaultdict(lambda: {'rating_sum': Decimal(0), 'rating_count': 0})
+    for brand_id, rating_value in BrandReview.objects.values_list('brand_id', 'rating_value').iterator():
+        star = min(5, max(1, int(rating_value)))
+        brand = totals[brand_id]
+        brand['rating_sum'] += rating_value
+        brand['rating_count'] += 1
+        brand[f'stars_{star}'] = brand.get(f'stars_{star}', 0) + 1
+
+    for brand_id, fields in totals.items():
+        average = fields['rating_sum'] / fields['rating_count']
+        fields['average_rating'] = average.quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+        SportswearBrand.objects.filter(pk=brand_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sportswear', '0008_alter_sportswearbrand_average_rating_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='rating_sum',
+            field=models.DecimalField(decimal_places=1, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='stars_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='stars_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='stars_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='stars_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sportswearbrand',
+            name='stars_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='sportswearbrand',
+            index=models.Index(fields=['-average_rating', '-rating_count', 'brand_name'], name='sportswear_brand_rating_idx'),
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# SQL ditulis langsung di sini (bukan import dari sportswear.search) supaya
+# perubahan kode aplikasi tidak mengubah riwayat migration.
+FTS_TABLE = 'sportswear_brand_fts'
+SQLITE_TRIGGERS = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+POSTGRES_CREATE_SQL = """
+CREATE INDEX "sportswear_brand_search_idx" ON "sportswear_sportswearbrand" USING gin (
+    ((setweight(to_tsvector('simple'::regconfig, COALESCE("brand_name", '')), 'A')
+    || setweight(to_tsvector('simple'::regconfig, COALESCE("description", '')), 'B')))
+)
+"""
+POSTGRES_DROP_SQL = 'DROP INDEX IF EXISTS sportswear_brand_search_idx'
+
+SQLITE_CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        brand_name, description, category_tag,
+        content='sportswear_sportswearbrand', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON sportswear_sportswearbrand BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, brand_name, description, category_tag)
+        VALUES (new.id, new.brand_name, new.description, new.category_tag);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON sportswear_sportswearbrand BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, brand_name, description, category_tag)
+        VALUES ('delete', old.id, old.brand_name, old.description, old.category_tag);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF brand_name, description, category_tag ON sportswear_sportswearbrand BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, brand_name, description, category_tag)
+        VALUES ('delete', old.id, old.brand_name, old.description, old.category_tag);
+        INSERT INTO {FTS_TABLE}(rowid, brand_name, description, category_tag)
+        VALUES (new.id, new.brand_name, new.description, new.category_tag);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE_SQL)
+    elif vendor == 'sqlite':
+        for statement in SQLITE_CREATE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_DROP_SQL)
+    elif vendor == 'sqlite':
+        for trigger in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sportswear', '0009_brand_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sportswear', '0010_brand_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brandreview',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='brandreview',
+            index=models.Index(fields=['brand', '-created_at', '-id'], name='sportswear_review_brand_idx'),
+        ),
+    ]
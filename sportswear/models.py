@@ -1,5 +1,7 @@
 from django.db import models
+from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 class SportswearBrand(models.Model):
 
@@ -11,8 +13,27 @@ class SportswearBrand(models.Model):
     category_tag = models.CharField(max_length=50, default='Yoga', verbose_name="Category Tag (Yoga, Pilates, etc.)")
     average_rating = models.DecimalField(max_digits=100, decimal_places=1, default=5.0, verbose_name="Average Rating")
 
+    # Agregat BrandReview, dijaga oleh sportswear.ratings
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    bookmarks = GenericRelation('bookmarks.Bookmark')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-average_rating', '-rating_count', 'brand_name'], name='sportswear_brand_rating_idx'),
+        ]
+
     def __str__(self):
         return self.brand_name
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'stars_{star}') for star in range(1, 6)}
     
 class BrandReview(models.Model):
     brand = models.ForeignKey(
@@ -32,6 +53,13 @@ class BrandReview(models.Model):
     )
 
     location = models.CharField(max_length=50, default='Jakarta')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Preview review terbaru per brand (review_preview_prefetch)
+            models.Index(fields=['brand', '-created_at', '-id'], name='sportswear_review_brand_idx'),
+        ]
 
     def __str__(self):
         return f"Review ({self.rating_value}/5) for {self.brand.brand_name} by {self.reviewer.username if self.reviewer else 'Anonymous'}"
\ No newline at end of file
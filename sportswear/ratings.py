@@ -0,0 +1,122 @@
+"""
+Agregat rating BrandReview yang disimpan di SportswearBrand.
+
+Setiap create/update/delete review menggeser rating_sum, rating_count dan
+bucket stars_1..stars_5 dengan satu UPDATE ... SET x = x + delta, dan
+average_rating dihitung di statement yang sama dari nilai barunya. Listing
+yang diurutkan berdasarkan rating cukup membaca index
+sportswear_brand_rating_idx, tanpa scan tabel review.
+
+Brand yang belum pernah punya review mempertahankan average_rating yang
+diisi saat dibuat; saat review terakhirnya dihapus, average_rating kembali
+ke default model.
+bulk_create, QuerySet.update/delete dan data lama tidak melewati signal;
+rebuild_ratings() (command rebuild_brand_ratings) menghitung ulang semuanya
+dari tabel review.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+
+from .models import BrandReview, SportswearBrand
+
+STARS = range(1, 6)
+TOP_BRANDS_MIN_REVIEWS = 3
+RATING_ORDER = ('-average_rating', '-rating_count', 'brand_name')
+DEFAULT_RATING = Decimal(str(SportswearBrand._meta.get_field('average_rating').get_default()))
+
+
+def bucket(rating_value):
+    """Bucket histogram sebuah rating: dibulatkan ke bawah, dibatasi 1-5."""
+    return min(5, max(1, int(rating_value)))
+
+
+def _mean(rating_sum, rating_count):
+    # Cast ke float: SQLite menyimpan 12.0 sebagai integer dan pembagian
+    # integer akan membuang pecahannya. Dibulatkan di SQL supaya hasilnya
+    # sama di SQLite dan Postgres
+    return Round(Cast(rating_sum, FloatField()) / rating_count, 1)
+
+
+def apply_review(brand_id, rating_value, sign):
+    """Tambahkan (sign=1) atau keluarkan (sign=-1) satu rating dari agregat brand."""
+    rating_value = Decimal(str(rating_value))
+    star = f'stars_{bucket(rating_value)}'
+    new_sum = F('rating_sum') + Value(sign * rating_value)
+    new_count = F('rating_count') + sign
+    SportswearBrand.objects.filter(pk=brand_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        **{star: F(star) + sign},
+        average_rating=Case(
+            # Nilai kolom di sisi kanan SET adalah nilai lama
+            When(rating_count__gt=-sign, then=_mean(new_sum, new_count)),
+            # Review terakhir dihapus: tidak ada rata-rata yang bisa dipakai
+            When(rating_count=-sign, then=Value(DEFAULT_RATING)),
+            default=F('average_rating'),
+            output_field=DecimalField(max_digits=100, decimal_places=1),
+        ),
+    )
+
+
+def move_review(before, after):
+    """Review berubah dari (brand_id, rating_value) `before` ke `after`."""
+    if before == after:
+        return
+    with transaction.atomic():
+        apply_review(*before, -1)
+        apply_review(*after, 1)
+
+
+def _aggregate(expression, output_field):
+    values = (
+        BrandReview.objects.filter(brand_id=OuterRef('pk'))
+        .order_by()
+        .values('brand_id')
+        .annotate(value=expression)
+        .values('value')
+    )
+    return Subquery(values, output_field=output_field)
+
+
+def _star_filter(star):
+    condition = Q()
+    if star > min(STARS):
+        condition &= Q(rating_value__gte=star)
+    if star < max(STARS):
+        condition &= Q(rating_value__lt=star + 1)
+    return condition
+
+
+def rebuild_ratings(queryset=None):
+    """Hitung ulang agregat dari tabel review; mengembalikan jumlah brand."""
+    queryset = SportswearBrand.objects.all() if queryset is None else queryset
+    decimal = DecimalField(max_digits=12, decimal_places=1)
+    stars = {
+        f'stars_{star}': Coalesce(
+            _aggregate(Count('pk', filter=_star_filter(star)), IntegerField()), 0
+        )
+        for star in STARS
+    }
+    with transaction.atomic():
+        updated = queryset.update(
+            rating_sum=Coalesce(_aggregate(Sum('rating_value'), decimal), Value(Decimal(0)), output_field=decimal),
+            rating_count=Coalesce(_aggregate(Count('pk'), IntegerField()), 0),
+            **stars,
+        )
+        queryset.filter(rating_count__gt=0).update(
+            average_rating=Cast(_mean(F('rating_sum'), F('rating_count')), DecimalField(max_digits=100, decimal_places=1)),
+        )
+    return updated
+
+
+def by_rating(queryset):
+    return queryset.order_by(*RATING_ORDER)
+
+
+def top_brands(queryset=None, min_reviews=TOP_BRANDS_MIN_REVIEWS):
+    """Brand dengan rating tertinggi, hanya yang punya cukup review."""
+    queryset = SportswearBrand.objects.all() if queryset is None else queryset
+    return by_rating(queryset.filter(rating_count__gte=min_reviews))
@@ -0,0 +1,177 @@
+"""
+Pencarian brand dengan index full-text.
+
+Production (PostgreSQL) memakai SearchVector atas brand_name (bobot A) dan
+description (bobot B) dengan GIN index pada ekspresi yang sama
+(sportswear_brand_search_idx). Development (SQLite) memakai tabel FTS5
+sportswear_brand_fts yang disinkronkan trigger dari tabel brand. Keduanya
+dibuat oleh migration 0010 (SQL-nya ditulis langsung di migration).
+
+search_brands() adalah API bersama untuk keduanya: setiap kata di query
+dicocokkan sebagai prefix (untuk typeahead), semua kata harus cocok, dan
+hasilnya diurutkan berdasarkan relevansi (annotation `search_rank`),
+paling banyak SEARCH_LIMIT (search_brands_page memberi tahu jika terpotong).
+Filter tag sama di semua database: category_tag__iexact, seperti listing
+tanpa query. Database lain jatuh kembali ke icontains tanpa ranking.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+
+from .models import SportswearBrand
+
+SEARCH_LIMIT = 100
+SEARCH_CONFIG = 'simple'
+FTS_TABLE = 'sportswear_brand_fts'
+# Bobot bm25 per kolom FTS5: brand_name, description, category_tag
+FTS_WEIGHTS = (10.0, 1.0, 0.0)
+
+
+def brand_vector():
+    # Ekspresi GIN index; kalau diubah, index perlu dibuat ulang lewat migration
+    return (
+        SearchVector('brand_name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+SQLITE_INDEX_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        brand_name, description, category_tag,
+        content='sportswear_sportswearbrand', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON sportswear_sportswearbrand BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, brand_name, description, category_tag)
+        VALUES (new.id, new.brand_name, new.description, new.category_tag);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON sportswear_sportswearbrand BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, brand_name, description, category_tag)
+        VALUES ('delete', old.id, old.brand_name, old.description, old.category_tag);
+    END""",
+    # Hanya kolom yang di-index; update agregat rating tidak menyentuh FTS
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF brand_name, description, category_tag ON sportswear_sportswearbrand BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, brand_name, description, category_tag)
+        VALUES ('delete', old.id, old.brand_name, old.description, old.category_tag);
+        INSERT INTO {FTS_TABLE}(rowid, brand_name, description, category_tag)
+        VALUES (new.id, new.brand_name, new.description, new.category_tag);
+    END""",
+]
+SQLITE_TRIGGERS = {f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'}
+
+
+def ensure_sqlite_index(connection):
+    """
+    Buat tabel FTS5 dan trigger jika belum ada, lalu isi ulang indexnya.
+    SQLite membuat ulang tabel saat AlterField dan trigger ikut hilang,
+    jadi ini juga dijalankan setelah setiap migrate (SportswearConfig).
+    Mengembalikan True jika ada yang dibuat.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'sportswear_sportswearbrand'"
+        )
+        if SQLITE_TRIGGERS <= {name for name, in cursor.fetchall()}:
+            return False
+        for statement in SQLITE_INDEX_SQL:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def terms(query):
+    return re.findall(r'\w+', (query or '').lower())
+
+
+def _tagged(tag):
+    brands = SportswearBrand.objects.all()
+    if tag:
+        brands = brands.filter(category_tag__iexact=tag)
+    return brands
+
+
+def _postgres_ranked(words, tag, limit):
+    query = SearchQuery(
+        ' & '.join(f"'{word}':*" for word in words), search_type='raw', config=SEARCH_CONFIG
+    )
+    vector = brand_vector()
+    brands = _tagged(tag).annotate(search=vector).filter(search=query)
+    return list(
+        brands.annotate(rank=SearchRank(vector, query))
+        .order_by('-rank', 'brand_name')
+        .values_list('pk', 'rank')[:limit]
+    )
+
+
+def _sqlite_ranked(words, tag, limit):
+    match = '{brand_name description}: ' + ' '.join(f'"{word}"*' for word in words)
+    where, params = f'{FTS_TABLE} MATCH %s', [match]
+    if tag:
+        # Lookup yang sama dengan Postgres, dipakai sebelum LIMIT
+        tagged, tag_params = _tagged(tag).values('pk').query.sql_with_params()
+        where += f' AND rowid IN ({tagged})'
+        params += tag_params
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        # bm25 makin kecil makin relevan; dibalik supaya search_rank DESC
+        cursor.execute(
+            f'SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE}'
+            f' WHERE {where} ORDER BY score DESC LIMIT %s',
+            [*params, limit],
+        )
+        return cursor.fetchall()
+
+
+def _fallback_ranked(words, tag, limit):
+    query = ' '.join(words)
+    brands = _tagged(tag).filter(Q(brand_name__icontains=query) | Q(description__icontains=query))
+    return [(pk, 0.0) for pk in brands.order_by('brand_name').values_list('pk', flat=True)[:limit]]
+
+
+RANKERS = {
+    'postgresql': _postgres_ranked,
+    'sqlite': _sqlite_ranked,
+}
+
+
+def _ranked(query, tag, limit):
+    words = terms(query)
+    if not words:
+        return []
+    return RANKERS.get(connection.vendor, _fallback_ranked)(words, tag, limit)
+
+
+def _ranked_queryset(queryset, ranked):
+    queryset = SportswearBrand.objects.all() if queryset is None else queryset
+    if not ranked:
+        return queryset.none()
+    rank = Case(
+        *[When(pk=pk, then=Value(float(score))) for pk, score in ranked],
+        output_field=FloatField(),
+    )
+    return (
+        queryset.filter(pk__in=[pk for pk, _ in ranked])
+        .annotate(search_rank=rank)
+        .order_by('-search_rank', 'brand_name')
+    )
+
+
+def search_brands(query, tag=None, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Brand yang cocok dengan `query` (dan `tag` jika diisi), paling relevan
+    dulu, paling banyak `limit`. Mengembalikan QuerySet sehingga bisa
+    dipakai with_list_data/prefetch seperti listing biasa.
+    """
+    return _ranked_queryset(queryset, _ranked(query, tag, limit))
+
+
+def search_brands_page(query, tag=None, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Seperti search_brands, ditambah flag `truncated`: True jika masih ada
+    hasil setelah `limit` (diambil satu baris ekstra, tanpa COUNT).
+    """
+    ranked = _ranked(query, tag, limit + 1)
+    return _ranked_queryset(queryset, ranked[:limit]), len(ranked) > limit
@@ -1,3 +1,12 @@
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+from timeline.models import Post
+from .models import BrandReview
+
+# Jumlah review yang ikut di representasi list; selengkapnya lewat detail
+REVIEW_PREVIEW_SIZE = 3
+
 def serialize_review(review):
     return {
         'username': review.reviewer.username if review.reviewer else 'Anonymous',
@@ -22,7 +31,7 @@ def serialize_timeline_post_as_review(post):
     }
 
 def serialize_brand_detail(brand, user=None):
-    internal_reviews = [serialize_review(r) for r in brand.reviews.all()]
+    internal_reviews = [serialize_review(r) for r in brand.reviews.all().select_related('reviewer')]
 
     timeline_posts = brand.posts.all().select_related('author')
     timeline_reviews = [serialize_timeline_post_as_review(p) for p in timeline_posts]
@@ -37,10 +46,80 @@ def serialize_brand_detail(brand, user=None):
         'thumbnail': brand.thumbnail_url,
         'rating': float(brand.average_rating),
         'link': brand.link,
+        'rating_count': brand.rating_count,
+        'rating_histogram': brand.rating_histogram,
         'reviews': all_reviews, 
     }
     
     return data
 
+_BRAND_FK = {BrandReview: 'brand', Post: 'sportswear'}
+
+
+def _count_of(model):
+    counts = (
+        model.objects.filter(**{_BRAND_FK[model]: OuterRef('pk')})
+        .order_by()
+        .values(_BRAND_FK[model])
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def review_preview_prefetch(size=REVIEW_PREVIEW_SIZE, to_attr='review_preview'):
+    """`size` review terbaru per brand, satu query window untuk semua brand."""
+    queryset = BrandReview.objects.select_related('reviewer').order_by('-created_at', '-pk')[:size]
+    return Prefetch('reviews', queryset=queryset, to_attr=to_attr)
+
+
+def with_list_data(brands):
+    """
+    Tambahkan yang dibutuhkan serialize_brand_summary ke queryset brand:
+    jumlah review (review brand + post timeline) dari anotasi dan preview
+    review yang dibatasi, sehingga listing = 3 query berapa pun jumlah brand.
+    """
+    post_preview = Post.objects.select_related('author').order_by('-created_at', '-id')[:REVIEW_PREVIEW_SIZE]
+    return brands.annotate(
+        internal_review_count=_count_of(BrandReview),
+        timeline_review_count=_count_of(Post),
+    ).prefetch_related(
+        review_preview_prefetch(),
+        Prefetch('posts', queryset=post_preview, to_attr='post_preview'),
+    )
+
+
+def latest_reviews(brand, size=REVIEW_PREVIEW_SIZE):
+    """
+    Gabungan preview review brand dan post timeline, terbaru dulu. Masing-
+    masing sudah dibatasi `size`, jadi `size` teratas gabungannya pasti
+    ada di antara keduanya.
+    """
+    merged = sorted(
+        [*brand.review_preview, *brand.post_preview], key=lambda item: item.created_at, reverse=True,
+    )[:size]
+    return [
+        serialize_review(item) if isinstance(item, BrandReview) else serialize_timeline_post_as_review(item)
+        for item in merged
+    ]
+
+
+def serialize_brand_summary(brand, user=None):
+    return {
+        'id': brand.pk,
+        'name': brand.brand_name,
+        'description': brand.description,
+        'tag': brand.category_tag,
+        'thumbnail': brand.thumbnail_url,
+        'rating': float(brand.average_rating),
+        'link': brand.link,
+        'review_count': brand.internal_review_count + brand.timeline_review_count,
+        'rating_count': brand.rating_count,
+        'reviews': latest_reviews(brand),
+    }
+
+
 def serialize_brand_list(brands, user=None):
-    return [serialize_brand_detail(brand, user) for brand in brands]
\ No newline at end of file
+    if isinstance(brands, QuerySet):
+        brands = with_list_data(brands)
+    return [serialize_brand_summary(brand, user) for brand in brands]
\ No newline at end of file
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from sportswear.models import BrandReview
+from sportswear.ratings import apply_review, move_review
+
+
+@receiver(pre_save, sender=BrandReview)
+def remember_rating(sender, instance, raw=False, **kwargs):
+    # Nilai lama dari DB, bukan dari instance yang mungkin sudah basi
+    instance._rating_before = None
+    if raw or instance.pk is None:
+        return
+    instance._rating_before = (
+        BrandReview.objects.filter(pk=instance.pk).values_list('brand_id', 'rating_value').first()
+    )
+
+
+@receiver(post_save, sender=BrandReview)
+def count_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    after = (instance.brand_id, instance.rating_value)
+    before = getattr(instance, '_rating_before', None)
+    if before is None:
+        apply_review(*after, 1)
+    else:
+        move_review(before, after)
+
+
+@receiver(post_delete, sender=BrandReview)
+def uncount_rating(sender, instance, **kwargs):
+    apply_review(instance.brand_id, instance.rating_value, -1)
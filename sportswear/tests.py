@@ -1,7 +1,17 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
-from .models import SportswearBrand
+from django.utils import timezone
+from timeline.models import Post
+from .models import BrandReview, SportswearBrand
 from .forms import SportswearBrandForm # Jika Anda membuat forms.py
+from .ratings import rebuild_ratings
+from .search import search_brands
+from .serializers import REVIEW_PREVIEW_SIZE
 
 class SportswearModelTest(TestCase):
     def setUp(self):
@@ -72,4 +82,213 @@ class SportswearAdminTest(TestCase):
         
         self.assertEqual(response.status_code, 200)
         
-        self.assertFalse(SportswearBrand.objects.filter(pk=self.brand_to_delete.pk).exists())
\ No newline at end of file
+        self.assertFalse(SportswearBrand.objects.filter(pk=self.brand_to_delete.pk).exists())
+
+class BrandListPayloadTest(TestCase):
+    def setUp(self):
+        self.reviewer = User.objects.create_user(username='reviewer', password='password123')
+        self.brands = []
+        for i in range(3):
+            brand = SportswearBrand.objects.create(
+                brand_name=f"Brand {i}", description="Desc", link="http://b.com",
+            )
+            BrandReview.objects.bulk_create([
+                BrandReview(brand=brand, reviewer=self.reviewer, rating_value=4, review_text=f"Review {j}")
+                for j in range(10)
+            ])
+            self.brands.append(brand)
+
+    def test_list_has_bounded_preview_and_count(self):
+        response = self.client.get(reverse('sportswear:list_brands_api'))
+        data = response.json()
+        self.assertEqual(len(data), 3)
+        for item in data:
+            self.assertEqual(item['review_count'], 10)
+            self.assertEqual(len(item['reviews']), REVIEW_PREVIEW_SIZE)
+        # Preview berisi review terbaru
+        self.assertEqual(data[0]['reviews'][0]['review_text'], "Review 9")
+
+    def test_preview_merges_reviews_and_posts_by_date(self):
+        brand = self.brands[0]
+        Post.objects.create(author=self.reviewer, text="Newest post", sportswear=brand)
+        Post.objects.create(
+            author=self.reviewer, text="Old post", sportswear=brand, created_at=timezone.now() - timedelta(days=30),
+        )
+        data = {b['id']: b for b in self.client.get(reverse('sportswear:list_brands_api')).json()}
+        self.assertEqual(
+            [r['review_text'] for r in data[brand.pk]['reviews']], ["Newest post", "Review 9", "Review 8"],
+        )
+        self.assertEqual(data[brand.pk]['review_count'], 12)
+
+    def test_list_query_count_does_not_grow_with_brands(self):
+        url = reverse('sportswear:list_brands_api')
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        SportswearBrand.objects.create(brand_name="Brand X", description="Desc", link="http://x.com")
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_detail_has_all_reviews(self):
+        response = self.client.get(reverse('sportswear:brand_detail_api', args=[self.brands[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['reviews']), 10)
+        response = self.client.get(reverse('sportswear:brand_detail_api', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_html_list_shows_latest_reviews(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('sportswear:show_sportswear'))
+        self.assertContains(response, "Review 9")
+        self.assertNotContains(response, "Review 6")
+
+
+class BrandRatingAggregateTest(TestCase):
+    def setUp(self):
+        self.brand = SportswearBrand.objects.create(
+            brand_name="Rated", description="Desc", link="http://r.com", average_rating=5.0,
+        )
+        self.other = SportswearBrand.objects.create(
+            brand_name="Other", description="Desc", link="http://o.com", average_rating=2.0,
+        )
+
+    def review(self, rating, brand=None):
+        return BrandReview.objects.create(brand=brand or self.brand, rating_value=rating, review_text="ok")
+
+    def test_create_update_delete_keep_aggregates(self):
+        first = self.review(4)
+        self.review(Decimal('2.5'))
+        self.brand.refresh_from_db()
+        self.assertEqual(self.brand.rating_count, 2)
+        self.assertEqual(self.brand.rating_sum, Decimal('6.5'))
+        self.assertEqual(self.brand.average_rating, Decimal('3.3'))
+        self.assertEqual(self.brand.rating_histogram, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0})
+
+        first.rating_value = 5
+        first.save()
+        self.brand.refresh_from_db()
+        self.assertEqual(self.brand.average_rating, Decimal('3.8'))
+        self.assertEqual(self.brand.stars_4, 0)
+        self.assertEqual(self.brand.stars_5, 1)
+
+        # Pindah brand: keluar dari agregat lama, masuk ke yang baru
+        first.brand = self.other
+        first.save()
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.rating_count, self.other.average_rating), (1, Decimal('5.0')))
+
+        first.delete()
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.rating_count, self.other.stars_5), (0, 0))
+        self.brand.refresh_from_db()
+        self.assertEqual(self.brand.average_rating, Decimal('2.5'))
+
+    def test_deleting_last_review_resets_average(self):
+        only = self.review(1, brand=self.other)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.average_rating, Decimal('1.0'))
+        only.delete()
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.rating_count, self.other.rating_sum), (0, 0))
+        self.assertEqual(self.other.average_rating, Decimal('5.0'))
+
+    def test_brand_without_reviews_keeps_manual_rating(self):
+        rebuild_ratings()
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.average_rating, Decimal('2.0'))
+
+    def test_rebuild_matches_incremental(self):
+        for rating in (1, Decimal('3.5'), 5, 5):
+            self.review(rating)
+        self.review(Decimal('0.5'), brand=self.other)
+        expected = SportswearBrand.objects.values().order_by('pk')
+        expected = list(expected)
+        BrandReview.objects.bulk_create([BrandReview(brand=self.brand, rating_value=1, review_text="bulk")])
+        BrandReview.objects.filter(review_text="bulk").delete()
+        SportswearBrand.objects.update(rating_sum=0, rating_count=0, stars_1=0, stars_5=0, average_rating=1)
+        call_command('rebuild_brand_ratings', stdout=io.StringIO())
+        self.assertEqual(list(SportswearBrand.objects.values().order_by('pk')), expected)
+
+    def test_top_brands_and_rating_sort(self):
+        for _ in range(3):
+            self.review(4)
+            self.review(5, brand=self.other)
+        low = SportswearBrand.objects.create(brand_name="Low", description="Desc", link="http://l.com")
+        self.review(5, brand=low)
+
+        names = [b['name'] for b in self.client.get(reverse('sportswear:top_brands_api')).json()]
+        self.assertEqual(names, ["Other", "Rated"])
+        response = self.client.get(reverse('sportswear:list_brands_api'), {'sort': 'rating'})
+        self.assertEqual([b['name'] for b in response.json()], ["Other", "Low", "Rated"])
+
+    def test_edit_form_does_not_overwrite_aggregates(self):
+        stale = SportswearBrand.objects.get(pk=self.brand.pk)
+        self.review(3)
+        form = SportswearBrandForm({
+            'brand_name': 'Rated', 'description': 'New', 'link': 'http://r.com',
+            'category_tag': 'Yoga', 'average_rating': '1.0',
+        }, instance=stale)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.brand.refresh_from_db()
+        self.assertEqual((self.brand.description, self.brand.rating_count), ('New', 1))
+        self.assertEqual(self.brand.average_rating, Decimal('3.0'))
+
+
+class BrandSearchTest(TestCase):
+    def setUp(self):
+        self.flow = SportswearBrand.objects.create(
+            brand_name="Flowwear", description="Legging for studio sessions", link="http://f.com", category_tag="Yoga",
+        )
+        self.core = SportswearBrand.objects.create(
+            brand_name="Corefit", description="Pilates tops that flow with you", link="http://c.com", category_tag="Pilates",
+        )
+        self.other = SportswearBrand.objects.create(
+            brand_name="Trailrun", description="Outdoor shoes", link="http://t.com", category_tag="Running",
+        )
+
+    def names(self, *args, **kwargs):
+        return [brand.brand_name for brand in search_brands(*args, **kwargs)]
+
+    def test_prefix_match_ranks_name_first(self):
+        self.assertEqual(self.names("flow"), ["Flowwear", "Corefit"])
+        self.assertEqual(self.names("Pila"), ["Corefit"])
+        self.assertEqual(self.names("flow tops"), ["Corefit"])
+        self.assertEqual(self.names("   "), [])
+        self.assertEqual(self.names('"); DROP'), [])
+
+    def test_tag_filter(self):
+        self.assertEqual(self.names("flow", tag="pilates"), ["Corefit"])
+        self.assertEqual(self.names("flow", tag="Running"), [])
+        # Tag dicocokkan utuh (iexact), bukan per kata
+        SportswearBrand.objects.create(
+            brand_name="Flowlite", description="Desc", link="http://l.com", category_tag="Hot Pilates",
+        )
+        self.assertEqual(self.names("flow", tag="pilates"), ["Corefit"])
+        self.assertEqual(self.names("flow", tag="hot pilates"), ["Flowlite"])
+
+    def test_index_follows_brand_changes(self):
+        self.other.brand_name = "Flowrunner"
+        self.other.save()
+        self.core.delete()
+        self.assertEqual(self.names("flow"), ["Flowrunner", "Flowwear"])
+        self.assertEqual(self.names("trailrun"), [])
+
+    def test_api_search_reports_truncation(self):
+        url = reverse('sportswear:list_brands_api')
+        data = self.client.get(url, {'q': 'flow', 'limit': 1}).json()
+        self.assertEqual([brand['name'] for brand in data['results']], ["Flowwear"])
+        self.assertTrue(data['truncated'])
+        data = self.client.get(url, {'q': 'flow', 'limit': 5}).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertFalse(data['truncated'])
+        # Tanpa ?limit= tetap list seperti sebelumnya
+        self.assertEqual(len(self.client.get(url, {'q': 'flow'}).json()), 2)
+
+    def test_views_use_search(self):
+        response = self.client.get(reverse('sportswear:list_brands_api'), {'q': 'flow', 'tag': 'Yoga'})
+        self.assertEqual([brand['name'] for brand in response.json()], ["Flowwear"])
+        response = self.client.get(
+            reverse('sportswear:filter_brands_ajax'), {'q': 'outdoor'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertContains(response, "Trailrun")
+        self.assertNotContains(response, "Flowwear")
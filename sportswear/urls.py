@@ -12,6 +12,8 @@ urlpatterns = [
 
     # API Endpoints
     path('api/list/', views.list_brands_api, name='list_brands_api'),
+    path('api/top/', views.top_brands_api, name='top_brands_api'),
+    path('api/<int:pk>/', views.brand_detail_api, name='brand_detail_api'),
     path('api/create/', views.create_brand_api, name='create_brand_api'), 
     path('api/update/', views.update_brand_api, name='update_brand_api'), 
     path('api/delete/', views.delete_brand_api, name='delete_brand_api'),
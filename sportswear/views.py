@@ -1,14 +1,14 @@
 import json
 from django.shortcuts import render, redirect, get_object_or_404
 #from django.contrib.auth.decorators import login_required
-from django.db.models import Q 
 from django.views.decorators.csrf import csrf_exempt 
 from django.views.decorators.http import require_http_methods, require_POST, require_GET
 from django.http import HttpResponse, JsonResponse, HttpResponseForbidden, Http404
 from .models import SportswearBrand
 from .forms import SportswearBrandForm
 from .serializers import serialize_brand_list, serialize_brand_detail
-from sportswear import serializers 
+from .search import SEARCH_LIMIT, search_brands, search_brands_page
+from sportswear import ratings, serializers 
 
 def is_admin(user):
     return user.is_authenticated and user.is_staff
@@ -17,21 +17,49 @@ def is_admin(user):
 def list_brands_api(request):
     tag = request.GET.get('tag')
     query = request.GET.get('q')
+    sort = request.GET.get('sort')
 
-    brands = SportswearBrand.objects.all().order_by('brand_name')
-
-    if tag and tag.strip() and tag.lower() != 'all' and tag != 'null':
-        brands = brands.filter(category_tag__iexact=tag)
+    if not (tag and tag.strip() and tag.lower() != 'all' and tag != 'null'):
+        tag = None
 
+    truncated = None
     if query and query.strip():
-        brands = brands.filter(
-            Q(brand_name__icontains=query) | 
-            Q(description__icontains=query)
-        )
+        # Hasil pencarian diurutkan berdasarkan relevansi, paling banyak
+        # SEARCH_LIMIT (atau ?limit=). Dengan ?limit= body memuat `truncated`
+        try:
+            limit = max(1, min(int(request.GET.get('limit') or SEARCH_LIMIT), SEARCH_LIMIT))
+        except ValueError:
+            limit = SEARCH_LIMIT
+        brands, truncated = search_brands_page(query, tag=tag, limit=limit)
+    else:
+        brands = SportswearBrand.objects.all().order_by('brand_name')
+        if tag:
+            brands = brands.filter(category_tag__iexact=tag)
+
+    if sort == 'rating':
+        brands = ratings.by_rating(brands)
 
     data = serialize_brand_list(brands, user=request.user) 
+    if truncated is not None and 'limit' in request.GET:
+        return JsonResponse({'results': data, 'truncated': truncated})
     return JsonResponse(data, safe=False)
 
+@require_GET
+def top_brands_api(request):
+    """Brand dengan rating tertinggi, dibaca dari index rating."""
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    brands = ratings.top_brands()[:limit]
+    return JsonResponse(serialize_brand_list(brands, user=request.user), safe=False)
+
+@require_GET
+def brand_detail_api(request, pk):
+    """Detail satu brand dengan semua review; list hanya membawa preview."""
+    brand = get_object_or_404(SportswearBrand, pk=pk)
+    return JsonResponse(serialize_brand_detail(brand, user=request.user))
+
 @csrf_exempt
 def create_brand_api(request):
     if request.method == 'POST':
@@ -63,7 +91,7 @@ def update_brand_api(request):
             brand.category_tag = data.get("tag", brand.category_tag)
             brand.thumbnail_url = data.get("thumbnail", brand.thumbnail_url)
             brand.link = data.get("link", brand.link)
-            brand.save()
+            brand.save(update_fields=['brand_name', 'description', 'category_tag', 'thumbnail_url', 'link'])
             
             return JsonResponse({'status': 'success'}, status=200)
         except Exception as e:
@@ -91,25 +119,24 @@ def filter_brands_ajax(request):
         
     query = request.GET.get('q', '')
 
-    brands = SportswearBrand.objects.all()
-
     # Filter Berdasarkan Pencarian Teks
-    if query:
-        brands = brands.filter(
-            Q(brand_name__icontains=query) | 
-            Q(description__icontains=query)
-        )
+    if query.strip():
+        brands = search_brands(query)
+    else:
+        brands = SportswearBrand.objects.all().order_by('brand_name')
         
-    brands = brands.order_by('brand_name')
+    brands = brands.prefetch_related(
+        serializers.review_preview_prefetch(to_attr='latest_reviews')
+    )
         
     return render(request, 'sportswear/brand_cards.html', {'brands': brands})
 
 
 # CRUD ADMIN (HTML/AJAX)
 def show_sportswear(request):
-    brands = SportswearBrand.objects.all().order_by('brand_name')
-    for brand in brands:
-        brand.latest_reviews = brand.reviews.all()[:3] 
+    brands = SportswearBrand.objects.all().order_by('brand_name').prefetch_related(
+        serializers.review_preview_prefetch(to_attr='latest_reviews')
+    )
         
     context = {
         'brands': brands,
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StudioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'studio'
+
+    def ready(self):
+        from studio import signals  # noqa: F401
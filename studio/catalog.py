@@ -0,0 +1,146 @@
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from studio.models import Studio, KOTA_CHOICES
+from users.models import UserProfile
+
+KOTA_DISPLAY = dict(KOTA_CHOICES)
+KOTA_LIST = [kota for kota, _ in KOTA_CHOICES]
+
+
+def get_user_kota(user):
+    # Kota preferensi user, None untuk anonymous / user tanpa profil
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.profile.kota
+    except UserProfile.DoesNotExist:
+        return None
+
+
+def serialize_studio(studio):
+    return {
+        'id': str(studio.id),
+        'nama_studio': studio.nama_studio,
+        'thumbnail': studio.thumbnail or '',
+        'kota': KOTA_DISPLAY.get(studio.kota, studio.kota),
+        'area': studio.area,
+        'alamat': studio.alamat,
+        'gmaps_link': studio.gmaps_link or '',
+        'nomor_telepon': studio.nomor_telepon,
+        'rating': studio.rating,
+    }
+
+
+def group_studios_by_kota(studios):
+    """Kelompokkan studio (sudah terurut) per kota tanpa mengubah urutannya."""
+    grouped = {}
+    for studio in studios:
+        grouped.setdefault(studio.kota, []).append(serialize_studio(studio))
+    return grouped
+
+
+def build_catalog(user_kota=None, cities=None):
+    """
+    Payload katalog studio untuk show_json.
+
+    Semua studio diambil dengan satu query terurut, lalu dikelompokkan di
+    memori. Kota user (jika ada) diletakkan paling depan, diikuti kota lain
+    sesuai urutan KOTA_CHOICES.
+    """
+    cities = KOTA_LIST if cities is None else cities
+    grouped = group_studios_by_kota(Studio.objects.order_by('nama_studio'))
+
+    ordered = [user_kota] if user_kota else []
+    ordered += [city for city in cities if city != user_kota]
+
+    return {
+        'user_kota': user_kota,
+        'cities': [{
+            'name': city,
+            'is_user_city': city == user_kota,
+            'studios': grouped.get(city, []),
+        } for city in ordered],
+    }
+
+
+# Cache katalog -------------------------------------------------------------
+# Payload disimpan per varian kota (satu per kota user + anonymous) dan diberi
+# nomor versi. Signal post_save/post_delete pada Studio menaikkan versi
+# sehingga semua varian lama otomatis tidak terpakai lagi.
+
+CATALOG_VERSION_KEY = 'studio:catalog:version'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Counter hit/miss disimpan di cache bersama (bukan di memori proses) supaya
+# rasio yang dilaporkan mencakup semua worker gunicorn. Di FileBasedCache
+# incr() tidak atomik antar proses, jadi angkanya perkiraan.
+CATALOG_STATS_KEYS = {
+    'hits': 'studio:catalog:stats:hits',
+    'misses': 'studio:catalog:stats:misses',
+}
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Nilai awal berbasis waktu supaya key versi yang ter-evict tidak
+        # pernah kembali ke versi lama yang mungkin masih ada di cache.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        return get_catalog_version()
+
+
+def _catalog_cache_key(version, user_kota):
+    return f'studio:catalog:{version}:{user_kota or "anonymous"}'
+
+
+def _record(outcome):
+    key = CATALOG_STATS_KEYS[outcome]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Ter-evict di antara add() dan incr()
+        cache.add(key, 1, None)
+
+
+def get_catalog_json(user_kota=None):
+    """Payload show_json yang sudah di-encode, diambil dari cache bila ada."""
+    key = _catalog_cache_key(get_catalog_version(), user_kota)
+    payload = cache.get(key)
+    if payload is not None:
+        _record('hits')
+        return payload
+
+    _record('misses')
+    payload = json.dumps(build_catalog(user_kota), cls=DjangoJSONEncoder).encode()
+    cache.set(key, payload, CATALOG_CACHE_TIMEOUT)
+    return payload
+
+
+def catalog_cache_stats():
+    counts = cache.get_many(list(CATALOG_STATS_KEYS.values()))
+    hits = counts.get(CATALOG_STATS_KEYS['hits'], 0)
+    misses = counts.get(CATALOG_STATS_KEYS['misses'], 0)
+    total = hits + misses
+    return {
+        'version': get_catalog_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_catalog_cache_stats():
+    cache.delete_many(list(CATALOG_STATS_KEYS.values()))
@@ -0,0 +1,416 @@
+"""
+Proxy gambar studio dengan cache di disk.
+
+Setiap URL dipetakan ke sha256(url) di IMAGE_PROXY_CACHE_DIR: `<key>.img`
+berisi body gambar dan `<key>.json` berisi metadata (content type, ETag,
+Last-Modified, waktu fetch). Entry yang sudah lewat IMAGE_PROXY_MAX_AGE
+di-revalidate ke origin dengan conditional GET. Ukuran total cache dibatasi
+IMAGE_PROXY_CACHE_MAX_BYTES dan entry yang paling lama tidak dipakai (mtime)
+dibuang lebih dulu. Direktori cache tidak di-scan di setiap miss: evict()
+baru dijalankan setelah cukup banyak byte ditulis atau EVICT_INTERVAL lewat.
+
+Response origin dengan Content-Length di-stream langsung ke client. Tanpa
+Content-Length, batas IMAGE_PROXY_MAX_BYTES baru ketahuan di tengah body,
+jadi body disimpan dulu ke cache sebelum header dikirim; yang kebesaran
+mendapat 413, bukan 200 dengan body terpotong.
+
+Varian ukuran (?w=&h=&fmt=) dibuat sekali dengan Pillow dan disimpan di
+`derived/<digest>_<w>x<h>.<fmt>`, dengan digest = sha256 body asli. Request
+berikutnya untuk varian yang sama cukup membaca file tersebut. Gambar yang
+jumlah pikselnya melewati batas decompression bomb Pillow mendapat 413.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+from PIL import Image, UnidentifiedImageError
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = 10
+MAX_VARIANT_SIZE = 2048
+# evict() dijalankan lagi setelah proses ini menulis EVICT_SLACK x batas
+# cache, atau paling lambat setiap EVICT_INTERVAL detik
+EVICT_SLACK = 0.05
+EVICT_INTERVAL = 60
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+
+_session = None
+_session_lock = threading.Lock()
+_evict_lock = threading.Lock()
+_evict_state_lock = threading.Lock()
+_written_since_evict = 0
+_last_evict = 0.0
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+def get_session():
+    """Session HTTP bersama supaya koneksi ke origin dipakai ulang."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def cache_dir():
+    path = Path(getattr(settings, 'IMAGE_PROXY_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'image_proxy'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def max_image_bytes():
+    return getattr(settings, 'IMAGE_PROXY_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def max_cache_bytes():
+    return getattr(settings, 'IMAGE_PROXY_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+
+
+def max_age():
+    return getattr(settings, 'IMAGE_PROXY_MAX_AGE', 60 * 60 * 24)
+
+
+def derived_dir():
+    path = cache_dir() / 'derived'
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def cache_key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class Variant:
+    def __init__(self, width, height, fmt):
+        self.width = width
+        self.height = height
+        self.fmt = 'jpeg' if fmt == 'jpg' else fmt
+
+    @property
+    def pil_format(self):
+        return VARIANT_FORMATS[self.fmt][0]
+
+    @property
+    def content_type(self):
+        return VARIANT_FORMATS[self.fmt][1]
+
+    def filename(self, digest):
+        return f'{digest}_{self.width or 0}x{self.height or 0}.{self.fmt}'
+
+
+def parse_variant(params):
+    """
+    Baca ?w=&h=&fmt= dari query string. Mengembalikan None jika tidak ada
+    parameter ukuran/format, dan ValueError jika nilainya tidak valid.
+    """
+    raw_w, raw_h, fmt = params.get('w'), params.get('h'), params.get('fmt')
+    if not (raw_w or raw_h or fmt):
+        return None
+
+    def _dimension(value):
+        if not value:
+            return None
+        size = int(value)
+        if not 0 < size <= MAX_VARIANT_SIZE:
+            raise ValueError(f'dimension must be between 1 and {MAX_VARIANT_SIZE}')
+        return size
+
+    fmt = (fmt or 'webp').lower()
+    if fmt not in VARIANT_FORMATS:
+        raise ValueError(f'unsupported format: {fmt}')
+    return Variant(_dimension(raw_w), _dimension(raw_h), fmt)
+
+
+def render_variant(source_path, target_path, variant):
+    """Resize (tanpa upscale, rasio dijaga) lalu encode ulang ke target_path."""
+    with Image.open(source_path) as image:
+        image.load()
+        width = variant.width or image.width
+        height = variant.height or image.height
+        image.thumbnail((width, height), Image.LANCZOS)
+        if variant.pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA')
+
+        fd, tmp_path = tempfile.mkstemp(dir=target_path.parent, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                image.save(f, variant.pil_format, quality=80)
+            os.replace(tmp_path, target_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+class CacheEntry:
+    def __init__(self, key):
+        base = cache_dir()
+        self.key = key
+        self.body_path = base / f'{key}.img'
+        self.meta_path = base / f'{key}.json'
+        self.meta = None
+
+    def load(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = None
+        if self.meta is not None and not self.body_path.exists():
+            self.meta = None
+        return self.meta is not None
+
+    @property
+    def is_fresh(self):
+        return time.time() - self.meta.get('fetched_at', 0) < max_age()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+    def touch(self):
+        # mtime file body dipakai sebagai penanda LRU
+        try:
+            os.utime(self.body_path)
+        except OSError:
+            pass
+
+    def write_meta(self, meta):
+        self.meta = meta
+        _atomic_write(self.meta_path, json.dumps(meta).encode('utf-8'))
+
+    def mark_revalidated(self, response):
+        meta = dict(self.meta, fetched_at=time.time())
+        if response.headers.get('ETag'):
+            meta['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            meta['last_modified'] = response.headers['Last-Modified']
+        self.write_meta(meta)
+        self.touch()
+
+
+def _atomic_write(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _meta_from_response(url, response, size, digest=None):
+    return {
+        'url': url,
+        'digest': digest,
+        'content_type': response.headers.get('Content-Type', 'image/jpeg'),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'size': size,
+        'fetched_at': time.time(),
+    }
+
+
+def evict(limit=None):
+    """Buang entry dengan mtime paling lama sampai total ukuran <= limit."""
+    limit = max_cache_bytes() if limit is None else limit
+    base = cache_dir()
+    with _evict_lock:
+        entries = []
+        total = 0
+        for body in [*base.glob('*.img'), *base.glob('derived/*.*')]:
+            if body.suffix == '.part':
+                continue
+            try:
+                stat = body.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body))
+            total += stat.st_size
+        if total <= limit:
+            return
+        entries.sort()
+        for _, size, body in entries:
+            if total <= limit:
+                break
+            paths = (body, body.with_suffix('.json')) if body.suffix == '.img' else (body,)
+            for path in paths:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+
+
+def evict_after_write(size):
+    """Catat `size` byte baru di cache dan jalankan evict() jika sudah waktunya."""
+    global _written_since_evict, _last_evict
+    with _evict_state_lock:
+        _written_since_evict += size
+        now = time.monotonic()
+        if _written_since_evict < max_cache_bytes() * EVICT_SLACK and now - _last_evict < EVICT_INTERVAL:
+            return False
+        _written_since_evict = 0
+        _last_evict = now
+    evict()
+    return True
+
+
+def _stream_and_store(url, entry, response):
+    """Teruskan body ke client per chunk sambil menulisnya ke file sementara."""
+    limit = max_image_bytes()
+    fd, tmp_path = tempfile.mkstemp(dir=entry.body_path.parent, suffix='.part')
+    size = 0
+    digest = hashlib.sha256()
+    complete = False
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    return
+                f.write(chunk)
+                digest.update(chunk)
+                yield chunk
+        complete = True
+    finally:
+        response.close()
+        if complete:
+            os.replace(tmp_path, entry.body_path)
+            entry.write_meta(_meta_from_response(url, response, size, digest.hexdigest()))
+            evict_after_write(size)
+        else:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def _cache_headers(response, meta):
+    response['Cache-Control'] = f'public, max-age={max_age()}'
+    if meta.get('etag'):
+        response['ETag'] = meta['etag']
+    if meta.get('last_modified'):
+        response['Last-Modified'] = meta['last_modified']
+    return response
+
+
+def _serve_cached(request, entry):
+    entry.touch()
+    if entry.meta.get('etag') and request.headers.get('If-None-Match') == entry.meta['etag']:
+        return _cache_headers(HttpResponse(status=304), entry.meta)
+    response = FileResponse(open(entry.body_path, 'rb'), content_type=entry.meta['content_type'])
+    response['X-Proxy-Cache'] = 'HIT'
+    return _cache_headers(response, entry.meta)
+
+
+def _serve_variant(request, entry, variant):
+    digest = entry.meta.get('digest') or entry.key
+    target = derived_dir() / variant.filename(digest)
+    rendered = False
+    if not target.exists():
+        try:
+            render_variant(entry.body_path, target, variant)
+        except Image.DecompressionBombError as e:
+            # Jumlah piksel melewati Image.MAX_IMAGE_PIXELS, jangan di-decode
+            return HttpResponse(f'Image too large: {str(e)}', status=413)
+        except (UnidentifiedImageError, OSError, ValueError):
+            # Bukan gambar raster (mis. SVG placeholder), kirim apa adanya
+            return _serve_cached(request, entry)
+        rendered = True
+        try:
+            evict_after_write(target.stat().st_size)
+        except OSError:
+            pass
+
+    etag = f'"{target.stem}"'
+    meta = {'etag': etag}
+    if request.headers.get('If-None-Match') == etag:
+        return _cache_headers(HttpResponse(status=304), meta)
+    try:
+        os.utime(target)
+        response = FileResponse(open(target, 'rb'), content_type=variant.content_type)
+    except FileNotFoundError:
+        # Ter-evict oleh request lain di antara exists() dan open()
+        return _serve_variant(request, entry, variant)
+    response['X-Proxy-Cache'] = 'MISS' if rendered else 'HIT'
+    return _cache_headers(response, meta)
+
+
+def _serve(request, entry, variant):
+    if variant is None:
+        return _serve_cached(request, entry)
+    return _serve_variant(request, entry, variant)
+
+
+def proxy(request, url, variant=None):
+    entry = CacheEntry(cache_key(url))
+    cached = entry.load()
+    if cached and entry.is_fresh:
+        return _serve(request, entry, variant)
+
+    headers = entry.conditional_headers() if cached else {}
+    try:
+        response = get_session().get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+        if cached and response.status_code == 304:
+            response.close()
+            entry.mark_revalidated(response)
+            return _serve(request, entry, variant)
+        response.raise_for_status()
+
+        length = response.headers.get('Content-Length')
+        length = int(length) if length and length.isdigit() else None
+        if length is not None and length > max_image_bytes():
+            response.close()
+            raise ImageTooLarge(f'{length} bytes')
+    except requests.RequestException as e:
+        if cached:
+            # Origin bermasalah, pakai salinan lama yang masih ada
+            return _serve(request, entry, variant)
+        return HttpResponse(f'Error fetching image: {str(e)}', status=500)
+    except ImageTooLarge as e:
+        return HttpResponse(f'Image too large: {str(e)}', status=413)
+
+    if variant is not None or length is None:
+        # Varian butuh body lengkap; tanpa Content-Length ukurannya baru
+        # pasti setelah body habis. Simpan dulu ke cache, baru kirim header
+        for _ in _stream_and_store(url, entry, response):
+            pass
+        if not entry.load():
+            return HttpResponse('Image too large', status=413)
+        if variant is not None:
+            return _serve_variant(request, entry, variant)
+        cached = _serve_cached(request, entry)
+        cached['X-Proxy-Cache'] = 'MISS'
+        return cached
+
+    streaming = StreamingHttpResponse(
+        _stream_and_store(url, entry, response),
+        content_type=response.headers.get('Content-Type', 'image/jpeg'),
+    )
+    # Client bisa mendeteksi body yang terputus di tengah jalan
+    streaming['Content-Length'] = str(length)
+    streaming['X-Proxy-Cache'] = 'MISS'
+    return _cache_headers(streaming, _meta_from_response(url, response, None))
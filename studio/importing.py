@@ -0,0 +1,128 @@
+"""
+Helper bersama untuk command import_studios dan import_studios_simple.
+
+Mode bulk membaca seluruh CSV, mengambil studio yang sudah ada dengan
+beberapa query `nama_studio__in` lalu mengindeksnya per (nama_studio, kota).
+Perubahan diterapkan dengan bulk_create/bulk_update per batch di dalam satu
+transaksi, sehingga biaya query tidak lagi 2-3 per baris.
+"""
+import csv
+from typing import NamedTuple
+
+from django.db import transaction
+
+from studio.catalog import bump_catalog_version
+from studio.models import Studio, KOTA_CHOICES
+from studio.places import StudioRow
+
+CSV_FIELDS = ('area', 'alamat', 'nomor_telepon')
+LOOKUP_BATCH_SIZE = 500
+
+
+def read_studio_csv(csv_file):
+    """
+    Baca CSV dataset studio (baris judul + header lalu data). Mengembalikan
+    (rows, unknown) dengan unknown berisi (nama_studio, wilayah) untuk kota
+    yang tidak ada di KOTA_CHOICES.
+    """
+    city_mapping = {kota: kota for kota, _ in KOTA_CHOICES}
+    rows, unknown = [], []
+    with open(csv_file, 'r', encoding='utf-8-sig') as file:
+        # Skip the first two lines (title + header rows)
+        next(file)
+        next(file)
+
+        for row in csv.reader(file):
+            if len(row) < 5:  # Skip incomplete rows
+                continue
+
+            nama_studio, wilayah, area, alamat, nomor_telepon = [value.strip() for value in row[:5]]
+            # Skip empty rows
+            if not nama_studio or not wilayah:
+                continue
+
+            kota = city_mapping.get(wilayah)
+            if not kota:
+                unknown.append((nama_studio, wilayah))
+                continue
+            rows.append(StudioRow(nama_studio, kota, area, alamat, nomor_telepon))
+    return rows, unknown
+
+
+def index_existing(rows):
+    """Studio yang sudah ada, di-key dengan (nama_studio, kota)."""
+    names = sorted({row.nama_studio for row in rows})
+    index = {}
+    for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+        batch = names[start:start + LOOKUP_BATCH_SIZE]
+        for studio in Studio.objects.filter(nama_studio__in=batch):
+            index.setdefault((studio.nama_studio, studio.kota), studio)
+    return index
+
+
+class UpsertPlan(NamedTuple):
+    to_create: list
+    to_update: list
+    unchanged: list
+    changed_fields: set
+
+
+def plan_upsert(rows, index, values=None, defaults=None):
+    """
+    Bandingkan baris CSV dengan index studio yang ada.
+
+    `values` (opsional) memetakan key baris ke dict field tambahan, mis.
+    hasil enrichment Google Places. `defaults` dipakai saat membuat studio
+    baru untuk field yang tidak ada di CSV.
+    """
+    values = values or {}
+    defaults = defaults or {}
+    latest = {}
+    for row in rows:
+        # Baris duplikat di CSV: yang terakhir menang
+        latest[(row.nama_studio, row.kota)] = row
+
+    plan = UpsertPlan([], [], [], set())
+    for key, row in latest.items():
+        fields = {name: getattr(row, name) for name in CSV_FIELDS}
+        fields.update(values.get(row.key, {}))
+
+        studio = index.get(key)
+        if studio is None:
+            plan.to_create.append(Studio(
+                nama_studio=row.nama_studio, kota=row.kota, **{**defaults, **fields}
+            ))
+            continue
+
+        changed = {name for name, value in fields.items() if getattr(studio, name) != value}
+        if changed:
+            for name in changed:
+                setattr(studio, name, fields[name])
+            plan.to_update.append(studio)
+            plan.changed_fields.update(changed)
+        else:
+            plan.unchanged.append(studio)
+    return plan
+
+
+def apply_plan(plan, batch_size=500):
+    with transaction.atomic():
+        Studio.objects.bulk_create(plan.to_create, batch_size=batch_size)
+        if plan.to_update:
+            Studio.objects.bulk_update(plan.to_update, sorted(plan.changed_fields), batch_size=batch_size)
+    if plan.to_create or plan.to_update:
+        # bulk_create/bulk_update tidak mengirim signal post_save
+        bump_catalog_version()
+
+
+def write_summary(command, plan, verbosity=1):
+    style = command.style
+    command.stdout.write(style.SUCCESS('\n=== Bulk Import Summary ==='))
+    command.stdout.write(style.SUCCESS(f'New: {len(plan.to_create)}'))
+    command.stdout.write(style.SUCCESS(f'Changed: {len(plan.to_update)}'))
+    command.stdout.write(f'Unchanged: {len(plan.unchanged)}')
+    if verbosity > 1:
+        for studio in plan.to_create:
+            command.stdout.write(f'  + {studio.nama_studio} ({studio.kota})')
+        for studio in plan.to_update:
+            command.stdout.write(f'  ~ {studio.nama_studio} ({studio.kota})')
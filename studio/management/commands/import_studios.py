@@ -1,195 +1,200 @@
-import csv
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from studio.importing import apply_plan, index_existing, plan_upsert, read_studio_csv, write_summary
 from studio.models import Studio
+from studio.places import (
+    Checkpoint, EnrichmentPipeline, GooglePlacesClient, OfflinePlacesClient, PlacesCache,
+    PlacesEnricher, TokenBucket, build_query, search_link, DEFAULT_RATING,
+)
 
 class Command(BaseCommand):
-    help = 'Import studios from CSV'
+    help = 'Import studios from CSV and enrich them with Google Places data'
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='Path to CSV file')
+        parser.add_argument('--update', action='store_true', help='Update existing studios that are missing thumbnail or gmaps_link')
+        parser.add_argument('--workers', type=int, default=4, help='Number of concurrent Places lookups')
+        parser.add_argument('--rate', type=float, default=5.0, help='Max Places requests per second, shared by all workers (0 = unlimited)')
+        parser.add_argument('--retries', type=int, default=3, help='Retries per Places request before giving up')
+        parser.add_argument('--backoff', type=float, default=1.0, help='Initial retry delay in seconds, doubled on each retry')
+        parser.add_argument('--checkpoint', type=str, help='Checkpoint file (default: <csv_file>.checkpoint.jsonl)')
+        parser.add_argument('--bulk', action='store_true', help='Upsert all rows with bulk_create/bulk_update in one transaction')
+        parser.add_argument('--batch-size', type=int, default=500, help='Batch size for --bulk writes')
+        parser.add_argument('--places-cache', type=str, default=str(settings.PLACES_CACHE_PATH), help='SQLite file caching Places lookups between runs')
+        parser.add_argument('--places-cache-ttl', type=float, default=settings.PLACES_CACHE_TTL_DAYS, help='Days before a cached Places lookup is fetched again')
+        parser.add_argument('--no-places-cache', action='store_true', help='Always ask Google Places, ignore the lookup cache')
+        parser.add_argument('--offline', action='store_true', help='Use only the Places lookup cache, never call Google')
+        parser.add_argument('--dry-run', action='store_true', help='Show the bulk import summary without writing to the database')
+
+    def get_places_client(self, api_key):
+        return GooglePlacesClient(api_key)
+
+    def read_rows(self, csv_file):
+        rows, unknown = read_studio_csv(csv_file)
+        for nama_studio, wilayah in unknown:
+            self.stdout.write(
+                self.style.WARNING(f'Unknown city: {wilayah} for studio {nama_studio}. Skipping.')
+            )
+        self.skipped_count += len(unknown)
+        return rows
+
+    def build_pipeline(self, options):
+        checkpoint = Checkpoint(options['checkpoint'] or f"{options['csv_file']}.checkpoint.jsonl")
+        cache = None
+        if not options['no_places_cache']:
+            cache = PlacesCache(options['places_cache'], options['places_cache_ttl'] * 24 * 60 * 60)
+        if options['offline']:
+            client = OfflinePlacesClient()
+        else:
+            client = self.get_places_client(settings.GMAPS_API_KEY)
+        enricher = PlacesEnricher(
+            client,
+            TokenBucket(options['rate']),
+            retries=options['retries'],
+            backoff=options['backoff'],
+            log=lambda message: self.stdout.write(self.style.WARNING(message)),
+            cache=cache,
+        )
+        return EnrichmentPipeline(enricher, workers=options['workers'], checkpoint=checkpoint)
 
     def handle(self, *args, **options):
-        csv_file = options['csv_file']
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                nama_studio = row['Nama Studio']
-                kota = row['Wilayah Utama']
-                area = row['Area Spesifik']
-                if kota in ['Jakarta', 'Bogor', 'Depok', 'Tangerang', 'Bekasi']:
-                    Studio.objects.get_or_create(
-                        nama_studio=nama_studio,
-                        defaults={'kota': kota, 'area': area}
-                    )
-                    self.stdout.write(self.style.SUCCESS(f'Imported {nama_studio}'))
-                else:
-                    self.stdout.write(self.style.WARNING(f'Skipped {nama_studio} - invalid kota'))
-        self.stdout.write(self.style.SUCCESS('Import completed'))
-        
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            # Skip the first two lines (header rows)
-            next(file)
-            next(file)
-            
-            csv_reader = csv.reader(file)
-            
-            for row in csv_reader:
-                if len(row) < 5:  # Skip incomplete rows
-                    continue
-                    
-                nama_studio = row[0].strip()
-                wilayah = row[1].strip()
-                area = row[2].strip()
-                alamat = row[3].strip()
-                nomor_telepon = row[4].strip()
-                
-                # Skip empty rows
-                if not nama_studio or not wilayah:
-                    continue
-                
-                # Map city name
-                kota = city_mapping.get(wilayah)
-                if not kota:
-                    self.stdout.write(
-                        self.style.WARNING(f'Unknown city: {wilayah} for studio {nama_studio}. Skipping.')
-                    )
-                    skipped_count += 1
-                    continue
-                
-                # Check if studio already exists
-                try:
-                    existing_studio = Studio.objects.filter(nama_studio=nama_studio, kota=kota).first()
-                    
-                    if existing_studio:
-                        if options['update']:
-                            # Check if both thumbnail and gmaps_link are already populated
-                            if existing_studio.thumbnail and existing_studio.gmaps_link:
-                                self.stdout.write(
-                                    self.style.WARNING(f'Studio "{nama_studio}" in {kota} already has complete data. Skipping.')
-                                )
-                                skipped_count += 1
-                                continue
-                            
-                            # Update existing studio
-                            existing_studio.area = area
-                            existing_studio.alamat = alamat
-                            existing_studio.nomor_telepon = nomor_telepon
-                            
-                            # Fetch Google Places data only if missing
-                            if not existing_studio.thumbnail or not existing_studio.gmaps_link:
-                                thumbnail_url, gmaps_link, rating = self.fetch_place_data(
-                                    gmaps, api_key, nama_studio, kota, area
-                                )
-                                existing_studio.thumbnail = thumbnail_url
-                                existing_studio.gmaps_link = gmaps_link
-                                existing_studio.rating = rating
-                                time.sleep(1)  # Rate limiting
-                            
-                            existing_studio.save()
-                            updated_count += 1
-                            self.stdout.write(
-                                self.style.SUCCESS(f'[UPDATE] Updated: {nama_studio} ({kota})')
-                            )
-                        else:
-                            self.stdout.write(
-                                self.style.WARNING(f'Studio "{nama_studio}" in {kota} already exists. Skipping.')
-                            )
-                            skipped_count += 1
-                    else:
-                        # Fetch Google Places data for new studio
-                        thumbnail_url, gmaps_link, rating = self.fetch_place_data(
-                            gmaps, api_key, nama_studio, kota, area
-                        )
-                        time.sleep(1)  # Rate limiting
-                        
-                        # Create new studio
-                        Studio.objects.create(
-                            nama_studio=nama_studio,
-                            kota=kota,
-                            area=area,
-                            alamat=alamat,
-                            nomor_telepon=nomor_telepon,
-                            thumbnail=thumbnail_url,
-                            gmaps_link=gmaps_link,
-                            rating=rating,
-                        )
-                        imported_count += 1
-                        self.stdout.write(
-                            self.style.SUCCESS(f'✓ Imported: {nama_studio} ({kota})')
-                        )
-                        
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'Error processing {nama_studio}: {str(e)}')
-                    )
-                    skipped_count += 1
-        
-        # Summary
-        self.stdout.write(self.style.SUCCESS(f'\n=== Import Complete ==='))
-        self.stdout.write(self.style.SUCCESS(f'Successfully imported: {imported_count} studios'))
-        if updated_count > 0:
-            self.stdout.write(self.style.SUCCESS(f'Successfully updated: {updated_count} studios'))
-        if skipped_count > 0:
-            self.stdout.write(self.style.WARNING(f'Skipped: {skipped_count} studios'))
-    
-    def fetch_place_data(self, gmaps, api_key, nama_studio, kota, area):
-        """
-        Fetch thumbnail, Google Maps link, and rating for a studio using Google Places API
-        """
-        placeholder_image = "https://upload.wikimedia.org/wikipedia/commons/a/ac/No_image_available.svg"
-        rating = 5.0
-        
-        try:
-            # Search query for better accuracy
-            query = f"{nama_studio} pilates yoga {kota} Indonesia"
-            
-            # Find place using Places API
-            places_result = gmaps.places(query=query)
-            
-            if places_result['status'] == 'OK' and places_result['results']:
-                place = places_result['results'][0]
-                place_id = place.get('place_id')
-                rating = place.get('rating', 5.0)
-                
-                thumbnail_url = placeholder_image
-                gmaps_link = f"https://www.google.com/maps/search/?api=1&query={query.replace(' ', '+')}"
-                
-                # Get photo from initial result
-                if 'photos' in place and place['photos']:
-                    photo_reference = place['photos'][0]['photo_reference']
-                    # Construct photo URL to download the image
-                    photo_api_url = f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=400&photo_reference={photo_reference}&key={api_key}"
-                    
-                    # Download the image and convert to a hosted URL (not API URL)
-                    try:
-                        response = requests.get(photo_api_url, timeout=10)
-                        if response.status_code == 200:
-                            # Use the final redirected URL (Google's CDN URL without API key)
-                            thumbnail_url = response.url
-                            self.stdout.write(self.style.SUCCESS(f'    -> Downloaded photo from Google CDN'))
-                    except Exception as e:
-                        self.stdout.write(self.style.WARNING(f'    -> Failed to download photo: {str(e)}'))
-                
-                # Get place details for Google Maps URL
-                place_details = gmaps.place(place_id=place_id, fields=['url'])
-                
-                # Get Google Maps link
-                if place_details['status'] == 'OK' and 'url' in place_details['result']:
-                    gmaps_link = place_details['result']['url']
-                
+        if not settings.GMAPS_API_KEY and not options['offline']:
+            raise CommandError('GMAPS_API_KEY is not set (use --offline to import from the Places cache only)')
+
+        self.imported_count = 0
+        self.updated_count = 0
+        self.skipped_count = 0
+        failed_count = 0
+
+        rows = self.read_rows(options['csv_file'])
+        if options['bulk'] or options['dry_run']:
+            return self.handle_bulk(rows, options)
+
+        # Tentukan baris yang perlu lookup ke Google Places
+        to_enrich = []
+        existing = {}
+        for row in rows:
+            studio = Studio.objects.filter(nama_studio=row.nama_studio, kota=row.kota).first()
+            if studio is None:
+                to_enrich.append(row)
+            elif not options['update']:
+                self.stdout.write(
+                    self.style.WARNING(f'Studio "{row.nama_studio}" in {row.kota} already exists. Skipping.')
+                )
+                self.skipped_count += 1
+            elif studio.thumbnail and studio.gmaps_link:
                 self.stdout.write(
-                    self.style.SUCCESS(f'  -> Found place data for {nama_studio} (Rating: {rating})')
+                    self.style.WARNING(f'Studio "{row.nama_studio}" in {row.kota} already has complete data. Skipping.')
                 )
-                return thumbnail_url, gmaps_link, rating
+                self.skipped_count += 1
             else:
+                existing[row.key] = studio
+                to_enrich.append(row)
+
+        pipeline = self.build_pipeline(options)
+        checkpoint = pipeline.checkpoint
+
+        total = len(to_enrich)
+        for done, (row, place, error) in enumerate(pipeline.run(to_enrich), start=1):
+            studio = existing.get(row.key)
+            if error is not None:
+                # Data lama dipertahankan; thumbnail yang kosong membuat
+                # --update berikutnya mencoba lookup lagi
                 self.stdout.write(
-                    self.style.WARNING(f'  -> Place not found for {nama_studio}, using placeholder')
+                    self.style.WARNING(f'  -> Error fetching place data for {row.nama_studio}: {error}')
                 )
-                return placeholder_image, f"https://www.google.com/maps/search/?api=1&query={query.replace(' ', '+')}", rating
-                
-        except Exception as e:
-            self.stdout.write(
-                self.style.WARNING(f'  -> Error fetching place data for {nama_studio}: {str(e)}')
+                failed_count += 1
+                thumbnail_url = studio.thumbnail if studio else None
+                gmaps_link = (studio and studio.gmaps_link) or search_link(build_query(row.nama_studio, row.kota))
+                rating = studio.rating if studio else DEFAULT_RATING
+            else:
+                thumbnail_url, gmaps_link, rating = place
+
+            try:
+                self.save_studio(row, studio, thumbnail_url, gmaps_link, rating)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'Error processing {row.nama_studio}: {str(e)}')
+                )
+                self.skipped_count += 1
+                continue
+
+            if error is None:
+                checkpoint.record(row.key, place)
+            self.stdout.write(f'[{done}/{total}] {row.nama_studio} ({row.kota})')
+
+        checkpoint.clear()
+
+        # Summary
+        self.stdout.write(self.style.SUCCESS(f'\n=== Import Complete ==='))
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported: {self.imported_count} studios'))
+        if self.updated_count > 0:
+            self.stdout.write(self.style.SUCCESS(f'Successfully updated: {self.updated_count} studios'))
+        if self.skipped_count > 0:
+            self.stdout.write(self.style.WARNING(f'Skipped: {self.skipped_count} studios'))
+        if failed_count > 0:
+            self.stdout.write(self.style.WARNING(f'Places lookup failed: {failed_count} studios (re-run with --update to retry)'))
+
+    def handle_bulk(self, rows, options):
+        index = index_existing(rows)
+        to_enrich = []
+        for row in rows:
+            studio = index.get((row.nama_studio, row.kota))
+            if studio is None or (options['update'] and not (studio.thumbnail and studio.gmaps_link)):
+                to_enrich.append(row)
+
+        pipeline = self.build_pipeline(options)
+        values = {}
+        failed_count = 0
+        for done, (row, place, error) in enumerate(pipeline.run(to_enrich), start=1):
+            if error is not None:
+                self.stdout.write(
+                    self.style.WARNING(f'  -> Error fetching place data for {row.nama_studio}: {error}')
+                )
+                failed_count += 1
+                if (row.nama_studio, row.kota) not in index:
+                    values[row.key] = {'gmaps_link': search_link(build_query(row.nama_studio, row.kota))}
+                continue
+            # Dicatat sebelum tulis ke DB supaya lookup tidak diulang jika import terputus
+            if not options['dry_run']:
+                pipeline.checkpoint.record(row.key, place)
+            values[row.key] = place._asdict()
+            self.stdout.write(f'[{done}/{len(to_enrich)}] {row.nama_studio} ({row.kota})')
+
+        plan = plan_upsert(rows, index, values, defaults={'rating': DEFAULT_RATING})
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: no changes written'))
+        else:
+            apply_plan(plan, batch_size=options['batch_size'])
+            pipeline.checkpoint.clear()
+
+        write_summary(self, plan, options['verbosity'])
+        if self.skipped_count > 0:
+            self.stdout.write(self.style.WARNING(f'Skipped: {self.skipped_count} studios'))
+        if failed_count > 0:
+            self.stdout.write(self.style.WARNING(f'Places lookup failed: {failed_count} studios (re-run with --update to retry)'))
+
+    def save_studio(self, row, studio, thumbnail_url, gmaps_link, rating):
+        if studio is not None:
+            studio.area = row.area
+            studio.alamat = row.alamat
+            studio.nomor_telepon = row.nomor_telepon
+            studio.thumbnail = thumbnail_url
+            studio.gmaps_link = gmaps_link
+            studio.rating = rating
+            studio.save()
+            self.updated_count += 1
+            self.stdout.write(self.style.SUCCESS(f'[UPDATE] Updated: {row.nama_studio} ({row.kota})'))
+        else:
+            Studio.objects.create(
+                nama_studio=row.nama_studio,
+                kota=row.kota,
+                area=row.area,
+                alamat=row.alamat,
+                nomor_telepon=row.nomor_telepon,
+                thumbnail=thumbnail_url,
+                gmaps_link=gmaps_link,
+                rating=rating,
             )
-            query = f"{nama_studio} {kota} Indonesia"
-            return placeholder_image, f"https://www.google.com/maps/search/?api=1&query={query.replace(' ', '+')}", rating
+            self.imported_count += 1
+            self.stdout.write(self.style.SUCCESS(f'✓ Imported: {row.nama_studio} ({row.kota})'))
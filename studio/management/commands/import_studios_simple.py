@@ -1,5 +1,6 @@
 import csv
 from django.core.management.base import BaseCommand
+from studio.importing import apply_plan, index_existing, plan_upsert, read_studio_csv, write_summary
 from studio.models import Studio
 
 class Command(BaseCommand):
@@ -7,9 +8,14 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='Path to CSV file')
+        parser.add_argument('--bulk', action='store_true', help='Upsert all rows with bulk_create/bulk_update in one transaction')
+        parser.add_argument('--batch-size', type=int, default=500, help='Batch size for --bulk writes')
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
+        if options['bulk']:
+            return self.handle_bulk(csv_file, options['batch_size'], options['verbosity'])
+
         with open(csv_file, 'r', encoding='utf-8') as file:
             lines = file.readlines()
             # Skip first line
@@ -28,4 +34,14 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.SUCCESS(f'Imported {nama_studio}'))
                 else:
                     self.stdout.write(self.style.WARNING(f'Skipped {nama_studio} - invalid kota'))
-        self.stdout.write(self.style.SUCCESS('Import completed'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Import completed'))
+
+    def handle_bulk(self, csv_file, batch_size, verbosity):
+        rows, unknown = read_studio_csv(csv_file)
+        for nama_studio, _ in unknown:
+            self.stdout.write(self.style.WARNING(f'Skipped {nama_studio} - invalid kota'))
+
+        plan = plan_upsert(rows, index_existing(rows), defaults={'rating': 0.0})
+        apply_plan(plan, batch_size=batch_size)
+        write_summary(self, plan, verbosity)
+        self.stdout.write(self.style.SUCCESS('Import completed'))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0005_alter_studio_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studio',
+            index=models.Index(fields=['kota'], name='studio_kota_idx'),
+        ),
+    ]
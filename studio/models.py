@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.contenttypes.fields import GenericRelation
 import uuid
 from django.contrib.auth.models import User
 
@@ -22,6 +23,12 @@ class Studio(models.Model):
     gmaps_link = models.URLField(max_length=500, blank=True, null=True)
     nomor_telepon = models.CharField(max_length=20)
     rating = models.FloatField()
+    bookmarks = GenericRelation('bookmarks.Bookmark')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kota'], name='studio_kota_idx'),
+        ]
 
     def __str__(self):
         return self.nama_studio
\ No newline at end of file
@@ -0,0 +1,313 @@
+"""
+Enrichment data studio dari Google Places untuk command import_studios.
+
+Lookup dijalankan oleh thread pool berukuran tetap. Semua worker berbagi
+satu TokenBucket sehingga total request ke Google tetap di bawah rate yang
+ditentukan, berapapun jumlah worker. Request yang gagal di-retry dengan
+exponential backoff, dan hasil yang sudah tersimpan dicatat di file
+checkpoint (JSON lines) supaya import yang terputus bisa dilanjutkan.
+
+Hasil lookup juga disimpan di PlacesCache (SQLite) per query yang sudah
+dinormalisasi, sehingga re-import, dry run dan CI tidak perlu memanggil
+Google lagi untuk studio yang sudah pernah ditemukan.
+"""
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import NamedTuple
+
+import requests
+
+PLACEHOLDER_IMAGE = "https://upload.wikimedia.org/wikipedia/commons/a/ac/No_image_available.svg"
+DEFAULT_RATING = 5.0
+
+
+class PlaceData(NamedTuple):
+    thumbnail: str
+    gmaps_link: str
+    rating: float
+
+
+class StudioRow(NamedTuple):
+    nama_studio: str
+    kota: str
+    area: str
+    alamat: str
+    nomor_telepon: str
+
+    @property
+    def key(self):
+        return f'{self.nama_studio}|{self.kota}'
+
+
+class LookupFailed(Exception):
+    pass
+
+
+class PlacesOffline(Exception):
+    """Lookup ke jaringan tidak diizinkan (mode --offline)."""
+
+
+def build_query(nama_studio, kota):
+    return f"{nama_studio} pilates yoga {kota} Indonesia"
+
+
+def normalize_query(query):
+    return re.sub(r'\s+', ' ', query).strip().lower()
+
+
+def search_link(query):
+    return f"https://www.google.com/maps/search/?api=1&query={query.replace(' ', '+')}"
+
+
+class TokenBucket:
+    """Rate limiter thread-safe: `rate` token per detik, burst maksimal `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            self.sleep(delay)
+
+
+class GooglePlacesClient:
+    """Adapter tipis di atas googlemaps.Client + download foto."""
+
+    def __init__(self, api_key, timeout=10):
+        import googlemaps
+
+        self.api_key = api_key
+        self.timeout = timeout
+        self.gmaps = googlemaps.Client(key=api_key, timeout=timeout)
+        self.session = requests.Session()
+
+    def places(self, query):
+        return self.gmaps.places(query=query)
+
+    def place(self, place_id):
+        return self.gmaps.place(place_id=place_id, fields=['url'])
+
+    def photo_url(self, photo_reference):
+        # Ikuti redirect dan pakai URL CDN Google (tanpa API key)
+        url = (
+            "https://maps.googleapis.com/maps/api/place/photo"
+            f"?maxwidth=400&photo_reference={photo_reference}&key={self.api_key}"
+        )
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        response.close()
+        return response.url
+
+
+class OfflinePlacesClient:
+    """Client pengganti saat --offline: semua lookup ke Google ditolak."""
+
+    def places(self, query):
+        raise PlacesOffline('offline mode, place not in cache')
+
+    place = photo_url = places
+
+
+class PlacesCache:
+    """Cache hasil fetch_place_data di file SQLite, dengan TTL per entry."""
+
+    def __init__(self, path, ttl, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS places ('
+                ' query TEXT PRIMARY KEY, thumbnail TEXT, gmaps_link TEXT,'
+                ' rating REAL, fetched_at REAL)'
+            )
+
+    def get(self, query):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT thumbnail, gmaps_link, rating, fetched_at FROM places WHERE query = ?',
+                (normalize_query(query),),
+            ).fetchone()
+        if row is None or (self.ttl is not None and self.clock() - row[3] > self.ttl):
+            return None
+        return PlaceData(*row[:3])
+
+    def set(self, query, data):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?)',
+                (normalize_query(query), *data, self.clock()),
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class PlacesEnricher:
+    """fetch_place_data versi thread-safe dengan rate limit dan retry."""
+
+    def __init__(self, client, limiter, retries=3, backoff=1.0, sleep=time.sleep, log=None, cache=None):
+        self.client = client
+        self.limiter = limiter
+        self.cache = cache
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.log = log or (lambda message: None)
+
+    def call(self, fn, *args):
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                return fn(*args)
+            except PlacesOffline as e:
+                raise LookupFailed(str(e)) from e
+            except Exception as e:
+                if attempt == self.retries:
+                    raise LookupFailed(str(e)) from e
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+                self.log(f'  -> Retry {attempt + 1}/{self.retries} in {delay:.1f}s: {e}')
+                self.sleep(delay)
+
+    def fetch_place_data(self, nama_studio, kota, area):
+        query = build_query(nama_studio, kota)
+        if self.cache is not None:
+            cached = self.cache.get(query)
+            if cached is not None:
+                return cached
+
+        data, complete = self._fetch(query, nama_studio)
+        if self.cache is not None and complete:
+            self.cache.set(query, data)
+        return data
+
+    def _fetch(self, query, nama_studio):
+        places_result = self.call(self.client.places, query)
+
+        if places_result.get('status') != 'OK' or not places_result.get('results'):
+            return PlaceData(PLACEHOLDER_IMAGE, search_link(query), DEFAULT_RATING), True
+
+        place = places_result['results'][0]
+        rating = place.get('rating', DEFAULT_RATING)
+        thumbnail_url = PLACEHOLDER_IMAGE
+        gmaps_link = search_link(query)
+        complete = True
+
+        if place.get('photos'):
+            try:
+                thumbnail_url = self.call(self.client.photo_url, place['photos'][0]['photo_reference'])
+            except LookupFailed as e:
+                # Hasil tanpa foto tidak di-cache supaya foto dicoba lagi nanti
+                complete = False
+                self.log(f'    -> Failed to download photo for {nama_studio}: {e}')
+
+        place_details = self.call(self.client.place, place.get('place_id'))
+        if place_details.get('status') == 'OK' and 'url' in place_details.get('result', {}):
+            gmaps_link = place_details['result']['url']
+
+        return PlaceData(thumbnail_url, gmaps_link, rating), complete
+
+
+class Checkpoint:
+    """Catatan baris yang sudah selesai, satu objek JSON per baris."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def load(self):
+        done = {}
+        if not self.path.exists():
+            return done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    done[record['key']] = PlaceData(*record['data'])
+                except (ValueError, KeyError, TypeError):
+                    # Baris terakhir bisa terpotong kalau proses mati saat menulis
+                    continue
+        return done
+
+    def record(self, key, data):
+        line = json.dumps({'key': key, 'data': list(data)})
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class EnrichmentPipeline:
+    """
+    Jalankan enricher.fetch_place_data untuk setiap StudioRow dengan paling
+    banyak `workers` lookup paralel. Hasil di-yield sesuai urutan selesai
+    sebagai (row, PlaceData atau None, error atau None); baris yang sudah
+    ada di checkpoint langsung di-yield tanpa request ke Google.
+    """
+
+    def __init__(self, enricher, workers=4, checkpoint=None):
+        self.enricher = enricher
+        self.workers = max(1, workers)
+        self.checkpoint = checkpoint
+
+    def _lookup(self, row):
+        try:
+            return row, self.enricher.fetch_place_data(row.nama_studio, row.kota, row.area), None
+        except LookupFailed as e:
+            return row, None, e
+
+    def run(self, rows):
+        done = self.checkpoint.load() if self.checkpoint else {}
+        pending = []
+        for row in rows:
+            if row.key in done:
+                yield row, done[row.key], None
+            else:
+                pending.append(row)
+
+        # Jumlah future yang menunggu dibatasi supaya memori tidak tumbuh
+        # sebanding dengan ukuran CSV.
+        window = self.workers * 2
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        in_flight = set()
+        try:
+            for row in pending:
+                in_flight.add(executor.submit(self._lookup, row))
+                if len(in_flight) >= window:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        yield future.result()
+            for future in as_completed(in_flight):
+                yield future.result()
+        finally:
+            # Kalau import dihentikan, lookup yang belum jalan dibatalkan
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from studio.catalog import bump_catalog_version
+from studio.models import Studio
+
+
+@receiver(post_save, sender=Studio)
+@receiver(post_delete, sender=Studio)
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog_version()
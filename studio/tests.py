@@ -3,9 +3,29 @@ from django.urls import reverse
 from django.contrib.auth.models import User
 from studio.models import Studio, KOTA_CHOICES
 from studio.forms import StudioForm
+from studio.catalog import CATALOG_STATS_KEYS, build_catalog, catalog_cache_stats, reset_catalog_cache_stats
+from django.core.cache import cache
 from users.models import UserProfile
+import csv
 import uuid
 import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.test import override_settings
+from studio import image_proxy
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from studio.places import (
+    Checkpoint, EnrichmentPipeline, PlaceData, PlacesCache, PlacesEnricher, StudioRow, TokenBucket,
+    PLACEHOLDER_IMAGE,
+)
+from io import BytesIO, StringIO
+from PIL import Image
 
 class StudioModelTest(TestCase):
     # Test case untuk models Studio
@@ -102,6 +122,7 @@ class StudioViewTest(TestCase):
 
     def setUp(self):
         # Set up test client dan test data
+        cache.clear()
         self.client = Client()
         
         # Buat user reguler
@@ -395,3 +416,694 @@ class StudioURLTest(TestCase):
         test_id = uuid.uuid4()
         url = reverse('studio:delete_studio', kwargs={'id': test_id})
         self.assertEqual(url, f'/studio/delete/{test_id}/')
+
+
+class StudioCatalogTest(TestCase):
+    # Test case untuk studio.catalog (show_json dengan satu query)
+
+    def setUp(self):
+        cache.clear()
+
+    def _create_studios(self, cities, per_city):
+        Studio.objects.bulk_create([
+            Studio(
+                nama_studio=f"{city} Studio {i:03d}",
+                kota=city,
+                area="Area",
+                alamat="Jl. Test",
+                nomor_telepon="081234567890",
+                rating=4.5,
+            )
+            for city in cities for i in range(per_city)
+        ])
+
+    def test_catalog_groups_and_orders_studios(self):
+        self._create_studios(['Jakarta', 'Depok'], 3)
+        data = build_catalog('Depok')
+
+        names = [city['name'] for city in data['cities']]
+        self.assertEqual(names, ['Depok', 'Jakarta', 'Bogor', 'Tangerang', 'Bekasi'])
+        self.assertTrue(data['cities'][0]['is_user_city'])
+        self.assertEqual(
+            [s['nama_studio'] for s in data['cities'][0]['studios']],
+            ['Depok Studio 000', 'Depok Studio 001', 'Depok Studio 002'],
+        )
+        self.assertEqual(data['cities'][2]['studios'], [])
+
+    def test_catalog_unknown_user_kota_listed_first(self):
+        data = build_catalog('Bandung')
+        self.assertEqual(data['cities'][0], {'name': 'Bandung', 'is_user_city': True, 'studios': []})
+        self.assertEqual(len(data['cities']), len(KOTA_CHOICES) + 1)
+
+    def test_catalog_query_count_is_constant(self):
+        # Benchmark jumlah query: tetap satu query walau kota dan studio bertambah
+        for n_cities, per_city in [(5, 1), (20, 10), (80, 25)]:
+            cities = [f"Kota{i}" for i in range(n_cities)]
+            Studio.objects.all().delete()
+            self._create_studios(cities, per_city)
+            with self.assertNumQueries(1):
+                data = build_catalog(cities[0], cities=cities)
+            self.assertEqual(len(data['cities']), n_cities)
+            self.assertEqual(sum(len(c['studios']) for c in data['cities']), n_cities * per_city)
+
+    def test_show_json_query_count(self):
+        self._create_studios([kota for kota, _ in KOTA_CHOICES], 20)
+        user = User.objects.create_user(username='catalog', password='testpass123')
+        UserProfile.objects.create(user=user, kota='Bekasi')
+        self.client.force_login(user)
+
+        # session + user + profile + studio
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('studio:show_json'))
+        data = json.loads(response.content)
+        self.assertEqual(data['user_kota'], 'Bekasi')
+        self.assertEqual(data['cities'][0]['name'], 'Bekasi')
+        self.assertEqual(len(data['cities'][0]['studios']), 20)
+
+
+class StudioCatalogCacheTest(TestCase):
+    # Test case untuk cache katalog yang di-invalidate lewat signal
+
+    def setUp(self):
+        cache.clear()
+        reset_catalog_cache_stats()
+        self.studio = Studio.objects.create(
+            nama_studio="Cached Studio",
+            kota="Jakarta",
+            area="Kemang",
+            alamat="Jl. Cache",
+            nomor_telepon="081234567890",
+            rating=4.0,
+        )
+        self.admin_user = User.objects.create_superuser(
+            username='admin', password='adminpass123', email='admin@test.com'
+        )
+
+    def _jakarta_studios(self):
+        data = json.loads(self.client.get(reverse('studio:show_json')).content)
+        jakarta = next(city for city in data['cities'] if city['name'] == 'Jakarta')
+        return [s['nama_studio'] for s in jakarta['studios']]
+
+    def test_second_request_served_from_cache(self):
+        self.client.get(reverse('studio:show_json'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('studio:show_json'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        stats = catalog_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+        # Counter ada di cache bersama, bukan di memori worker
+        self.assertEqual(cache.get(CATALOG_STATS_KEYS['hits']), 1)
+        self.assertEqual(cache.get(CATALOG_STATS_KEYS['misses']), 1)
+
+    def test_variants_cached_per_user_kota(self):
+        user = User.objects.create_user(username='bogor', password='testpass123')
+        UserProfile.objects.create(user=user, kota='Bogor')
+        self.client.get(reverse('studio:show_json'))
+        self.client.force_login(user)
+        data = json.loads(self.client.get(reverse('studio:show_json')).content)
+        self.assertEqual(data['cities'][0]['name'], 'Bogor')
+        self.assertEqual(catalog_cache_stats()['misses'], 2)
+
+    def test_save_invalidates_cache(self):
+        self.assertEqual(self._jakarta_studios(), ['Cached Studio'])
+        self.studio.nama_studio = "Renamed Studio"
+        self.studio.save()
+        self.assertEqual(self._jakarta_studios(), ['Renamed Studio'])
+
+    def test_delete_invalidates_cache(self):
+        self.assertEqual(self._jakarta_studios(), ['Cached Studio'])
+        self.studio.delete()
+        self.assertEqual(self._jakarta_studios(), [])
+
+    def test_flutter_create_invalidates_cache(self):
+        self.assertEqual(self._jakarta_studios(), ['Cached Studio'])
+        self.client.force_login(self.admin_user)
+        self.client.post(
+            reverse('studio:create_studio_flutter'),
+            data=json.dumps({
+                'nama_studio': 'Another Studio', 'kota': 'Jakarta', 'area': 'Kuningan',
+                'alamat': 'Jl. Baru', 'nomor_telepon': '081111111111',
+            }),
+            content_type='application/json',
+        )
+        self.client.logout()
+        self.assertEqual(self._jakarta_studios(), ['Another Studio', 'Cached Studio'])
+
+    def test_cache_stats_requires_admin(self):
+        response = self.client.get(reverse('studio:catalog_cache_stats'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse('studio:catalog_cache_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_ratio', json.loads(response.content))
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    # Origin palsu untuk test proxy_image
+    images = {}
+    hits = []
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get('If-None-Match')))
+        body = self.images.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = f'"{len(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        if not self.path.startswith('/nolength/'):
+            self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ImageOriginTestCase(TestCase):
+    # Base test case: server HTTP lokal sebagai origin + direktori cache sementara
+    images = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _ImageHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(IMAGE_PROXY_CACHE_DIR=self.tmp.name)
+        self.settings_override.enable()
+        _ImageHandler.images = dict(self.images)
+        _ImageHandler.hits = []
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def _get(self, path, headers=None, **params):
+        return self.client.get(
+            reverse('studio:proxy_image'), {'url': self.base_url + path, **params},
+            headers=headers,
+        )
+
+
+class ProxyImageTest(ImageOriginTestCase):
+    # Test case untuk proxy_image dengan server HTTP lokal
+    images = {
+        '/a.png': b'A' * 5000,
+        '/b.png': b'B' * 5000,
+        '/c.png': b'C' * 5000,
+        '/nolength/a.png': b'A' * 5000,
+    }
+
+    def test_missing_or_invalid_url(self):
+        self.assertEqual(self.client.get(reverse('studio:proxy_image')).status_code, 400)
+        response = self.client.get(reverse('studio:proxy_image'), {'url': 'file:///etc/passwd'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_miss_streams_then_hit_served_from_disk(self):
+        response = self._get('/a.png')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['X-Proxy-Cache'], 'MISS')
+        self.assertEqual(b''.join(response.streaming_content), b'A' * 5000)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self._get('/a.png')
+        self.assertEqual(response['X-Proxy-Cache'], 'HIT')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(b''.join(response.streaming_content), b'A' * 5000)
+        response.close()
+        self.assertEqual(len(_ImageHandler.hits), 1)
+
+    def test_client_etag_returns_not_modified(self):
+        b''.join(self._get('/a.png').streaming_content)
+        response = self._get('/a.png', headers={'If-None-Match': '"5000"'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_entry_is_revalidated(self):
+        b''.join(self._get('/a.png').streaming_content)
+        with override_settings(IMAGE_PROXY_MAX_AGE=0):
+            response = self._get('/a.png')
+            self.assertEqual(response['X-Proxy-Cache'], 'HIT')
+            self.assertEqual(b''.join(response.streaming_content), b'A' * 5000)
+            response.close()
+        self.assertEqual(_ImageHandler.hits[-1], ('/a.png', '"5000"'))
+
+    def test_upstream_error(self):
+        response = self._get('/missing.png')
+        self.assertEqual(response.status_code, 500)
+
+    @override_settings(IMAGE_PROXY_MAX_BYTES=1000)
+    def test_image_too_large(self):
+        response = self._get('/a.png')
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(list(os.scandir(self.tmp.name)), [])
+
+    @override_settings(IMAGE_PROXY_MAX_BYTES=1000)
+    def test_image_too_large_without_content_length(self):
+        response = self._get('/nolength/a.png')
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual([e.name for e in os.scandir(self.tmp.name)], [])
+
+    def test_without_content_length_stored_before_sending(self):
+        response = self._get('/nolength/a.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Proxy-Cache'], 'MISS')
+        self.assertEqual(b''.join(response.streaming_content), b'A' * 5000)
+        response.close()
+        self.assertEqual(self._get('/nolength/a.png')['X-Proxy-Cache'], 'HIT')
+
+    def test_evict_scan_is_throttled(self):
+        with mock.patch.object(image_proxy, 'evict') as evict:
+            image_proxy._last_evict = time.monotonic()
+            image_proxy._written_since_evict = 0
+            for path in ['/a.png', '/b.png', '/c.png']:
+                b''.join(self._get(path).streaming_content)
+            self.assertEqual(evict.call_count, 0)
+            image_proxy._last_evict = 0.0
+            b''.join(self._get('/nolength/a.png').streaming_content)
+            self.assertEqual(evict.call_count, 1)
+
+    @override_settings(IMAGE_PROXY_CACHE_MAX_BYTES=12000)
+    def test_lru_eviction(self):
+        for path in ['/a.png', '/b.png']:
+            b''.join(self._get(path).streaming_content)
+            time.sleep(0.01)
+        # Akses a.png supaya b.png menjadi yang paling lama tidak dipakai
+        self._get('/a.png').close()
+        time.sleep(0.01)
+        b''.join(self._get('/c.png').streaming_content)
+
+        cached = {image_proxy.CacheEntry(image_proxy.cache_key(self.base_url + p)).load()
+                  for p in ['/a.png', '/c.png']}
+        self.assertEqual(cached, {True})
+        b_entry = image_proxy.CacheEntry(image_proxy.cache_key(self.base_url + '/b.png'))
+        self.assertFalse(b_entry.load())
+
+
+def _png_bytes(size):
+    buffer = BytesIO()
+    Image.new('RGBA', size, (255, 0, 0, 255)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ProxyImageVariantTest(ImageOriginTestCase):
+    # Test case untuk resize ?w=&h=&fmt= pada proxy_image
+    images = {'/photo.png': _png_bytes((800, 600)), '/logo.svg': b'<svg></svg>'}
+
+    def _open(self, response):
+        image = Image.open(BytesIO(b''.join(response.streaming_content)))
+        response.close()
+        return image
+
+    def test_resize_to_webp(self):
+        response = self._get('/photo.png', w=200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        image = self._open(response)
+        self.assertEqual((image.format, image.size), ('WEBP', (200, 150)))
+
+    def test_resize_to_jpeg_with_box(self):
+        image = self._open(self._get('/photo.png', w=300, h=100, fmt='jpg'))
+        self.assertEqual((image.format, image.mode, image.size), ('JPEG', 'RGB', (133, 100)))
+
+    def test_variant_rendered_once(self):
+        with mock.patch.object(image_proxy, 'render_variant', wraps=image_proxy.render_variant) as render:
+            self._open(self._get('/photo.png', w=100))
+            self._open(self._get('/photo.png', w=100))
+            self._open(self._get('/photo.png', w=100, fmt='jpeg'))
+        self.assertEqual(render.call_count, 2)
+        self.assertEqual(len(_ImageHandler.hits), 1)
+
+    def test_variant_cache_header(self):
+        response = self._get('/photo.png', w=100)
+        self.assertEqual(response['X-Proxy-Cache'], 'MISS')
+        response.close()
+        response = self._get('/photo.png', w=100)
+        self.assertEqual(response['X-Proxy-Cache'], 'HIT')
+        response.close()
+
+    def test_decompression_bomb_rejected(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            response = self._get('/photo.png', w=100)
+        self.assertEqual(response.status_code, 413)
+
+    def test_original_still_available(self):
+        self._open(self._get('/photo.png', w=100))
+        image = self._open(self._get('/photo.png'))
+        self.assertEqual((image.format, image.size), ('PNG', (800, 600)))
+
+    def test_invalid_variant_params(self):
+        for params in [{'w': 'abc'}, {'w': 0}, {'h': 99999}, {'fmt': 'gif'}]:
+            self.assertEqual(self._get('/photo.png', **params).status_code, 400)
+        self.assertEqual(_ImageHandler.hits, [])
+
+    def test_non_raster_served_unchanged(self):
+        response = self._get('/logo.svg', w=100)
+        self.assertEqual(b''.join(response.streaming_content), b'<svg></svg>')
+        response.close()
+
+
+class FakePlacesClient:
+    # Pengganti GooglePlacesClient untuk test, mencatat panggilan dan konkurensi
+    def __init__(self, failures=None, delay=0.0):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _enter(self, name, arg):
+        with self.lock:
+            self.calls.append((name, arg))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            remaining = self.failures.get(arg, 0)
+            if remaining:
+                self.failures[arg] = remaining - 1
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if remaining:
+            raise ConnectionError(f'temporary failure for {arg}')
+
+    def places(self, query):
+        self._enter('places', query)
+        if query.startswith('Unknown'):
+            return {'status': 'ZERO_RESULTS', 'results': []}
+        return {'status': 'OK', 'results': [{
+            'place_id': f'id-{query}', 'rating': 4.7,
+            'photos': [{'photo_reference': f'ref-{query}'}],
+        }]}
+
+    def place(self, place_id):
+        self._enter('place', place_id)
+        return {'status': 'OK', 'result': {'url': f'https://maps.google.com/?cid={place_id}'}}
+
+    def photo_url(self, photo_reference):
+        self._enter('photo', photo_reference)
+        return f'https://cdn.example.com/{photo_reference}.jpg'
+
+
+class PlacesEnrichmentTest(TestCase):
+    # Test case untuk pipeline enrichment Google Places (studio.places)
+
+    def _enricher(self, client, retries=2):
+        return PlacesEnricher(client, TokenBucket(0), retries=retries, backoff=0, sleep=lambda s: None)
+
+    def _rows(self, n):
+        return [StudioRow(f'Studio {i}', 'Jakarta', 'Area', 'Jl. Test', '0812') for i in range(n)]
+
+    def test_token_bucket_limits_rate(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(2, capacity=1, clock=lambda: now[0], sleep=sleep)
+        for _ in range(5):
+            bucket.acquire()
+        # 1 token awal, 4 sisanya masing-masing menunggu 0.5 detik
+        self.assertAlmostEqual(now[0], 2.0)
+        self.assertEqual(len(sleeps), 4)
+
+    def test_fetch_place_data(self):
+        client = FakePlacesClient()
+        data = self._enricher(client).fetch_place_data('Zen', 'Depok', 'UI')
+        query = 'Zen pilates yoga Depok Indonesia'
+        self.assertEqual(data, PlaceData(
+            f'https://cdn.example.com/ref-{query}.jpg', f'https://maps.google.com/?cid=id-{query}', 4.7,
+        ))
+        self.assertEqual([name for name, _ in client.calls], ['places', 'photo', 'place'])
+
+    def test_place_not_found_uses_placeholder(self):
+        data = self._enricher(FakePlacesClient()).fetch_place_data('Unknown', 'Bogor', 'X')
+        self.assertEqual(data.thumbnail, PLACEHOLDER_IMAGE)
+        self.assertIn('google.com/maps/search', data.gmaps_link)
+
+    def test_retry_with_backoff(self):
+        query = 'Zen pilates yoga Depok Indonesia'
+        client = FakePlacesClient(failures={query: 2})
+        delays = []
+        enricher = PlacesEnricher(client, TokenBucket(0), retries=2, backoff=1.0, sleep=delays.append)
+        enricher.fetch_place_data('Zen', 'Depok', 'UI')
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(1.0 <= delays[0] < 2.0 <= delays[1] < 4.0)
+
+    def test_pipeline_bounded_concurrency(self):
+        client = FakePlacesClient(delay=0.01)
+        pipeline = EnrichmentPipeline(self._enricher(client), workers=3)
+        results = list(pipeline.run(self._rows(12)))
+        self.assertEqual(len(results), 12)
+        self.assertTrue(all(error is None for _, _, error in results))
+        self.assertLessEqual(client.max_active, 3)
+        self.assertGreater(client.max_active, 1)
+
+    def test_pipeline_reports_exhausted_retries(self):
+        query = 'Studio 0 pilates yoga Jakarta Indonesia'
+        client = FakePlacesClient(failures={query: 10})
+        results = {row.nama_studio: error for row, _, error in
+                   EnrichmentPipeline(self._enricher(client), workers=2).run(self._rows(2))}
+        self.assertIsNotNone(results['Studio 0'])
+        self.assertIsNone(results['Studio 1'])
+
+    def test_pipeline_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Checkpoint(os.path.join(tmp, 'import.jsonl'))
+            rows = self._rows(3)
+            checkpoint.record(rows[0].key, PlaceData('thumb', 'link', 4.0))
+            client = FakePlacesClient()
+            results = list(EnrichmentPipeline(self._enricher(client), checkpoint=checkpoint).run(rows))
+
+        self.assertEqual(results[0], (rows[0], PlaceData('thumb', 'link', 4.0), None))
+        queried = {arg for name, arg in client.calls if name == 'places'}
+        self.assertNotIn('Studio 0 pilates yoga Jakarta Indonesia', queried)
+        self.assertEqual(len(queried), 2)
+
+
+@override_settings(GMAPS_API_KEY='test-key')
+class ImportStudiosCommandTest(TestCase):
+    # Test case untuk command import_studios dengan FakePlacesClient
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'studios.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write('DataSet,,,,\n')
+            f.write('Nama Studio,Wilayah Utama,Area Spesifik,Alamat Lengkap,Nomor Telepon\n')
+            f.write('Alpha Pilates,Jakarta,Kemang,"Jl. Alpha, No. 1",0811\n')
+            f.write('Beta Yoga,Depok,Margonda,Jl. Beta,0812\n')
+            f.write('Gamma Yoga,Surabaya,Kota,Jl. Gamma,0813\n')
+        self.client_fake = FakePlacesClient()
+        cache_override = override_settings(PLACES_CACHE_PATH=os.path.join(self.tmp.name, 'places.sqlite3'))
+        cache_override.enable()
+        self.addCleanup(cache_override.disable)
+        patcher = mock.patch(
+            'studio.management.commands.import_studios.Command.get_places_client',
+            return_value=self.client_fake,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, *args):
+        call_command('import_studios', self.csv_path, '--rate', '0', *args, stdout=StringIO())
+
+    def test_import_creates_enriched_studios(self):
+        self._run()
+        self.assertEqual(Studio.objects.count(), 2)
+        alpha = Studio.objects.get(nama_studio='Alpha Pilates')
+        self.assertEqual((alpha.kota, alpha.alamat, alpha.rating), ('Jakarta', 'Jl. Alpha, No. 1', 4.7))
+        self.assertTrue(alpha.thumbnail.startswith('https://cdn.example.com/'))
+        self.assertFalse(os.path.exists(self.csv_path + '.checkpoint.jsonl'))
+
+    def test_update_only_enriches_incomplete_studios(self):
+        Studio.objects.create(
+            nama_studio='Alpha Pilates', kota='Jakarta', area='Old', alamat='Old',
+            nomor_telepon='0', rating=1.0,
+        )
+        Studio.objects.create(
+            nama_studio='Beta Yoga', kota='Depok', area='Margonda', alamat='Jl. Beta',
+            nomor_telepon='0812', rating=3.0, thumbnail='https://x/y.jpg', gmaps_link='https://maps/x',
+        )
+        self._run('--update')
+        queried = [arg for name, arg in self.client_fake.calls if name == 'places']
+        self.assertEqual(queried, ['Alpha Pilates pilates yoga Jakarta Indonesia'])
+        self.assertEqual(Studio.objects.get(nama_studio='Alpha Pilates').area, 'Kemang')
+        self.assertEqual(Studio.objects.get(nama_studio='Beta Yoga').rating, 3.0)
+
+    def test_failed_lookup_leaves_thumbnail_empty(self):
+        self.client_fake.failures = {'Beta Yoga pilates yoga Depok Indonesia': 100}
+        self._run('--retries', '1', '--backoff', '0')
+        self.assertIsNone(Studio.objects.get(nama_studio='Beta Yoga').thumbnail)
+
+
+class BulkImportTest(TestCase):
+    # Test case untuk mode --bulk pada import_studios_simple dan import_studios
+
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache_override = override_settings(PLACES_CACHE_PATH=os.path.join(self.tmp.name, 'places.sqlite3'))
+        cache_override.enable()
+        self.addCleanup(cache_override.disable)
+
+    def _write_csv(self, rows, name='studios.csv'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['DataSet', '', '', '', ''])
+            writer.writerow(['Nama Studio', 'Wilayah Utama', 'Area Spesifik', 'Alamat Lengkap', 'Nomor Telepon'])
+            writer.writerows(rows)
+        return path
+
+    def _rows(self, n, alamat='Jl. Test'):
+        kota = [k for k, _ in KOTA_CHOICES]
+        return [[f'Studio {i:04d}', kota[i % len(kota)], 'Area', alamat, '0812'] for i in range(n)]
+
+    def _bulk_import(self, path, *args):
+        out = StringIO()
+        call_command('import_studios_simple', path, '--bulk', *args, stdout=out)
+        return out.getvalue()
+
+    def test_bulk_creates_and_summarizes(self):
+        output = self._bulk_import(self._write_csv(self._rows(10) + [['X', 'Surabaya', 'A', 'B', 'C']]))
+        self.assertEqual(Studio.objects.count(), 10)
+        self.assertIn('New: 10', output)
+        self.assertIn('Skipped X - invalid kota', output)
+        self.assertEqual(Studio.objects.get(nama_studio='Studio 0001').kota, 'Bogor')
+
+    def test_bulk_diff_new_changed_unchanged(self):
+        self._bulk_import(self._write_csv(self._rows(6)))
+        rows = self._rows(8)
+        rows[0][3] = 'Jl. Baru'
+        output = self._bulk_import(self._write_csv(rows))
+        self.assertIn('New: 2', output)
+        self.assertIn('Changed: 1', output)
+        self.assertIn('Unchanged: 5', output)
+        self.assertEqual(Studio.objects.get(nama_studio='Studio 0000').alamat, 'Jl. Baru')
+
+    def test_bulk_query_count_independent_of_rows(self):
+        # Jumlah query bertambah per batch, bukan per baris (SQLite membatasi
+        # jumlah parameter sehingga satu batch insert berisi ~90 baris)
+        small = self._write_csv(self._rows(10), 'small.csv')
+        large = self._write_csv(self._rows(400), 'large.csv')
+        with CaptureQueriesContext(connection) as small_ctx:
+            self._bulk_import(small, '--batch-size', '500')
+        Studio.objects.all().delete()
+        with CaptureQueriesContext(connection) as large_ctx:
+            self._bulk_import(large, '--batch-size', '500')
+        self.assertLessEqual(len(large_ctx), len(small_ctx) + 400 // 50)
+        self.assertEqual(Studio.objects.count(), 400)
+
+    def test_bulk_import_invalidates_catalog_cache(self):
+        self.client.get(reverse('studio:show_json'))
+        self._bulk_import(self._write_csv(self._rows(5)))
+        data = json.loads(self.client.get(reverse('studio:show_json')).content)
+        self.assertEqual(sum(len(city['studios']) for city in data['cities']), 5)
+
+    @override_settings(GMAPS_API_KEY='test-key')
+    def test_import_studios_bulk_enriches_new_rows(self):
+        Studio.objects.create(
+            nama_studio='Studio 0000', kota='Jakarta', area='Area', alamat='Jl. Lama',
+            nomor_telepon='0812', rating=3.0, thumbnail='https://x/y.jpg', gmaps_link='https://maps/x',
+        )
+        fake = FakePlacesClient()
+        with mock.patch(
+            'studio.management.commands.import_studios.Command.get_places_client', return_value=fake
+        ):
+            out = StringIO()
+            call_command('import_studios', self._write_csv(self._rows(3)), '--bulk', '--rate', '0', stdout=out)
+
+        self.assertIn('New: 2', out.getvalue())
+        self.assertIn('Changed: 1', out.getvalue())
+        self.assertEqual(len([c for c in fake.calls if c[0] == 'places']), 2)
+        existing = Studio.objects.get(nama_studio='Studio 0000')
+        self.assertEqual((existing.alamat, existing.rating), ('Jl. Test', 3.0))
+        self.assertEqual(Studio.objects.get(nama_studio='Studio 0001').rating, 4.7)
+
+
+class PlacesCacheTest(TestCase):
+    # Test case untuk cache persisten hasil lookup Google Places
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'places.sqlite3')
+
+    def test_normalized_query_and_ttl(self):
+        now = [1000.0]
+        places_cache = PlacesCache(self.path, ttl=60, clock=lambda: now[0])
+        places_cache.set('Zen  Pilates Yoga Depok Indonesia', PlaceData('t', 'l', 4.0))
+        self.assertEqual(places_cache.get(' zen pilates yoga depok indonesia'), PlaceData('t', 'l', 4.0))
+        now[0] += 61
+        self.assertIsNone(places_cache.get('Zen Pilates Yoga Depok Indonesia'))
+        places_cache.close()
+
+    def test_cache_survives_between_runs(self):
+        first = FakePlacesClient()
+        enricher = PlacesEnricher(first, TokenBucket(0), cache=PlacesCache(self.path, ttl=None))
+        data = enricher.fetch_place_data('Zen', 'Depok', 'UI')
+
+        second = FakePlacesClient()
+        enricher = PlacesEnricher(second, TokenBucket(0), cache=PlacesCache(self.path, ttl=None))
+        self.assertEqual(enricher.fetch_place_data('Zen', 'Depok', 'UI'), data)
+        self.assertEqual(second.calls, [])
+
+    def test_missing_photo_not_cached(self):
+        query = 'Zen pilates yoga Depok Indonesia'
+        client = FakePlacesClient(failures={f'ref-{query}': 10})
+        enricher = PlacesEnricher(
+            client, TokenBucket(0), retries=0, cache=PlacesCache(self.path, ttl=None)
+        )
+        self.assertEqual(enricher.fetch_place_data('Zen', 'Depok', 'UI').thumbnail, PLACEHOLDER_IMAGE)
+        self.assertIsNone(enricher.cache.get(query))
+
+    def test_offline_rerun_makes_no_network_calls(self):
+        csv_path = os.path.join(self.tmp.name, 'studios.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write('DataSet,,,,\nNama,Wilayah,Area,Alamat,Telepon\n')
+            f.write('Alpha Pilates,Jakarta,Kemang,Jl. Alpha,0811\nBeta Yoga,Depok,Margonda,Jl. Beta,0812\n')
+
+        with override_settings(PLACES_CACHE_PATH=self.path, GMAPS_API_KEY='test-key'):
+            fake = FakePlacesClient()
+            with mock.patch(
+                'studio.management.commands.import_studios.Command.get_places_client', return_value=fake
+            ):
+                call_command('import_studios', csv_path, '--bulk', '--dry-run', '--rate', '0', stdout=StringIO())
+            self.assertEqual(Studio.objects.count(), 0)
+            self.assertEqual(len([c for c in fake.calls if c[0] == 'places']), 2)
+
+        with override_settings(PLACES_CACHE_PATH=self.path, GMAPS_API_KEY=''):
+            with mock.patch(
+                'studio.management.commands.import_studios.Command.get_places_client'
+            ) as get_client:
+                out = StringIO()
+                call_command('import_studios', csv_path, '--offline', '--rate', '0', stdout=out)
+            get_client.assert_not_called()
+        self.assertEqual(Studio.objects.count(), 2)
+        self.assertEqual(Studio.objects.get(nama_studio='Beta Yoga').rating, 4.7)
+        self.assertNotIn('Places lookup failed', out.getvalue())
@@ -7,6 +7,7 @@ urlpatterns = [
     path('add/', add_studio, name='add_studio'),
     path('edit/<uuid:id>/', edit_studio, name='edit_studio'),
     path('json/', show_json, name='show_json'),
+    path('json/cache-stats/', catalog_cache_stats_json, name='catalog_cache_stats'),
     path('delete/<uuid:id>/', delete_studio, name='delete_studio'),
     path('create-flutter/', create_studio_flutter, name='create_studio_flutter'),
     path('edit-flutter/<uuid:id>/', edit_studio_flutter, name='edit_studio_flutter'),
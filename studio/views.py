@@ -2,13 +2,13 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from studio.models import Studio
 from studio.forms import StudioForm
+from studio import image_proxy
+from studio.catalog import get_catalog_json, get_user_kota, catalog_cache_stats
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.core import serializers
 from django.views.decorators.csrf import csrf_exempt
-import json, requests
-
-from users.models import UserProfile
+import json
 
 # Create your views here.
 
@@ -57,62 +57,14 @@ def delete_studio(request, id):
     })
 
 def show_json(request):
-    kota_list = ['Jakarta', 'Bogor', 'Depok', 'Tangerang', 'Bekasi']
-    user_kota = None
-    
-    # Check if user has a city preference
-    try:
-        if request.user.is_authenticated:
-            user_kota = request.user.profile.kota
-    except UserProfile.DoesNotExist:
-        pass
-    
-    response_data = {
-        'user_kota': user_kota,
-        'cities': []
-    }
-    
-    # If user has a city, add it first
-    if user_kota:
-        studios = Studio.objects.filter(kota=user_kota).order_by('nama_studio')
-        response_data['cities'].append({
-            'name': user_kota,
-            'is_user_city': True,
-            'studios': [{
-                'id': str(studio.id),
-                'nama_studio': studio.nama_studio,
-                'thumbnail': studio.thumbnail or '',
-                'kota': studio.get_kota_display(),
-                'area': studio.area,
-                'alamat': studio.alamat,
-                'gmaps_link': studio.gmaps_link or '',
-                'nomor_telepon': studio.nomor_telepon,
-                'rating': studio.rating,
-            } for studio in studios]
-        })
-    
-    # Add other cities
-    for city in kota_list:
-        if city == user_kota:
-            continue
-        studios = Studio.objects.filter(kota=city).order_by('nama_studio')
-        response_data['cities'].append({
-            'name': city,
-            'is_user_city': False,
-            'studios': [{
-                'id': str(studio.id),
-                'nama_studio': studio.nama_studio,
-                'thumbnail': studio.thumbnail or '',
-                'kota': studio.get_kota_display(),
-                'area': studio.area,
-                'alamat': studio.alamat,
-                'gmaps_link': studio.gmaps_link or '',
-                'nomor_telepon': studio.nomor_telepon,
-                'rating': studio.rating,
-            } for studio in studios]
-        })
-    
-    return JsonResponse(response_data)
+    # Payload per kota user di-cache dan di-invalidate lewat signal Studio
+    payload = get_catalog_json(get_user_kota(request.user))
+    return HttpResponse(payload, content_type='application/json')
+
+@login_required(login_url='/users/login/')
+@user_passes_test(is_admin, login_url='/users/login/')
+def catalog_cache_stats_json(request):
+    return JsonResponse(catalog_cache_stats())
 
 @csrf_exempt
 def create_studio_flutter(request):
@@ -185,16 +137,13 @@ def proxy_image(request):
     image_url = request.GET.get('url')
     if not image_url:
         return HttpResponse('No URL provided', status=400)
-    
+    if not image_url.startswith(('http://', 'https://')):
+        return HttpResponse('Invalid URL', status=400)
+
     try:
-        # Fetch image from external source
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()
-        
-        # Return the image with proper content type
-        return HttpResponse(
-            response.content,
-            content_type=response.headers.get('Content-Type', 'image/jpeg')
-        )
-    except requests.RequestException as e:
-        return HttpResponse(f'Error fetching image: {str(e)}', status=500) 
\ No newline at end of file
+        variant = image_proxy.parse_variant(request.GET)
+    except ValueError as e:
+        return HttpResponse(f'Invalid image size: {str(e)}', status=400)
+
+    # Cache di disk + streaming, lihat studio.image_proxy
+    return image_proxy.proxy(request, image_url, variant)
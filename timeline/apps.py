@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TimelineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'timeline'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from timeline import ingest, signals  # noqa: F401
+
+        # Job ingestion yang tertinggal setelah restart diproses lagi
+        request_started.connect(ingest.maybe_sweep, dispatch_uid='timeline_ingest_sweep')
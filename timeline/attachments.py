@@ -0,0 +1,80 @@
+"""
+Lampiran post (Resource atau SportswearBrand) untuk feed timeline.
+
+resolve() memuat semua lampiran satu halaman dengan satu in_bulk per tipe,
+jadi jumlah query feed tidak bergantung pada jumlah post yang berlampiran.
+Semua tipe diserialisasi ke skema yang sama:
+
+    {"type", "id", "name", "thumbnail", "link"}
+"""
+from typing import NamedTuple
+
+from resources.models import Resource
+from sportswear.models import SportswearBrand
+
+
+class AttachmentType(NamedTuple):
+    label: str
+    field: str
+    model: type
+    fields: tuple
+    name: str
+    link: str
+
+
+ATTACHMENT_TYPES = [
+    AttachmentType('Resources', 'resource_id', Resource, ('title', 'thumbnail_url', 'youtube_url'), 'title', 'youtube_url'),
+    AttachmentType('Sportswear', 'sportswear_id', SportswearBrand, ('brand_name', 'thumbnail_url', 'link'), 'brand_name', 'link'),
+]
+BY_LABEL = {kind.label: kind for kind in ATTACHMENT_TYPES}
+
+
+def serialize(kind, obj):
+    return {
+        "type": kind.label,
+        "id": obj.pk,
+        "name": getattr(obj, kind.name),
+        "thumbnail": obj.thumbnail_url or "",
+        "link": getattr(obj, kind.link) or "",
+    }
+
+
+def resolve(posts):
+    """
+    Set `post.attachment` (dict skema di atas atau None) untuk setiap post.
+    Lampiran yang sudah dihapus dianggap tidak ada.
+    """
+    for post in posts:
+        post.attachment = None
+    # Urutan ATTACHMENT_TYPES = prioritas kalau post punya dua lampiran
+    for kind in reversed(ATTACHMENT_TYPES):
+        ids = {getattr(post, kind.field) for post in posts} - {None}
+        if not ids:
+            continue
+        objects = kind.model.objects.only(*kind.fields).in_bulk(ids)
+        for post in posts:
+            obj = objects.get(getattr(post, kind.field))
+            if obj is not None:
+                post.attachment = serialize(kind, obj)
+    return posts
+
+
+def parse(attachment):
+    """
+    Ubah payload `attachment` dari client ({"type", "id"} atau {"type",
+    "data": {"id"}}) menjadi kwargs field Post, misalnya {'resource_id': 3}.
+    Lampiran yang tidak dikenal atau tidak ada diabaikan (satu query).
+    """
+    if not attachment:
+        return {}
+    kind = BY_LABEL.get(attachment.get('type'))
+    aid = attachment.get('id')
+    if not aid and isinstance(attachment.get('data'), dict):
+        aid = attachment['data'].get('id')
+    if kind is None or not aid:
+        return {}
+    try:
+        exists = kind.model.objects.filter(pk=aid).exists()
+    except (TypeError, ValueError):
+        return {}
+    return {kind.field: aid} if exists else {}
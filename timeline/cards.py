@@ -0,0 +1,85 @@
+"""
+Cache fragmen HTML kartu post (_post.html).
+
+Bagian kartu yang sama untuk semua viewer di-render sekali dan disimpan di
+cache dengan key (post id, updated_at, like_count, comment_count, varian).
+Bagian yang bergantung pada viewer ditandai dengan komentar HTML
+`<!--viewer:...-->` di template dan diganti per request:
+
+- liked: ikon like sesuai post.liked_by_user (lihat feed.mark_liked)
+- owner: tombol edit/delete untuk penulis dan admin
+- comment-form: form komentar (butuh CSRF token) untuk user yang login
+
+Key berubah sendiri saat post diedit (updated_at), di-like (like_count) atau
+komentarnya bertambah/berkurang (comment_count + updated_at), jadi entry
+lama tidak perlu dihapus; ia kedaluwarsa lewat timeout cache.
+"""
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+CARD_TIMEOUT = 60 * 60 * 24
+LIKED_ICON = '❤️'
+UNLIKED_ICON = '🤍'
+
+
+def card_key(post, detail=False):
+    version = int(post.updated_at.timestamp() * 1_000_000)
+    variant = 'detail' if detail else 'list'
+    return f'timeline:card:{post.pk}:{version}:{post.like_count}:{post.comment_count}:{variant}'
+
+
+def invalidate(post_id):
+    """Paksa kartu di-render ulang, mis. setelah komentar diedit."""
+    Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+
+
+def _render_shared(post, detail):
+    return render_to_string('_post.html', {'post': post, 'detail': detail})
+
+
+def _patch(html, post, request):
+    user = request.user
+    is_owner = user.is_authenticated and (user.pk == post.author_id or user.is_superuser or user.is_staff)
+    parts = {
+        '<!--viewer:liked-->': LIKED_ICON if getattr(post, 'liked_by_user', False) else UNLIKED_ICON,
+        '<!--viewer:owner-->': (
+            render_to_string('_post_owner_controls.html', {'post': post}) if is_owner else ''
+        ),
+        '<!--viewer:comment-form-->': (
+            render_to_string('_post_comment_form.html', {'post': post}, request=request)
+            if user.is_authenticated else ''
+        ),
+    }
+    for marker, value in parts.items():
+        html = html.replace(marker, value)
+    return mark_safe(html)
+
+
+def attach_cards(posts, request, detail=False):
+    """
+    Set `post.card_html` untuk setiap post. Komentar hanya di-prefetch untuk
+    post yang kartunya belum ada di cache.
+    """
+    keys = {post.pk: card_key(post, detail) for post in posts}
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [post for post in posts if keys[post.pk] not in cached]
+    if missing:
+        prefetch_related_objects(missing, 'comments__author')
+        fresh = {keys[post.pk]: _render_shared(post, detail) for post in missing}
+        cache.set_many(fresh, CARD_TIMEOUT)
+        cached.update(fresh)
+
+    for post in posts:
+        post.card_html = _patch(cached[keys[post.pk]], post, request)
+    return posts
+
+
+def render_card(post, request, detail=False):
+    attach_cards([post], request, detail)
+    return post.card_html
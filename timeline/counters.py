@@ -0,0 +1,78 @@
+"""
+Counter like_count/comment_count pada Post.
+
+Semua perubahan memakai UPDATE ... SET x = x + 1 (F expression) di dalam
+transaksi yang sama dengan perubahan baris like/comment, sehingga request
+yang bersamaan tidak saling menimpa. rebuild_counters() menghitung ulang
+semuanya dari tabel sumber (dipakai command rebuild_post_counters).
+
+Perubahan komentar juga memperbarui updated_at supaya cache kartu post
+(timeline.cards) ikut berganti.
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Comment, Post
+
+Like = Post.likes.through
+
+
+def _adjust(post_id, field, delta, **extra):
+    # Dibatasi di 0: counter yang sudah melenceng tidak boleh melanggar
+    # CHECK (>= 0) PositiveIntegerField; rebuild_counters yang membetulkannya
+    Post.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, 0)}, **extra)
+
+
+def toggle_like(post, user):
+    """Like/unlike `post` oleh `user`. Mengembalikan True jika sekarang di-like."""
+    existing = Like.objects.filter(post_id=post.pk, user_id=user.pk)
+    with transaction.atomic():
+        if existing.exists():
+            # Counter mengikuti jumlah baris yang benar-benar terhapus/dibuat,
+            # jadi toggle yang balapan tidak membuat counter melenceng
+            removed, _ = existing.delete()
+            if removed:
+                _adjust(post.pk, 'like_count', -1)
+            liked = False
+        else:
+            _, created = Like.objects.get_or_create(post_id=post.pk, user_id=user.pk)
+            if created:
+                _adjust(post.pk, 'like_count', 1)
+            liked = True
+    post.refresh_from_db(fields=['like_count'])
+    return liked
+
+
+def add_comment(post, author, text):
+    with transaction.atomic():
+        comment = Comment.objects.create(post=post, author=author, text=text)
+        _adjust(post.pk, 'comment_count', 1, updated_at=timezone.now())
+    return comment
+
+
+def delete_comment(comment):
+    with transaction.atomic():
+        comment.delete()
+        _adjust(comment.post_id, 'comment_count', -1, updated_at=timezone.now())
+
+
+def _count_subquery(model):
+    counts = (
+        model.objects.filter(post_id=OuterRef('pk'))
+        .order_by()
+        .values('post_id')
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def rebuild_counters(queryset=None):
+    """Hitung ulang counter dengan satu UPDATE; mengembalikan jumlah post."""
+    queryset = Post.objects.all() if queryset is None else queryset
+    return queryset.update(
+        like_count=_count_subquery(Like),
+        comment_count=_count_subquery(Comment),
+    )
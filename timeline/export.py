@@ -0,0 +1,79 @@
+"""
+Export seluruh Post untuk show_json tanpa memuat semuanya ke memori.
+
+Queryset dibaca dengan .iterator(chunk_size) (server-side cursor di
+PostgreSQL, fetchmany di SQLite) dan setiap post langsung di-encode lalu
+dikirim per batch lewat StreamingHttpResponse. Pemakaian memori tetap
+sebanding dengan chunk_size, bukan jumlah post.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import Post
+
+EXPORT_CHUNK_SIZE = 2000
+# Jumlah elemen yang digabung sebelum di-yield ke server
+WRITE_BATCH_SIZE = 100
+
+FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+_encoder = DjangoJSONEncoder()
+
+
+def export_queryset():
+    return (
+        Post.objects
+        .select_related('author')
+        .only('text', 'image', 'created_at', 'author__username')
+        .order_by('-created_at', '-id')
+    )
+
+
+def serialize_post(post):
+    return {
+        "username": post.author.username,
+        "text": post.text,
+        "image": post.image.url if post.image else "",
+        "created_at": post.created_at.isoformat(),
+    }
+
+
+def _encoded(queryset, chunk_size):
+    for post in queryset.iterator(chunk_size=chunk_size):
+        yield _encoder.encode(serialize_post(post))
+
+
+def _batched(pieces):
+    batch = []
+    for piece in pieces:
+        batch.append(piece)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def iter_json_array(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Array JSON yang sama dengan JsonResponse(list), ditulis bertahap."""
+    def pieces():
+        yield '['
+        for i, item in enumerate(_encoded(queryset, chunk_size)):
+            yield (', ' if i else '') + item
+        yield ']'
+    return _batched(pieces())
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    return _batched(item + '\n' for item in _encoded(queryset, chunk_size))
+
+
+def streaming_export(fmt='json', queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    if fmt not in FORMATS:
+        raise ValueError(f'unsupported format: {fmt}')
+    queryset = export_queryset() if queryset is None else queryset
+    iterate = iter_ndjson if fmt == 'ndjson' else iter_json_array
+    return StreamingHttpResponse(iterate(queryset, chunk_size), content_type=FORMATS[fmt])
@@ -0,0 +1,271 @@
+"""
+Home feed dengan fan-out-on-write (opsional).
+
+Fan-out mati secara default (TIMELINE_FEED_SOURCES kosong): home feed
+dibaca langsung dari tabel Post lewat scan_home_feed() (post user sendiri
+dan post penulis di kota yang sama). Benchmark benchmark_home_feed belum
+menunjukkan fan-out lebih cepat dari scan tersebut, sementara biaya tulisnya
+satu FeedEntry per audience untuk setiap post. Aktifkan hanya jika benchmark
+di database production menunjukkan keuntungan, lalu jalankan
+backfill_home_feeds.
+
+Saat fan-out aktif dan Post dibuat, satu FeedEntry (user, post, created_at) ditulis untuk
+setiap user yang menjadi audience post tersebut. Membaca home feed cukup
+range scan di index (user, created_at DESC, id DESC) milik FeedEntry,
+bukan sort seluruh tabel Post.
+
+Audience ditentukan oleh TIMELINE_FEED_SOURCES:
+- 'kota': user dengan UserProfile.kota yang sama dengan penulis
+- 'resource' / 'sportswear': user yang mem-bookmark resource/brand yang
+  dilampirkan di post
+
+Penulis selalu mendapat post-nya sendiri. Entry yang sudah ada diabaikan
+(ignore_conflicts), jadi fan-out dan backfill aman dijalankan ulang.
+
+Fan-out tidak dijalankan di dalam request: enqueue() hanya menulis satu
+FanoutJob, lalu TIMELINE_FANOUT_MODE menentukan siapa yang memprosesnya:
+- 'thread': thread pool di proses web, dijalankan setelah transaksi commit
+  (job yang tertinggal karena proses mati diambil command process_fanout_queue)
+- 'queue': hanya ditulis ke antrian; `manage.py process_fanout_queue --watch`
+  harus berjalan sebagai proses terpisah
+- 'sync': langsung di dalam request (untuk development/debug)
+"""
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import Q, prefetch_related_objects
+
+from bookmarks.models import Bookmark
+from resources.models import Resource
+from sportswear.models import SportswearBrand
+from users.models import UserProfile
+
+from .feed import DEFAULT_PAGE_SIZE, FeedPage, paginate
+from .models import FanoutJob, FeedEntry, Post
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCES = ()
+# source -> (field attachment di Post, model yang di-bookmark)
+INTEREST_SOURCES = {
+    'resource': ('resource_id', Resource),
+    'sportswear': ('sportswear_id', SportswearBrand),
+}
+FANOUT_BATCH_SIZE = 1000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def feed_sources():
+    return tuple(getattr(settings, 'TIMELINE_FEED_SOURCES', DEFAULT_SOURCES))
+
+
+def fanout_enabled():
+    return bool(feed_sources())
+
+
+def attachment_sources():
+    """Source aktif yang bergantung pada attachment post (resource/sportswear)."""
+    return [source for source in feed_sources() if source in INTEREST_SOURCES]
+
+
+def fanout_mode():
+    return getattr(settings, 'TIMELINE_FANOUT_MODE', 'thread')
+
+
+def _collect(post, sources, resolve):
+    """user_id -> source untuk `post`; source pertama yang cocok yang dicatat."""
+    targets = {}
+    for source in sources:
+        for user_id in resolve(source, post):
+            targets.setdefault(user_id, source)
+    targets[post.author_id] = 'author'
+    return targets
+
+
+def _live_resolve(source, post):
+    if source == 'kota':
+        kota = UserProfile.objects.filter(user_id=post.author_id).values_list('kota', flat=True).first()
+        if not kota:
+            return []
+        return UserProfile.objects.filter(kota=kota).values_list('user_id', flat=True)
+    if source in INTEREST_SOURCES:
+        field, model = INTEREST_SOURCES[source]
+        object_id = getattr(post, field)
+        if object_id is None:
+            return []
+        return Bookmark.objects.filter(
+            content_type=ContentType.objects.get_for_model(model), object_id=str(object_id),
+        ).values_list('user_id', flat=True)
+    raise ValueError(f'unknown feed source: {source}')
+
+
+def _entries(post, targets):
+    return [
+        FeedEntry(user_id=user_id, post_id=post.pk, created_at=post.created_at, source=source)
+        for user_id, source in targets.items()
+    ]
+
+
+def fan_out(post, sources=None, batch_size=FANOUT_BATCH_SIZE):
+    """Tulis entry feed untuk `post`. Mengembalikan jumlah audience."""
+    sources = feed_sources() if sources is None else sources
+    targets = _collect(post, sources, _live_resolve)
+    FeedEntry.objects.bulk_create(_entries(post, targets), batch_size=batch_size, ignore_conflicts=True)
+    return len(targets)
+
+
+def enqueue(post, sources):
+    """Jadwalkan fan-out `post` ke `sources` sesuai TIMELINE_FANOUT_MODE."""
+    mode = fanout_mode()
+    if mode == 'sync':
+        fan_out(post, sources)
+        return None
+    job = FanoutJob.objects.create(post=post, sources=','.join(sources))
+    if mode == 'thread':
+        transaction.on_commit(lambda: get_pool().submit(_run_in_thread, job.pk))
+    return job
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'TIMELINE_FANOUT_WORKERS', 1),
+                    thread_name_prefix='timeline-fanout',
+                )
+    return _pool
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        process_job(job_id)
+    except Exception:
+        logger.exception('Fan-out crashed for job %s', job_id)
+    finally:
+        close_old_connections()
+
+
+def process_job(job_id):
+    """
+    Jalankan satu FanoutJob lalu hapus. Mengembalikan False jika job sudah
+    diproses worker lain; fan-out sendiri idempotent, jadi job yang sempat
+    diproses dua kali tidak menggandakan entry.
+    """
+    job = FanoutJob.objects.select_related('post').filter(pk=job_id).first()
+    if job is None:
+        return False
+    fan_out(job.post, [source for source in job.sources.split(',') if source])
+    FanoutJob.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def drain(limit=None):
+    """Proses job yang menunggu, terlama dulu. Mengembalikan jumlah yang diproses."""
+    job_ids = FanoutJob.objects.order_by('pk').values_list('pk', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+    return sum(process_job(job_id) for job_id in list(job_ids))
+
+
+class _AudienceIndex:
+    """Audience semua source dimuat sekali, untuk backfill banyak post."""
+
+    def __init__(self, sources):
+        self.by_author = {}
+        self.by_kota = defaultdict(list)
+        if 'kota' in sources:
+            for user_id, kota in UserProfile.objects.exclude(kota=None).exclude(kota='').values_list('user_id', 'kota'):
+                self.by_author[user_id] = kota
+                self.by_kota[kota].append(user_id)
+
+        self.bookmarks = {}
+        for source in sources:
+            if source in INTEREST_SOURCES:
+                model = INTEREST_SOURCES[source][1]
+                index = defaultdict(list)
+                rows = Bookmark.objects.filter(
+                    content_type=ContentType.objects.get_for_model(model),
+                ).values_list('object_id', 'user_id')
+                for object_id, user_id in rows.iterator():
+                    index[object_id].append(user_id)
+                self.bookmarks[source] = index
+
+    def __call__(self, source, post):
+        if source == 'kota':
+            return self.by_kota.get(self.by_author.get(post.author_id), ())
+        if source in INTEREST_SOURCES:
+            object_id = getattr(post, INTEREST_SOURCES[source][0])
+            if object_id is None:
+                return ()
+            return self.bookmarks[source].get(str(object_id), ())
+        raise ValueError(f'unknown feed source: {source}')
+
+
+def backfill(posts=None, sources=None, batch_size=FANOUT_BATCH_SIZE):
+    """
+    Fan-out ulang untuk `posts` (default semua Post). Mengembalikan
+    (jumlah post, jumlah entry yang diajukan).
+    """
+    sources = feed_sources() if sources is None else sources
+    posts = Post.objects.all() if posts is None else posts
+    resolve = _AudienceIndex(sources)
+
+    pending = []
+    post_count = entry_count = 0
+    fields = ('id', 'author_id', 'created_at', 'resource_id', 'sportswear_id')
+    for post in posts.only(*fields).order_by().iterator(chunk_size=batch_size):
+        post_count += 1
+        pending.extend(_entries(post, _collect(post, sources, resolve)))
+        if len(pending) >= batch_size:
+            FeedEntry.objects.bulk_create(pending, batch_size=batch_size, ignore_conflicts=True)
+            entry_count += len(pending)
+            pending = []
+    if pending:
+        FeedEntry.objects.bulk_create(pending, batch_size=batch_size, ignore_conflicts=True)
+        entry_count += len(pending)
+    return post_count, entry_count
+
+
+def read_home_feed(user, cursor=None, limit=DEFAULT_PAGE_SIZE, prefetch=()):
+    """
+    Satu halaman home feed `user`: keyset pagination di index feed, dengan
+    post dan penulisnya di-join dalam query yang sama. `prefetch` diteruskan
+    ke prefetch_related_objects untuk relasi lain (mis. latest_comments()).
+    """
+    entries = FeedEntry.objects.filter(user=user).select_related('post__author')
+    page = paginate(entries, cursor, limit)
+    posts = [entry.post for entry in page]
+    if prefetch:
+        prefetch_related_objects(posts, *prefetch)
+    return FeedPage(posts, page.next_cursor)
+
+
+def scan_home_feed(user, cursor=None, limit=DEFAULT_PAGE_SIZE, prefetch=()):
+    """
+    Home feed tanpa fan-out: post `user` sendiri dan post penulis yang
+    kotanya sama, langsung dari tabel Post (join profile + sort).
+    """
+    kota = UserProfile.objects.filter(user=user).values_list('kota', flat=True).first()
+    condition = Q(author=user)
+    if kota:
+        condition |= Q(author__profile__kota=kota)
+    page = paginate(Post.objects.filter(condition).select_related('author'), cursor, limit)
+    if prefetch:
+        prefetch_related_objects(page.items, *prefetch)
+    return page
+
+
+def home_feed(user, cursor=None, limit=DEFAULT_PAGE_SIZE, prefetch=()):
+    """Satu halaman home feed: dari FeedEntry jika fan-out aktif, selain itu scan_home_feed."""
+    read = read_home_feed if fanout_enabled() else scan_home_feed
+    return read(user, cursor, limit, prefetch=prefetch)
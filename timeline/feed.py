@@ -0,0 +1,166 @@
+"""
+Keyset (cursor) pagination untuk feed timeline.
+
+Halaman berikutnya diambil dengan `WHERE (created_at, id) < cursor` pada
+index (created_at DESC, id DESC), jadi tidak ada COUNT(*) dan tidak ada
+OFFSET scan. Biaya tiap halaman sama di kedalaman berapa pun, dan post baru
+yang masuk tidak menggeser isi halaman yang sedang dibaca.
+
+Semua endpoint yang di-page mengirim halaman berikutnya di body sebagai
+`next`: query string `?cursor=...&limit=...` (lihat next_query), atau null
+di halaman terakhir.
+"""
+import base64
+import binascii
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.db.models import Prefetch, Q
+
+from .models import Comment, Post
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+COMMENT_PREVIEW_SIZE = 3
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = f'{created_at.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        limit = int(value) if value else default
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+class FeedPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginate(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE, time_field='created_at', ascending=False):
+    """
+    Ambil satu halaman dari queryset, terbaru dulu (atau terlama dulu jika
+    `ascending`), setelah `cursor` (string dari encode_cursor atau None
+    untuk halaman pertama). `time_field` boleh DateTimeField atau DateField.
+    """
+    direction, after = ('', 'gt') if ascending else ('-', 'lt')
+    queryset = queryset.order_by(f'{direction}{time_field}', f'{direction}pk')
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        value = queryset.model._meta.get_field(time_field).to_python(value)
+        queryset = queryset.filter(
+            Q(**{f'{time_field}__{after}': value}) | Q(**{time_field: value, f'pk__{after}': pk})
+        )
+
+    # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+    items = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, time_field), last.pk)
+    return FeedPage(items, next_cursor)
+
+
+def cursor_for_page(queryset, page, limit=DEFAULT_PAGE_SIZE, time_field='created_at'):
+    """
+    Terjemahkan `?page=N` lama (Paginator, urutan terbaru dulu) ke cursor
+    yang setara, supaya client lama tetap bisa lanjut selama masa transisi.
+    Butuh satu OFFSET untuk mencari baris terakhir halaman sebelumnya, jadi
+    client sebaiknya pindah ke `next` dari body. Halaman 1 memberi None;
+    halaman di luar jangkauan memberi cursor setelah baris terakhir
+    (hasilnya kosong).
+    """
+    try:
+        page = int(page)
+    except (TypeError, ValueError):
+        raise InvalidCursor(f'Invalid page: {page!r}')
+    if page < 1:
+        raise InvalidCursor(f'Invalid page: {page!r}')
+    if page == 1:
+        return None
+    ordered = queryset.order_by(f'-{time_field}', '-pk')
+    anchor = ordered[(page - 1) * limit - 1:(page - 1) * limit].first() or ordered.last()
+    if anchor is None:
+        return None
+    return encode_cursor(getattr(anchor, time_field), anchor.pk)
+
+
+def next_query(page, limit, **params):
+    """
+    Query string halaman setelah `page`, atau None jika sudah habis.
+    `params` (mis. filter) ikut dibawa supaya client cukup menempelkannya
+    ke URL endpoint yang sama.
+    """
+    if not page.has_next:
+        return None
+    params = {key: value for key, value in params.items() if value}
+    return '?' + urlencode({**params, 'cursor': page.next_cursor, 'limit': limit})
+
+
+def liked_post_ids(user, posts):
+    """
+    ID post di `posts` yang di-like `user`, diambil dengan satu query ke
+    tabel likes. Biayanya sebanding dengan ukuran halaman, bukan jumlah
+    liker tiap post.
+    """
+    if not user.is_authenticated:
+        return set()
+    ids = [post.pk for post in posts]
+    if not ids:
+        return set()
+    return set(
+        Post.likes.through.objects
+        .filter(user_id=user.pk, post_id__in=ids)
+        .values_list('post_id', flat=True)
+    )
+
+
+def mark_liked(user, posts):
+    """Set atribut `liked_by_user` pada setiap post (dipakai template dan JSON)."""
+    liked = liked_post_ids(user, posts)
+    for post in posts:
+        post.liked_by_user = post.pk in liked
+    return posts
+
+
+def latest_comments(size=COMMENT_PREVIEW_SIZE):
+    """
+    Prefetch `size` komentar terbaru per post ke `post.latest_comments`.
+
+    Prefetch dengan queryset yang di-slice dijalankan Django sebagai satu
+    query ROW_NUMBER() OVER (PARTITION BY post_id ...), jadi payload feed
+    tetap kecil walaupun sebuah post punya ribuan komentar. Komentar
+    selengkapnya diambil lewat get_post_comments.
+    """
+    queryset = Comment.objects.select_related('author').order_by('-created_at', '-id')[:size]
+    return Prefetch('comments', queryset=queryset, to_attr='latest_comments')
@@ -0,0 +1,335 @@
+"""
+Ingestion gambar post timeline di luar request.
+
+Request hanya men-decode upload per chunk ke file sementara (dengan batas
+ukuran), mengecek header gambar dengan Pillow lalu memindahkan file ke
+antrian di TIMELINE_INGEST_DIR:
+
+    incoming/    upload yang sedang ditulis
+    pending/     job menunggu, nama file `<post_id>-<token>.<ext>`
+    processing/  job yang sedang diproses (di-claim dengan os.rename)
+    failed/      job yang gagal, disimpan untuk diperiksa
+
+Worker meng-encode ulang gambar (orientasi EXIF diterapkan lalu metadata
+dibuang, sisi terpanjang dibatasi, JPEG + varian WebP, placeholder
+BlurHash) dan baru kemudian mengisi Post.image. Selama itu post berstatus
+image_status='pending'.
+
+TIMELINE_INGEST_MODE menentukan siapa yang memproses job:
+- 'thread': thread pool di proses web, dijalankan setelah transaksi commit
+- 'queue': hanya ditulis ke antrian; command process_image_queue yang memproses
+- 'sync': langsung di dalam request (untuk development/debug)
+
+Di mode 'thread' job bisa tertinggal jika proses web restart atau mati
+sebelum job selesai. Karena itu setiap proses web menjalankan sweep() di
+pool (request pertama setelah start, lalu paling sering sekali per
+SWEEP_INTERVAL): job di processing/ yang lebih tua dari STALE_AFTER
+dikembalikan ke pending/, lalu job pending yang tertinggal diproses.
+Di mode 'queue' hal yang sama dilakukan `manage.py process_image_queue
+--watch`, yang harus dijalankan sebagai proses terpisah.
+"""
+import base64
+import binascii
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import blurhash
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Format Pillow yang diterima -> ekstensi file job
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+# Kelipatan 4 supaya setiap potongan base64 bisa di-decode sendiri
+DECODE_CHUNK_SIZE = 64 * 1024
+MAX_PIXELS = 40_000_000
+SWEEP_INTERVAL = 60
+# Job di processing/ lebih lama dari ini dianggap ditinggal worker yang mati
+STALE_AFTER = 600
+
+_pool = None
+_pool_lock = threading.Lock()
+_sweep_lock = threading.Lock()
+_last_sweep = None
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class Upload(NamedTuple):
+    path: Path
+    format: str
+    width: int
+    height: int
+    size: int
+
+
+def ingest_dir(name):
+    path = Path(getattr(settings, 'TIMELINE_INGEST_DIR', Path(settings.BASE_DIR) / '.timeline_ingest')) / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def max_image_bytes():
+    return getattr(settings, 'TIMELINE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def max_dimension():
+    return getattr(settings, 'TIMELINE_IMAGE_MAX_DIMENSION', 1600)
+
+
+def ingest_mode():
+    return getattr(settings, 'TIMELINE_INGEST_MODE', 'thread')
+
+
+def _discard(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def store_upload(chunks):
+    """
+    Tulis iterable bytes ke incoming/ sambil menghitung ukuran, lalu cek
+    header gambarnya. Mengembalikan Upload atau raise InvalidImage.
+    """
+    limit = max_image_bytes()
+    fd, tmp_path = tempfile.mkstemp(dir=ingest_dir('incoming'), suffix='.part')
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > limit:
+                    raise InvalidImage(f'Image too large (max {limit} bytes)')
+                f.write(chunk)
+    except Exception:
+        _discard(tmp_path)
+        raise
+    return inspect_upload(Path(tmp_path), size)
+
+
+def _base64_chunks(payload):
+    try:
+        for start in range(0, len(payload), DECODE_CHUNK_SIZE):
+            yield base64.b64decode(payload[start:start + DECODE_CHUNK_SIZE], validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidImage(f'Invalid base64 image data: {e}') from e
+
+
+def decode_base64_upload(data):
+    """Terima `data:image/...;base64,xxx` atau base64 polos dari client."""
+    payload = data.split(';base64,', 1)[1] if ';base64,' in data else data
+    if any(c.isspace() for c in payload[:DECODE_CHUNK_SIZE]):
+        payload = ''.join(payload.split())
+    # Tolak lebih awal tanpa men-decode kalau jelas melebihi batas
+    if len(payload) // 4 * 3 > max_image_bytes() + 2:
+        raise InvalidImage(f'Image too large (max {max_image_bytes()} bytes)')
+    return store_upload(_base64_chunks(payload))
+
+
+def inspect_upload(path, size):
+    try:
+        # Image.open hanya membaca header, pixel belum di-decode
+        with Image.open(path) as image:
+            fmt, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError) as e:
+        _discard(path)
+        raise InvalidImage('Uploaded file is not a supported image') from e
+    if fmt not in ALLOWED_FORMATS:
+        _discard(path)
+        raise InvalidImage(f'Unsupported image type: {fmt}')
+    if width * height > MAX_PIXELS:
+        _discard(path)
+        raise InvalidImage(f'Image dimensions too large ({width}x{height})')
+    return Upload(path, fmt, width, height, size)
+
+
+def enqueue(post, upload):
+    """Pindahkan upload ke pending/ dan jadwalkan pemrosesannya."""
+    job = ingest_dir('pending') / f'{post.pk}-{uuid.uuid4().hex}.{ALLOWED_FORMATS[upload.format]}'
+    os.replace(upload.path, job)
+
+    mode = ingest_mode()
+    if mode == 'sync':
+        process_job(job)
+    elif mode == 'thread':
+        transaction.on_commit(lambda: get_pool().submit(_run_in_thread, job))
+    return job
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'TIMELINE_INGEST_WORKERS', 2),
+                    thread_name_prefix='timeline-ingest',
+                )
+    return _pool
+
+
+def _run_in_thread(job):
+    close_old_connections()
+    try:
+        process_job(job)
+    except Exception:
+        logger.exception('Image ingestion crashed for %s', job)
+    finally:
+        close_old_connections()
+
+
+def _sweep_in_thread():
+    close_old_connections()
+    try:
+        sweep()
+    except Exception:
+        logger.exception('Image ingestion sweep crashed')
+    finally:
+        close_old_connections()
+
+
+def reencode(path):
+    """Mengembalikan (jpeg bytes, webp bytes, blurhash)."""
+    limit = max_dimension()
+    with Image.open(path) as source:
+        source.load()
+        # Terapkan orientasi EXIF ke pixel; metadata tidak ikut disimpan
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((limit, limit), Image.LANCZOS)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        jpeg, webp = BytesIO(), BytesIO()
+        image.save(jpeg, 'JPEG', quality=85, optimize=True, progressive=True)
+        image.save(webp, 'WEBP', quality=80, method=4)
+        return jpeg.getvalue(), webp.getvalue(), blurhash.encode(image)
+
+
+def _claim(job):
+    target = ingest_dir('processing') / job.name
+    try:
+        os.rename(job, target)
+    except FileNotFoundError:
+        # Sudah di-claim worker lain
+        return None
+    return target
+
+
+def process_job(job):
+    """
+    Proses satu job pending. Mengembalikan True jika gambar post siap, False
+    jika gagal, dan None jika job sudah diambil worker lain.
+    """
+    claimed = _claim(Path(job))
+    if claimed is None:
+        return None
+    post_id = int(claimed.name.split('-', 1)[0])
+    token = claimed.stem.split('-', 1)[1][:12]
+
+    try:
+        jpeg, webp, placeholder = reencode(claimed)
+    except Exception as e:
+        logger.warning('Image ingestion failed for post %s: %s', post_id, e)
+        Post.objects.filter(pk=post_id).update(image_status=Post.IMAGE_FAILED, updated_at=timezone.now())
+        os.replace(claimed, ingest_dir('failed') / claimed.name)
+        return False
+
+    image_name = default_storage.save(f'timeline_images/{post_id}_{token}.jpg', ContentFile(jpeg))
+    webp_name = default_storage.save(f'timeline_images/webp/{post_id}_{token}.webp', ContentFile(webp))
+    updated = Post.objects.filter(pk=post_id).update(
+        image=image_name,
+        image_webp=webp_name,
+        image_placeholder=placeholder,
+        image_status=Post.IMAGE_READY,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # Post sudah dihapus selama job menunggu
+        default_storage.delete(image_name)
+        default_storage.delete(webp_name)
+    _discard(claimed)
+    return bool(updated)
+
+
+def pending_jobs(older_than=None):
+    jobs = sorted(ingest_dir('pending').iterdir(), key=lambda path: path.stat().st_mtime)
+    if older_than is None:
+        return jobs
+    cutoff = time.time() - older_than
+    return [job for job in jobs if job.stat().st_mtime < cutoff]
+
+
+def recover_stale(older_than):
+    """Kembalikan job di processing/ yang tertinggal (worker mati) ke pending/."""
+    cutoff = time.time() - older_than
+    recovered = 0
+    for job in ingest_dir('processing').iterdir():
+        try:
+            if job.stat().st_mtime < cutoff:
+                os.replace(job, ingest_dir('pending') / job.name)
+                recovered += 1
+        except FileNotFoundError:
+            continue
+    return recovered
+
+
+def drain(limit=None, older_than=None):
+    """Proses job pending secara berurutan. Mengembalikan (ok, gagal)."""
+    ok = failed = 0
+    for job in pending_jobs(older_than)[:limit]:
+        result = process_job(job)
+        if result:
+            ok += 1
+        elif result is False:
+            failed += 1
+    return ok, failed
+
+
+def sweep():
+    """
+    Pulihkan job yang tertinggal lalu proses job pending. Job yang baru
+    masuk (kurang dari SWEEP_INTERVAL) dilewati: transaksi post-nya mungkin
+    belum commit dan job itu sudah dijadwalkan lewat on_commit.
+    """
+    recover_stale(STALE_AFTER)
+    return drain(older_than=SWEEP_INTERVAL)
+
+
+def maybe_sweep(**kwargs):
+    """
+    Receiver request_started: di mode 'thread', jadwalkan sweep() di pool
+    paling sering sekali per SWEEP_INTERVAL per proses.
+    """
+    global _last_sweep
+    if ingest_mode() != 'thread':
+        return
+    now = time.monotonic()
+    with _sweep_lock:
+        if _last_sweep is not None and now - _last_sweep < SWEEP_INTERVAL:
+            return
+        _last_sweep = now
+    get_pool().submit(_sweep_in_thread)
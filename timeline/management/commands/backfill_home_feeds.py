@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from timeline.fanout import FANOUT_BATCH_SIZE, INTEREST_SOURCES, backfill, feed_sources
+from timeline.models import FeedEntry, Post
+
+class Command(BaseCommand):
+    help = 'Write home feed entries for existing posts (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Only posts from the last N days')
+        parser.add_argument('--sources', type=str, help='Comma separated feed sources (default: TIMELINE_FEED_SOURCES)')
+        parser.add_argument('--batch-size', type=int, default=FANOUT_BATCH_SIZE, help='Feed entries per bulk insert')
+        parser.add_argument('--rebuild', action='store_true', help='Delete existing feed entries of the selected posts first')
+
+    def handle(self, *args, **options):
+        sources = feed_sources()
+        if options['sources']:
+            sources = tuple(s.strip() for s in options['sources'].split(',') if s.strip())
+        if not sources:
+            raise CommandError('Fan-out is disabled: set TIMELINE_FEED_SOURCES or pass --sources')
+        unknown = [s for s in sources if s != 'kota' and s not in INTEREST_SOURCES]
+        if unknown:
+            raise CommandError(f'Unknown feed source: {", ".join(unknown)}')
+
+        posts = Post.objects.all()
+        if options['days']:
+            posts = posts.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        if options['rebuild']:
+            deleted, _ = FeedEntry.objects.filter(post__in=posts).delete()
+            self.stdout.write(f'Deleted {deleted} feed entries')
+
+        post_count, entry_count = backfill(posts, sources, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Fanned out {post_count} posts ({entry_count} entries, sources: {", ".join(sources)})'
+        ))
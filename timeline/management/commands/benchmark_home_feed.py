@@ -0,0 +1,76 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from souline.benchmark import BenchmarkCommand
+from timeline.fanout import backfill, read_home_feed, scan_home_feed
+from timeline.feed import paginate
+from timeline.models import Post
+from users.models import KOTA_CHOICES, UserProfile
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare home feed reads (fan-out entries) with scanning the Post table, on synthetic data that is rolled back'
+
+    def add_arguments(self, parser):
+        # Fan-out menulis sekitar users / jumlah kota entry per post; default
+        # ini (~200k entry) selesai dalam waktu kurang dari satu menit
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--reads', type=int, default=50, help='Feed pages read per approach')
+        parser.add_argument('--limit', type=int, default=20)
+
+    def timed(self, label, reads, fn):
+        start = time.perf_counter()
+        for _ in range(reads):
+            fn()
+        elapsed = (time.perf_counter() - start) / reads * 1000
+        self.stdout.write(f'{label:<32} {elapsed:8.2f} ms/page')
+        return elapsed
+
+    def run(self, options):
+        rng = random.Random(42)
+        kotas = [kota for kota, _ in KOTA_CHOICES]
+
+        start = time.perf_counter()
+        users = User.objects.bulk_create(
+            [User(username=f'{self.prefix}_{i}', password='!') for i in range(options['users'])], batch_size=500
+        )
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, kota=rng.choice(kotas)) for user in users], batch_size=500
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            [
+                Post(author=rng.choice(users), text=f'Benchmark {i}', created_at=now - timedelta(seconds=i))
+                for i in range(options['posts'])
+            ],
+            batch_size=1000,
+        )
+        self.stdout.write(f'Seeded {len(users)} users, {options["posts"]} posts in {time.perf_counter() - start:.1f}s')
+
+        start = time.perf_counter()
+        _, entries = backfill(Post.objects.filter(author__in=users), ('kota',))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'Fan-out: {entries} entries in {elapsed:.1f}s ({elapsed / options["posts"] * 1000:.2f} ms/post)'
+        )
+
+        reader = rng.choice(users)
+        limit = options['limit']
+        reads = options['reads']
+
+        global_ms = self.timed('global scan', reads, lambda: list(
+            paginate(Post.objects.select_related('author'), None, limit)
+        ))
+        scan_ms = self.timed('same-kota scan (join + sort)', reads, lambda: list(
+            scan_home_feed(reader, cursor=None, limit=limit)
+        ))
+        feed_ms = self.timed('home feed (fan-out)', reads, lambda: list(
+            read_home_feed(reader, cursor=None, limit=limit)
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'home feed vs same-kota scan: {scan_ms / feed_ms:.1f}x, vs global scan: {global_ms / feed_ms:.1f}x'
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from timeline.fanout import drain
+
+class Command(BaseCommand):
+    help = 'Write home feed entries for posts waiting in the fan-out queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help='Keep polling the queue instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --watch')
+        parser.add_argument('--limit', type=int, help='Process at most N jobs per pass')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = drain(options['limit'])
+            if processed or not options['watch']:
+                self.stdout.write(self.style.SUCCESS(f'Fanned out {processed} posts'))
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from timeline.ingest import drain, recover_stale
+from timeline.uploads import cleanup_stale_uploads
+
+class Command(BaseCommand):
+    help = 'Re-encode pending timeline image uploads from the local ingestion queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help='Keep polling the queue instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --watch')
+        parser.add_argument('--limit', type=int, help='Process at most N jobs per pass')
+        parser.add_argument('--recover-after', type=float, default=600, help='Requeue jobs stuck in processing/ for longer than N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            recovered = recover_stale(options['recover_after'])
+            if recovered:
+                self.stdout.write(self.style.WARNING(f'Requeued {recovered} stale jobs'))
+            abandoned = cleanup_stale_uploads()
+            if abandoned:
+                self.stdout.write(f'Removed {abandoned} abandoned resumable uploads')
+
+            ok, failed = drain(options['limit'])
+            if ok or failed or not options['watch']:
+                self.stdout.write(self.style.SUCCESS(f'Processed {ok} images'))
+                if failed:
+                    self.stdout.write(self.style.WARNING(f'Failed: {failed} images (kept in failed/)'))
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
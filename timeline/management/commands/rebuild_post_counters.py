@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from timeline.counters import rebuild_counters
+
+class Command(BaseCommand):
+    help = 'Recompute Post.like_count and Post.comment_count from the likes and comments tables'
+
+    def handle(self, *args, **options):
+        updated = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {updated} posts'))
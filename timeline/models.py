@@ -2,6 +2,7 @@ from django.db import models
 
 # Create your models here.
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from django.utils import timezone
 from resources.models import Resource
@@ -13,24 +14,45 @@ from django.contrib.auth.models import User
 # User = settings.AUTH_USER_MODEL
 
 class Post(models.Model):
+    IMAGE_NONE = 'none'
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_NONE, 'No image'),
+        (IMAGE_PENDING, 'Processing'),
+        (IMAGE_READY, 'Ready'),
+        (IMAGE_FAILED, 'Failed'),
+    ]
+
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     text = models.TextField(blank=True)
     image = models.ImageField(upload_to='timeline_images/', blank=True, null=True)
+    # Diisi worker timeline.ingest setelah upload di-encode ulang
+    image_webp = models.ImageField(upload_to='timeline_images/webp/', blank=True, null=True)
+    image_placeholder = models.CharField(max_length=64, blank=True)
+    image_status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default=IMAGE_NONE)
     resource = models.ForeignKey(Resource, on_delete=models.SET_NULL, null=True, blank=True, related_name='posts')
     sportswear = models.ForeignKey(SportswearBrand, on_delete=models.SET_NULL, null=True, blank=True, related_name='posts')
     likes = models.ManyToManyField(User, related_name='liked_posts', blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # Bagian dari key cache kartu post (timeline.cards); ikut diperbarui saat komentar berubah
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalisasi jumlah like/comment, dijaga oleh timeline.counters
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    bookmarks = GenericRelation('bookmarks.Bookmark')
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Dipakai keyset pagination di timeline.feed
+            models.Index(fields=['-created_at', '-id'], name='timeline_post_feed_idx'),
+        ]
 
     def __str__(self):
         return f'Post {self.pk} by {self.author}'
 
-    @property
-    def like_count(self):
-        return self.likes.count()
-
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_comments')
@@ -39,6 +61,48 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Preview komentar di feed dan pager get_post_comments
+            models.Index(fields=['post', '-created_at', '-id'], name='timeline_comment_post_idx'),
+        ]
 
     def __str__(self):
         return f'Comment {self.pk} on Post {self.post.pk}'
+
+
+class FeedEntry(models.Model):
+    """Satu baris home feed milik `user`, diisi saat post dibuat (timeline.fanout)."""
+    SOURCE_CHOICES = [
+        ('author', 'Author'),
+        ('kota', 'Same city'),
+        ('resource', 'Bookmarked resource'),
+        ('sportswear', 'Bookmarked sportswear'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_entries')
+    # Salinan Post.created_at supaya feed bisa dibaca dari index ini saja
+    created_at = models.DateTimeField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'], name='timeline_feedentry_user_post'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='timeline_feedentry_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f'Post {self.post_id} in feed of {self.user_id}'
+
+
+class FanoutJob(models.Model):
+    """Fan-out post yang menunggu ditulis ke home feed, di luar request (timeline.fanout)."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    # Source dipisah koma, mis. 'kota' atau 'resource,sportswear'
+    sources = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'Fan-out of Post {self.post_id} ({self.sources or "author"})'
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from timeline.fanout import INTEREST_SOURCES, attachment_sources, enqueue, fanout_enabled, feed_sources
+from timeline.models import Post
+
+
+@receiver(pre_save, sender=Post)
+def remember_attachments(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Attachment bisa dipasang setelah create (create_post_api). Nilai lama
+    # diambil dari DB hanya jika ada source attachment yang aktif dan field
+    # attachment ikut disimpan
+    instance._attachments_before = None
+    sources = attachment_sources()
+    if raw or instance.pk is None or not sources:
+        return
+    fields = [INTEREST_SOURCES[source][0] for source in sources]
+    names = {name for field in fields for name in (field, field.removesuffix('_id'))}
+    if update_fields is not None and not names & set(update_fields):
+        return
+    values = Post.objects.filter(pk=instance.pk).values_list(*fields).first()
+    if values is not None:
+        instance._attachments_before = dict(zip(sources, values))
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    if raw or not fanout_enabled():
+        return
+    if created:
+        enqueue(instance, feed_sources())
+        return
+
+    # Audience dari bookmark hanya ditambahkan saat attachment-nya berubah
+    before = getattr(instance, '_attachments_before', None)
+    if not before:
+        return
+    changed = [
+        source for source, old in before.items()
+        if getattr(instance, INTEREST_SOURCES[source][0]) not in (None, old)
+    ]
+    if changed:
+        enqueue(instance, changed)
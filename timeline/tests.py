@@ -1,10 +1,37 @@
 from django.test import TestCase
 
 # Create your tests here.
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
-from .models import Post, Comment
+import base64
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from io import BytesIO, StringIO
+from unittest import mock
+from . import counters
+from .feed import InvalidCursor, decode_cursor, encode_cursor, liked_post_ids, paginate
+from bookmarks.models import Bookmark
+from django.contrib.contenttypes.models import ContentType
+from resources.models import Resource
+from sportswear.models import SportswearBrand
+from users.models import UserProfile
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from . import ingest, uploads
+from .fanout import backfill, drain, read_home_feed
+from .models import FanoutJob, FeedEntry, Post, Comment
 
 
 class TimelineTests(TestCase):
@@ -97,3 +124,819 @@ class TimelineTests(TestCase):
         response = self.client.get(reverse('timeline:list'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Hello world!")
+
+
+class TimelineFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123')
+        base = timezone.now()
+        # Beberapa post memakai created_at yang sama untuk menguji tie-breaker id
+        self.posts = [
+            Post.objects.create(author=self.user, text=f'Post {i}', created_at=base - timedelta(minutes=i // 2))
+            for i in range(25)
+        ]
+
+    def _walk(self, limit):
+        seen, cursor = [], None
+        while True:
+            page = paginate(Post.objects.all(), cursor, limit)
+            seen.extend(p.pk for p in page)
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_walk_returns_every_post_once_in_order(self):
+        expected = [p.pk for p in Post.objects.order_by('-created_at', '-id')]
+        self.assertEqual(self._walk(7), expected)
+        self.assertEqual(len(expected), 25)
+
+    def test_new_posts_do_not_shift_pages(self):
+        first = paginate(Post.objects.all(), None, 10)
+        Post.objects.create(author=self.user, text='Brand new')
+        second = paginate(Post.objects.all(), first.next_cursor, 10)
+        self.assertFalse(set(p.pk for p in first) & set(p.pk for p in second))
+        self.assertNotIn('Brand new', [p.text for p in second])
+
+    def test_cursor_round_trip_and_invalid(self):
+        post = self.posts[3]
+        self.assertEqual(decode_cursor(encode_cursor(post.created_at, post.pk)), (post.created_at, post.pk))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor')
+
+    def test_deep_page_query_count_constant(self):
+        cursor = paginate(Post.objects.all(), None, 20).next_cursor
+        with self.assertNumQueries(1):
+            paginate(Post.objects.all(), cursor, 3)
+
+    def test_timeline_json_follows_next(self):
+        url = reverse('timeline:api_timeline')
+        ids, next_url = [], ''
+        while next_url is not None:
+            data = self.client.get(url + next_url).json()
+            ids.extend(r['id'] for r in data['results'])
+            next_url = data['next']
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+
+    def test_timeline_json_invalid_cursor(self):
+        response = self.client.get(reverse('timeline:api_timeline'), {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_timeline_json_legacy_page(self):
+        url = reverse('timeline:api_timeline')
+        expected = [p.pk for p in Post.objects.order_by('-created_at', '-id')]
+        for page in (1, 2, 3):
+            data = self.client.get(url, {'page': page}).json()
+            self.assertEqual([r['id'] for r in data['results']], expected[(page - 1) * 10:page * 10])
+        self.assertIsNone(data['next'])
+        self.assertEqual(self.client.get(url, {'page': 9}).json()['results'], [])
+        self.assertEqual(self.client.get(url, {'page': 'x'}).status_code, 400)
+
+    def test_timeline_list_uses_cursor(self):
+        response = self.client.get(reverse('timeline:list'))
+        self.assertContains(response, 'Post 0')
+        self.assertContains(response, '?cursor=')
+        response = self.client.get(reverse('timeline:list'), {'cursor': response.context['posts'].next_cursor})
+        self.assertContains(response, 'Post 10')
+        self.assertNotContains(response, '>Post 0<')
+
+
+class PostCounterTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        self.bob = User.objects.create_user(username='bob', password='password456')
+        self.post = Post.objects.create(author=self.alice, text='Counted')
+        self.client.login(username='alice', password='password123')
+
+    def _counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.comment_count
+
+    def test_toggle_like_updates_counter(self):
+        response = self.client.post(reverse('timeline:like', args=[self.post.pk]))
+        self.assertEqual(response.json()['like_count'], 1)
+        response = self.client.post(reverse('timeline:like_post_api', args=[self.post.pk]))
+        self.assertEqual(response.json()['message'], 'Unliked')
+        self.assertEqual(self._counts(), (0, 0))
+
+    def test_like_counter_counts_distinct_users(self):
+        counters.toggle_like(self.post, self.alice)
+        counters.toggle_like(self.post, self.bob)
+        self.assertEqual(self._counts(), (2, 0))
+        self.assertEqual(self.post.likes.count(), 2)
+
+    def test_comment_views_update_counter(self):
+        self.client.post(reverse('timeline:add_comment', args=[self.post.pk]), {'text': 'one'})
+        self.client.post(
+            reverse('timeline:add_comment_api', args=[self.post.pk]),
+            data=json.dumps({'content': 'two'}), content_type='application/json',
+        )
+        self.assertEqual(self._counts(), (0, 2))
+
+        comment = Comment.objects.get(text='one')
+        self.client.post(reverse('timeline:delete_comment_api', args=[comment.pk]))
+        self.assertEqual(self._counts(), (0, 1))
+
+    def test_edit_does_not_overwrite_counters(self):
+        stale = Post.objects.get(pk=self.post.pk)
+        counters.toggle_like(self.post, self.bob)
+        stale.text = 'Edited'
+        stale.save(update_fields=['text'])
+        self.client.post(reverse('timeline:edit', args=[self.post.pk]), {'text': 'Edited again'})
+        self.assertEqual(self._counts(), (1, 0))
+
+    def test_decrement_from_drifted_zero_is_clamped(self):
+        comment = counters.add_comment(self.post, self.bob, 'hi')
+        counters.toggle_like(self.post, self.bob)
+        Post.objects.filter(pk=self.post.pk).update(like_count=0, comment_count=0)
+        counters.delete_comment(comment)
+        counters.toggle_like(self.post, self.bob)
+        self.assertEqual(self._counts(), (0, 0))
+
+    def test_rebuild_command_fixes_drift(self):
+        counters.toggle_like(self.post, self.bob)
+        counters.add_comment(self.post, self.bob, 'hi')
+        Post.objects.filter(pk=self.post.pk).update(like_count=7, comment_count=0)
+        other = Post.objects.create(author=self.bob, text='Empty', like_count=3)
+
+        out = StringIO()
+        call_command('rebuild_post_counters', stdout=out)
+        self.assertIn('Rebuilt counters for 2 posts', out.getvalue())
+        self.assertEqual(self._counts(), (1, 1))
+        other.refresh_from_db()
+        self.assertEqual((other.like_count, other.comment_count), (0, 0))
+
+    def test_feed_serialization_has_no_per_post_count_queries(self):
+        for i in range(5):
+            post = Post.objects.create(author=self.bob, text=f'Post {i}')
+            counters.add_comment(post, self.alice, 'c')
+            counters.toggle_like(post, self.alice)
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(reverse('timeline:api_timeline')).json()
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()])
+        counted = {r['id']: (r['like_count'], r['comment_count']) for r in data['results']}
+        self.assertEqual(counted[post.pk], (1, 1))
+
+
+class LikedSetTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        self.posts = [Post.objects.create(author=self.alice, text=f'Post {i}') for i in range(4)]
+        self.client.login(username='alice', password='password123')
+
+    def _add_likers(self, post, n):
+        likers = User.objects.bulk_create([User(username=f'fan{post.pk}_{i}') for i in range(n)])
+        post.likes.add(*likers)
+
+    def test_liked_post_ids_single_query(self):
+        counters.toggle_like(self.posts[1], self.alice)
+        counters.toggle_like(self.posts[3], self.alice)
+        with self.assertNumQueries(1):
+            liked = liked_post_ids(self.alice, self.posts)
+        self.assertEqual(liked, {self.posts[1].pk, self.posts[3].pk})
+
+    def test_liked_post_ids_anonymous(self):
+        from django.contrib.auth.models import AnonymousUser
+        with self.assertNumQueries(0):
+            self.assertEqual(liked_post_ids(AnonymousUser(), self.posts), set())
+
+    def test_feed_liked_by_user(self):
+        counters.toggle_like(self.posts[2], self.alice)
+        results = self.client.get(reverse('timeline:api_timeline')).json()['results']
+        liked = {r['id'] for r in results if r['liked_by_user']}
+        self.assertEqual(liked, {self.posts[2].pk})
+
+    def test_feed_queries_do_not_depend_on_likers(self):
+        url = reverse('timeline:api_timeline')
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+        self._add_likers(self.posts[0], 50)
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(url)
+        self.assertEqual(len(after), len(before))
+        self.assertFalse([q for q in after.captured_queries if 'auth_user' in q['sql'] and 'likes' in q['sql']])
+
+    def test_timeline_list_marks_liked_posts(self):
+        counters.toggle_like(self.posts[0], self.alice)
+        response = self.client.get(reverse('timeline:list'))
+        self.assertContains(response, '❤️', count=1)
+
+
+class CommentPreviewTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        base = timezone.now()
+        self.busy = Post.objects.create(author=self.alice, text='Viral', created_at=base)
+        self.quiet = Post.objects.create(author=self.alice, text='Quiet', created_at=base - timedelta(minutes=1))
+        self.comments = [
+            Comment.objects.create(post=self.busy, author=self.alice, text=f'c{i}', created_at=base + timedelta(seconds=i))
+            for i in range(12)
+        ]
+        Comment.objects.create(post=self.quiet, author=self.alice, text='only one')
+
+    def test_feed_embeds_latest_comments_only(self):
+        results = self.client.get(reverse('timeline:api_timeline')).json()['results']
+        by_id = {r['id']: r for r in results}
+        busy = by_id[self.busy.pk]
+        self.assertEqual([c['content'] for c in busy['comments']], ['c11', 'c10', 'c9'])
+        self.assertEqual([c['content'] for c in by_id[self.quiet.pk]['comments']], ['only one'])
+
+    def test_feed_comment_queries_independent_of_post_count(self):
+        url = reverse('timeline:api_timeline')
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+        for i in range(5):
+            post = Post.objects.create(author=self.alice, text=f'More {i}')
+            Comment.objects.create(post=post, author=self.alice, text='x')
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(url)
+        self.assertEqual(len(after), len(before))
+
+    def test_comment_pager_walks_all_comments(self):
+        url = reverse('timeline:get_post_comments', args=[self.busy.pk])
+        seen, next_url = [], '?limit=5'
+        while next_url is not None:
+            with self.assertNumQueries(1):
+                data = self.client.get(url + next_url).json()
+            seen.extend(c['content'] for c in data['results'])
+            next_url = data['next']
+        self.assertEqual(seen, [f'c{i}' for i in reversed(range(12))])
+
+    def test_comments_without_paging_params_stay_a_list(self):
+        url = reverse('timeline:get_post_comments', args=[self.busy.pk])
+        with self.assertNumQueries(1):
+            data = self.client.get(url).json()
+        self.assertEqual([c['content'] for c in data], [f'c{i}' for i in reversed(range(12))])
+
+    def test_comment_pager_invalid_cursor(self):
+        url = reverse('timeline:get_post_comments', args=[self.busy.pk])
+        self.assertEqual(self.client.get(url, {'cursor': '!!!'}).status_code, 400)
+
+
+class ShowJsonExportTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        self.bob = User.objects.create_user(username='bob', password='password456')
+        for i in range(250):
+            Post.objects.create(author=self.alice if i % 2 else self.bob, text=f'Post {i} "quoted"')
+
+    def _body(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_json_array_matches_posts(self):
+        response = self.client.get(reverse('timeline:show_json'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = json.loads(self._body(response))
+        self.assertEqual(len(data), 250)
+        self.assertEqual(data[0]['text'], 'Post 249 "quoted"')
+        self.assertEqual({d['username'] for d in data}, {'alice', 'bob'})
+
+    def test_empty_export_is_valid_json(self):
+        Post.objects.all().delete()
+        self.assertEqual(json.loads(self._body(self.client.get(reverse('timeline:show_json')))), [])
+
+    def test_ndjson(self):
+        response = self.client.get(reverse('timeline:show_json'), {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self._body(response).splitlines()
+        self.assertEqual(len(lines), 250)
+        self.assertEqual(json.loads(lines[-1])['text'], 'Post 0 "quoted"')
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(reverse('timeline:show_json'), {'format': 'xml'}).status_code, 400)
+
+    def test_export_is_single_query(self):
+        response = self.client.get(reverse('timeline:show_json'))
+        with self.assertNumQueries(1):
+            self._body(response)
+
+
+@override_settings(TIMELINE_FANOUT_MODE='sync', TIMELINE_FEED_SOURCES=('kota',))
+class HomeFeedTests(TestCase):
+    def setUp(self):
+        self.alice = self._user('alice', 'Jakarta')
+        self.bob = self._user('bob', 'Jakarta')
+        self.carol = self._user('carol', 'Bogor')
+        self.dave = self._user('dave', None)
+
+    def _user(self, username, kota):
+        user = User.objects.create_user(username=username, password='password123')
+        UserProfile.objects.create(user=user, kota=kota)
+        return user
+
+    def _feed_ids(self, user):
+        return set(FeedEntry.objects.filter(user=user).values_list('post_id', flat=True))
+
+    def test_create_fans_out_to_same_kota(self):
+        post = Post.objects.create(author=self.alice, text='Halo Jakarta')
+        self.assertIn(post.pk, self._feed_ids(self.alice))
+        self.assertIn(post.pk, self._feed_ids(self.bob))
+        self.assertNotIn(post.pk, self._feed_ids(self.carol))
+        self.assertNotIn(post.pk, self._feed_ids(self.dave))
+
+    def test_author_without_kota_sees_own_post(self):
+        post = Post.objects.create(author=self.dave, text='Mine')
+        self.assertEqual(list(FeedEntry.objects.filter(post=post).values_list('user_id', flat=True)), [self.dave.pk])
+
+    @override_settings(TIMELINE_FEED_SOURCES=('kota', 'resource'))
+    def test_resource_bookmarks_are_optional_source(self):
+        resource = Resource.objects.create(title='Core flow')
+        Bookmark.objects.create(
+            user=self.carol, content_type=ContentType.objects.get_for_model(Resource), object_id=str(resource.pk)
+        )
+        # Seperti create_post_api: attachment dipasang setelah create
+        post = Post.objects.create(author=self.alice, text='Try this')
+        self.assertNotIn(post.pk, self._feed_ids(self.carol))
+        post.resource_id = resource.pk
+        post.save()
+        entry = FeedEntry.objects.get(user=self.carol, post=post)
+        self.assertEqual(entry.source, 'resource')
+
+    def test_resource_source_disabled_by_default(self):
+        resource = Resource.objects.create(title='Core flow')
+        Bookmark.objects.create(
+            user=self.carol, content_type=ContentType.objects.get_for_model(Resource), object_id=str(resource.pk)
+        )
+        post = Post.objects.create(author=self.alice, text='Try this', resource=resource)
+        self.assertNotIn(post.pk, self._feed_ids(self.carol))
+
+    def test_read_home_feed_pages_newest_first(self):
+        base = timezone.now()
+        posts = [
+            Post.objects.create(author=self.bob, text=f'P{i}', created_at=base - timedelta(minutes=i))
+            for i in range(7)
+        ]
+        Post.objects.create(author=self.carol, text='Bogor only')
+
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                page = read_home_feed(self.alice, cursor, 3)
+            seen.extend(p.pk for p in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, [p.pk for p in posts])
+
+    def test_backfill_command_is_idempotent(self):
+        Post.objects.create(author=self.alice, text='One')
+        Post.objects.create(author=self.carol, text='Two')
+        FeedEntry.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_home_feeds', stdout=out)
+        self.assertIn('Fanned out 2 posts', out.getvalue())
+        count = FeedEntry.objects.count()
+        self.assertEqual(count, 3)  # alice + bob, carol
+        call_command('backfill_home_feeds', stdout=StringIO())
+        self.assertEqual(FeedEntry.objects.count(), count)
+
+    def test_backfill_matches_live_fan_out(self):
+        for user in (self.alice, self.bob, self.carol, self.dave):
+            Post.objects.create(author=user, text=f'by {user.username}')
+        live = set(FeedEntry.objects.values_list('user_id', 'post_id', 'source'))
+        FeedEntry.objects.all().delete()
+        backfill()
+        self.assertEqual(set(FeedEntry.objects.values_list('user_id', 'post_id', 'source')), live)
+
+    def test_home_feed_endpoint(self):
+        mine = Post.objects.create(author=self.bob, text='Jakarta news')
+        Post.objects.create(author=self.carol, text='Bogor news')
+        self.client.login(username='alice', password='password123')
+        data = self.client.get(reverse('timeline:api_home_feed')).json()
+        self.assertEqual([r['id'] for r in data['results']], [mine.pk])
+        self.assertIsNone(data['next'])
+
+    def test_home_feed_requires_login(self):
+        self.assertEqual(self.client.get(reverse('timeline:api_home_feed')).status_code, 302)
+
+    @override_settings(TIMELINE_FEED_SOURCES=())
+    def test_fan_out_disabled_reads_posts_directly(self):
+        mine = Post.objects.create(author=self.alice, text='Mine')
+        jakarta = Post.objects.create(author=self.bob, text='Jakarta news')
+        Post.objects.create(author=self.carol, text='Bogor news')
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertFalse(FanoutJob.objects.exists())
+        self.client.login(username='alice', password='password123')
+        data = self.client.get(reverse('timeline:api_home_feed')).json()
+        self.assertEqual([r['id'] for r in data['results']], [jakarta.pk, mine.pk])
+        with self.assertRaises(CommandError):
+            call_command('backfill_home_feeds', stdout=StringIO())
+
+
+@override_settings(TIMELINE_FANOUT_MODE='queue', TIMELINE_FEED_SOURCES=('kota',))
+class FanoutQueueTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        UserProfile.objects.create(user=self.alice, kota='Jakarta')
+
+    def _add_neighbours(self, n):
+        start = User.objects.count()
+        users = User.objects.bulk_create([User(username=f'n{start + i}', password='!') for i in range(n)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, kota='Jakarta') for user in users])
+
+    def test_create_only_enqueues(self):
+        self._add_neighbours(3)
+        with self.assertNumQueries(2):
+            post = Post.objects.create(author=self.alice, text='Halo')
+        self.assertFalse(FeedEntry.objects.exists())
+        self._add_neighbours(50)
+        with self.assertNumQueries(2):
+            Post.objects.create(author=self.alice, text='Lagi')
+
+        out = StringIO()
+        call_command('process_fanout_queue', stdout=out)
+        self.assertIn('Fanned out 2 posts', out.getvalue())
+        self.assertEqual(FeedEntry.objects.filter(post=post).count(), 54)
+        self.assertFalse(FanoutJob.objects.exists())
+
+    def test_full_save_without_attachment_change_skips_fan_out(self):
+        post = Post.objects.create(author=self.alice, text='Halo')
+        drain()
+        post.text = 'Edit'
+        with self.assertNumQueries(1):
+            post.save()
+        with override_settings(TIMELINE_FEED_SOURCES=('kota', 'resource')):
+            post.save()
+            post.save(update_fields=['text'])
+        self.assertFalse(FanoutJob.objects.exists())
+
+    @override_settings(TIMELINE_FEED_SOURCES=('kota', 'resource'))
+    def test_attachment_change_enqueues_its_source(self):
+        resource = Resource.objects.create(title='Core flow')
+        post = Post.objects.create(author=self.alice, text='Try this')
+        drain()
+        post.resource = resource
+        post.save()
+        self.assertEqual(list(FanoutJob.objects.values_list('sources', flat=True)), ['resource'])
+        post.save()
+        self.assertEqual(FanoutJob.objects.count(), 1)
+
+
+class PostCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        self.bob = User.objects.create_user(username='bob', password='password456')
+        self.post = Post.objects.create(author=self.alice, text='Cached card')
+        counters.add_comment(self.post, self.bob, 'First!')
+        self.bob_client = Client()
+        self.bob_client.login(username='bob', password='password456')
+        self.client.login(username='alice', password='password123')
+
+    def _list(self, client=None):
+        return (client or self.client).get(reverse('timeline:list')).content.decode()
+
+    def test_warm_cache_skips_comment_queries(self):
+        with CaptureQueriesContext(connection) as cold:
+            self._list()
+        with CaptureQueriesContext(connection) as warm:
+            html = self._list()
+        self.assertLess(len(warm), len(cold))
+        self.assertFalse([q for q in warm.captured_queries if 'timeline_comment' in q['sql']])
+        self.assertIn('First!', html)
+
+    def test_viewer_parts_are_patched_per_request(self):
+        counters.toggle_like(self.post, self.bob)
+        alice_html = self._list()
+        bob_html = self._list(self.bob_client)
+        anon_html = self._list(Client())
+
+        self.assertIn('edit-btn', alice_html)
+        self.assertNotIn('edit-btn', bob_html)
+        self.assertIn('❤️', bob_html)
+        self.assertNotIn('❤️', alice_html)
+        self.assertIn('comment-form', bob_html)
+        self.assertNotIn('comment-form', anon_html)
+        self.assertNotIn('<!--viewer:', alice_html)
+
+    def test_edit_like_and_comments_invalidate(self):
+        self._list()
+        self.client.post(reverse('timeline:edit', args=[self.post.pk]), {'text': 'Edited card'})
+        self.assertIn('Edited card', self._list())
+
+        self.bob_client.post(reverse('timeline:like', args=[self.post.pk]))
+        self.assertIn('<span class="like-count">1</span>', self._list())
+
+        comment = Comment.objects.get(text='First!')
+        self.bob_client.post(
+            reverse('timeline:edit_comment_api', args=[comment.pk]),
+            data=json.dumps({'content': 'Second thoughts'}), content_type='application/json',
+        )
+        html = self._list()
+        self.assertIn('Second thoughts', html)
+        self.assertNotIn('First!', html)
+
+        # Hapus lalu tambah: comment_count sama, isi kartu tetap harus baru
+        counters.delete_comment(Comment.objects.get(pk=comment.pk))
+        counters.add_comment(self.post, self.bob, 'Replacement')
+        html = self._list()
+        self.assertIn('Replacement', html)
+        self.assertNotIn('Second thoughts', html)
+
+    def test_marker_in_user_text_is_not_patched(self):
+        Post.objects.create(author=self.bob, text='<!--viewer:owner-->')
+        html = self._list()
+        self.assertIn('&lt;!--viewer:owner--&gt;', html)
+
+    def test_detail_variant_has_no_view_link(self):
+        self._list()
+        html = self.client.get(reverse('timeline:detail', args=[self.post.pk])).content.decode()
+        self.assertIn('Cached card', html)
+        self.assertNotIn('View Post', html)
+
+
+def _image_b64(size=(300, 100), fmt='JPEG', orientation=None, color=(200, 40, 40)):
+    buf = BytesIO()
+    image = Image.new('RGB', size, color)
+    kwargs = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        kwargs['exif'] = exif.tobytes()
+    image.save(buf, fmt, **kwargs)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+class IngestTestCase(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.tmp,
+            TIMELINE_INGEST_DIR=Path(self.tmp) / 'ingest',
+            TIMELINE_INGEST_MODE='queue',
+            TIMELINE_IMAGE_MAX_DIMENSION=200,
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='alice', password='password123')
+        self.client.login(username='alice', password='password123')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _queue(self, name):
+        return list(ingest.ingest_dir(name).iterdir())
+
+
+class ImageIngestTests(IngestTestCase):
+    def _create(self, image):
+        return self.client.post(
+            reverse('timeline:create_post_api'),
+            data=json.dumps({'text': 'With photo', 'image': image}), content_type='application/json',
+        )
+
+    def test_create_returns_pending_post(self):
+        response = self._create(_image_b64())
+        self.assertEqual(response.status_code, 200)
+        post = Post.objects.get(pk=response.json()['id'])
+        self.assertEqual(response.json()['image_status'], 'pending')
+        self.assertEqual(post.image_status, Post.IMAGE_PENDING)
+        self.assertFalse(post.image)
+        self.assertEqual(len(self._queue('pending')), 1)
+        self.assertEqual(self._queue('incoming'), [])
+
+    def test_worker_reencodes_strips_exif_and_resizes(self):
+        # Orientation 6: foto landscape yang harus diputar menjadi portrait
+        post_id = self._create(_image_b64(orientation=6)).json()['id']
+        out = StringIO()
+        call_command('process_image_queue', stdout=out)
+        self.assertIn('Processed 1 images', out.getvalue())
+
+        post = Post.objects.get(pk=post_id)
+        self.assertEqual(post.image_status, Post.IMAGE_READY)
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (67, 200))
+            self.assertEqual(dict(image.getexif()), {})
+        with Image.open(post.image_webp.path) as image:
+            self.assertEqual(image.format, 'WEBP')
+        self.assertEqual(len(post.image_placeholder), 28)
+        self.assertEqual(self._queue('pending') + self._queue('processing'), [])
+
+        feed = self.client.get(reverse('timeline:api_timeline')).json()['results'][0]
+        self.assertEqual(feed['image_status'], 'ready')
+        self.assertTrue(feed['image_webp'].endswith('.webp'))
+
+    def test_rejects_invalid_uploads_without_creating_post(self):
+        for payload in ('not base64!!', base64.b64encode(b'plain text, not an image').decode()):
+            response = self._create(payload)
+            self.assertEqual(response.status_code, 400)
+        with override_settings(TIMELINE_IMAGE_MAX_BYTES=100):
+            self.assertEqual(self._create(_image_b64()).status_code, 400)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self._queue('incoming'), [])
+
+    def test_corrupt_image_marks_post_failed(self):
+        buf = BytesIO()
+        Image.new('RGB', (400, 400), (1, 2, 3)).save(buf, 'PNG')
+        truncated = base64.b64encode(buf.getvalue()[:200]).decode()
+        post_id = self._create(truncated).json()['id']
+
+        call_command('process_image_queue', stdout=StringIO())
+        self.assertEqual(Post.objects.get(pk=post_id).image_status, Post.IMAGE_FAILED)
+        self.assertEqual(len(self._queue('failed')), 1)
+
+    def test_sync_mode_processes_in_request(self):
+        with override_settings(TIMELINE_INGEST_MODE='sync'):
+            post_id = self._create(_image_b64(fmt='PNG')).json()['id']
+        self.assertEqual(Post.objects.get(pk=post_id).image_status, Post.IMAGE_READY)
+
+    def test_job_for_deleted_post_is_dropped(self):
+        post_id = self._create(_image_b64()).json()['id']
+        Post.objects.filter(pk=post_id).delete()
+        self.assertEqual(ingest.drain(), (0, 1))
+        self.assertEqual(list(Path(self.tmp, 'timeline_images').glob('*.jpg')), [])
+
+
+class IngestSweepTests(IngestTestCase):
+    def _job(self, queue, post, age):
+        path = ingest.ingest_dir(queue) / f'{post.pk}-{uuid.uuid4().hex}.png'
+        path.write_bytes(_image_bytes())
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_sweep_recovers_jobs_left_by_a_dead_worker(self):
+        stuck, orphan, fresh = (
+            Post.objects.create(author=self.user, text=text, image_status=Post.IMAGE_PENDING)
+            for text in ('stuck', 'orphan', 'fresh')
+        )
+        self._job('processing', stuck, ingest.STALE_AFTER + 10)
+        self._job('pending', orphan, ingest.SWEEP_INTERVAL + 10)
+        self._job('pending', fresh, 0)
+        self.assertEqual(ingest.sweep(), (2, 0))
+        statuses = dict(Post.objects.values_list('text', 'image_status'))
+        self.assertEqual(statuses, {'stuck': Post.IMAGE_READY, 'orphan': Post.IMAGE_READY, 'fresh': Post.IMAGE_PENDING})
+
+    def test_sweep_scheduled_once_per_interval_in_thread_mode(self):
+        pool = mock.Mock()
+        with mock.patch.object(ingest, 'get_pool', return_value=pool), \
+                mock.patch.object(ingest, '_last_sweep', None):
+            ingest.maybe_sweep()
+            with override_settings(TIMELINE_INGEST_MODE='thread'):
+                ingest.maybe_sweep()
+                ingest.maybe_sweep()
+        pool.submit.assert_called_once_with(ingest._sweep_in_thread)
+
+
+def _image_bytes(fmt='PNG', size=(120, 80)):
+    buf = BytesIO()
+    Image.new('RGB', size, (10, 120, 200)).save(buf, fmt)
+    return buf.getvalue()
+
+
+class BinaryUploadTests(IngestTestCase):
+    def _multipart(self, content, name='photo.png', **extra):
+        return self.client.post(reverse('timeline:create_post_upload_api'), {
+            'text': 'Binary upload',
+            'image': SimpleUploadedFile(name, content, content_type='image/png'),
+            **extra,
+        })
+
+    def _start(self, size):
+        return self.client.post(
+            reverse('timeline:start_upload_api'), data=json.dumps({'size': size}), content_type='application/json',
+        )
+
+    def _put(self, upload_id, offset, chunk):
+        return self.client.put(
+            reverse('timeline:upload_chunk_api', args=[upload_id]), data=chunk,
+            content_type='application/octet-stream', headers={'Upload-Offset': str(offset)},
+        )
+
+    def test_multipart_creates_same_pending_post(self):
+        resource = Resource.objects.create(title='Core flow')
+        response = self._multipart(_image_bytes(), attachment=json.dumps({'type': 'Resources', 'id': resource.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'status', 'message', 'id', 'image_status'})
+        post = Post.objects.get(pk=response.json()['id'])
+        self.assertEqual((post.image_status, post.resource_id), (Post.IMAGE_PENDING, resource.pk))
+        self.assertEqual(self._queue('incoming'), [])
+
+        ingest.drain()
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, Post.IMAGE_READY)
+
+    def test_multipart_rejects_large_and_invalid_files(self):
+        with override_settings(TIMELINE_IMAGE_MAX_BYTES=100):
+            self.assertEqual(self._multipart(_image_bytes()).status_code, 413)
+        self.assertEqual(self._multipart(b'not an image at all').status_code, 400)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self._queue('incoming'), [])
+
+    def test_resumable_upload(self):
+        data = _image_bytes(size=(400, 300))
+        state = self._start(len(data)).json()
+        upload_id, half = state['upload_id'], len(data) // 2
+        self.assertEqual(state['offset'], 0)
+
+        self.assertEqual(self._put(upload_id, 0, data[:half]).json()['offset'], half)
+        # Chunk dikirim ulang setelah koneksi putus: tidak menggandakan data
+        self.assertEqual(self._put(upload_id, 0, data[:half]).json()['offset'], half)
+        skipped = self._put(upload_id, half + 10, data[half + 10:])
+        self.assertEqual((skipped.status_code, skipped.json()['offset']), (409, half))
+
+        status = self.client.get(reverse('timeline:upload_chunk_api', args=[upload_id])).json()
+        self.assertEqual((status['offset'], status['complete']), (half, False))
+        self.assertTrue(self._put(upload_id, half, data[half:]).json()['complete'])
+
+        response = self.client.post(
+            reverse('timeline:create_post_api'),
+            data=json.dumps({'text': 'Resumed', 'upload_id': upload_id}), content_type='application/json',
+        )
+        self.assertEqual(response.json()['image_status'], 'pending')
+        ingest.drain()
+        post = Post.objects.get(pk=response.json()['id'])
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (200, 150))
+
+    def test_resumable_upload_errors(self):
+        self.assertEqual(self._start(0).status_code, 400)
+        with override_settings(TIMELINE_IMAGE_MAX_BYTES=100):
+            self.assertEqual(self._start(1000).status_code, 413)
+
+        data = _image_bytes()
+        upload_id = self._start(len(data)).json()['upload_id']
+        self._put(upload_id, 0, data[:10])
+        create = lambda: self.client.post(
+            reverse('timeline:create_post_api'),
+            data=json.dumps({'upload_id': upload_id}), content_type='application/json',
+        )
+        self.assertEqual(create().status_code, 409)
+
+        other = Client()
+        User.objects.create_user(username='mallory', password='password123')
+        other.login(username='mallory', password='password123')
+        self.assertEqual(other.get(reverse('timeline:upload_chunk_api', args=[upload_id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('timeline:upload_chunk_api', args=['not-an-upload'])).status_code, 404)
+        self.assertEqual(self._put(upload_id, 10, b'x' * len(data)).status_code, 400)
+        self.assertFalse(Post.objects.exists())
+
+    def test_cleanup_stale_uploads(self):
+        self._start(100)
+        self.assertEqual(uploads.cleanup_stale_uploads(older_than=3600), 0)
+        self.assertEqual(uploads.cleanup_stale_uploads(older_than=-1), 1)
+        self.assertEqual(self._queue('uploads'), [])
+
+
+class FeedAttachmentTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123')
+        self.client.login(username='alice', password='password123')
+
+    def _seed(self, n):
+        for i in range(n):
+            resource = Resource.objects.create(title=f'Flow {i}', youtube_url=f'https://youtu.be/vid{i}')
+            brand = SportswearBrand.objects.create(
+                brand_name=f'Brand {i}-{Post.objects.count()}', description='d', link='https://shop.example/b',
+            )
+            Post.objects.create(author=self.alice, text=f'R{i}', resource=resource)
+            Post.objects.create(author=self.alice, text=f'S{i}', sportswear=brand)
+            counters.add_comment(Post.objects.create(author=self.alice, text=f'N{i}'), self.alice, 'hi')
+
+    def _feed_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('timeline:api_timeline'), {'limit': 50})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response.json()['results']
+
+    def test_feed_query_count_is_constant(self):
+        self._seed(2)
+        small, _ = self._feed_queries()
+        self._seed(10)
+        large, results = self._feed_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(results), 36)
+
+    def test_attachment_schema(self):
+        resource = Resource.objects.create(title='Core flow', youtube_url='https://youtu.be/abc')
+        brand = SportswearBrand.objects.create(brand_name='Lulu', description='d', link='https://shop.example/l')
+        Post.objects.create(author=self.alice, text='R', resource=resource)
+        Post.objects.create(author=self.alice, text='S', sportswear=brand)
+        Post.objects.create(author=self.alice, text='N')
+        by_text = {r['text']: r['attachment'] for r in self._feed_queries()[1]}
+
+        self.assertEqual(by_text['R'], {
+            'type': 'Resources', 'id': resource.pk, 'name': 'Core flow',
+            'thumbnail': resource.thumbnail_url, 'link': 'https://youtu.be/abc',
+        })
+        self.assertEqual(by_text['S'], {
+            'type': 'Sportswear', 'id': brand.pk, 'name': 'Lulu', 'thumbnail': '', 'link': 'https://shop.example/l',
+        })
+        self.assertIsNone(by_text['N'])
+
+    def test_create_post_api_sets_attachment_on_insert(self):
+        brand = SportswearBrand.objects.create(brand_name='Lulu', description='d', link='https://shop.example/l')
+        url = reverse('timeline:create_post_api')
+        for payload, expected in (
+            ({'type': 'Sportswear', 'data': {'id': brand.pk}}, brand.pk),
+            ({'type': 'Sportswear', 'id': 9999}, None),
+            ({'type': 'Unknown', 'id': brand.pk}, None),
+        ):
+            response = self.client.post(
+                url, data=json.dumps({'text': 'x', 'attachment': payload}), content_type='application/json',
+            )
+            self.assertEqual(Post.objects.get(pk=response.json()['id']).sportswear_id, expected)
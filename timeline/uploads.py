@@ -0,0 +1,208 @@
+"""
+Upload gambar timeline dalam bentuk biner, sebagai alternatif base64 JSON.
+
+Dua jalur, keduanya berakhir di antrian timeline.ingest yang sama:
+
+- Multipart: IngestUploadHandler dipasang sebagai upload handler request,
+  sehingga setiap chunk dari parser multipart Django langsung ditulis ke
+  ingest incoming/ (dengan batas ukuran), tanpa salinan di memori atau di
+  FILE_UPLOAD_TEMP_DIR.
+- Resumable: client membuat sesi upload dengan ukuran total, lalu mengirim
+  potongan body mentah dengan header Upload-Offset. Kalau koneksi putus,
+  GET sesi mengembalikan offset yang sudah diterima dan client melanjutkan
+  dari sana. Setelah lengkap, upload_id dipakai saat membuat post.
+"""
+import json
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from . import ingest
+
+# Potongan body yang dibaca dari request per iterasi
+READ_SIZE = 64 * 1024
+# Ukuran potongan yang disarankan ke client, dan batas satu request chunk
+CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+SESSION_MAX_AGE = 24 * 60 * 60
+
+
+class UploadError(ValueError):
+    """Request upload tidak valid; `status` adalah kode HTTP yang disarankan."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class IngestedFile(UploadedFile):
+    """File hasil IngestUploadHandler yang sudah ada di ingest incoming/."""
+
+    def __init__(self, path, name, content_type, size, charset, content_type_extra):
+        super().__init__(open(path, 'rb'), name, content_type, size, charset, content_type_extra)
+        self.path = Path(path)
+
+    def temporary_file_path(self):
+        return str(self.path)
+
+    def to_upload(self):
+        self.close()
+        return ingest.inspect_upload(self.path, self.size)
+
+    def discard(self):
+        self.close()
+        ingest._discard(self.path)
+
+
+class IngestUploadHandler(FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = {}
+        self.path = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.limit = ingest.max_image_bytes()
+        self.size = 0
+        fd, path = tempfile.mkstemp(dir=ingest.ingest_dir('incoming'), suffix='.part')
+        # MultiPartParser menutup `self.file` sendiri saat file di-skip
+        self.file = os.fdopen(fd, 'wb')
+        self.path = Path(path)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.limit:
+            self.errors[self.field_name] = f'Image too large (max {self.limit} bytes)'
+            self._discard()
+            raise SkipFile()
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self.file.close()
+        path, self.path = self.path, None
+        return IngestedFile(path, self.file_name, self.content_type, file_size, self.charset, self.content_type_extra)
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _discard(self):
+        if self.path is not None:
+            self.file.close()
+            ingest._discard(self.path)
+            self.path = None
+
+
+class ResumableUpload:
+    """Sesi upload di ingest uploads/: `<id>.part` berisi data, `<id>.json` metadata."""
+
+    def __init__(self, upload_id, meta):
+        self.upload_id = upload_id
+        self.meta = meta
+        base = ingest.ingest_dir('uploads')
+        self.data_path = base / f'{upload_id}.part'
+        self.meta_path = base / f'{upload_id}.json'
+
+    @classmethod
+    def create(cls, user, size):
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError('size must be a positive integer')
+        if size > ingest.max_image_bytes():
+            raise UploadError(f'Image too large (max {ingest.max_image_bytes()} bytes)', status=413)
+        upload = cls(uuid.uuid4().hex, {'user_id': user.pk, 'size': size, 'created_at': time.time()})
+        upload.data_path.touch()
+        upload.meta_path.write_text(json.dumps(upload.meta), encoding='utf-8')
+        return upload
+
+    @classmethod
+    def load(cls, upload_id, user):
+        """Sesi milik `user`, atau UploadError 404."""
+        if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadError('Upload not found', status=404)
+        upload = cls(upload_id, None)
+        try:
+            upload.meta = json.loads(upload.meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            raise UploadError('Upload not found', status=404)
+        if upload.meta['user_id'] != user.pk:
+            raise UploadError('Upload not found', status=404)
+        return upload
+
+    @property
+    def size(self):
+        return self.meta['size']
+
+    @property
+    def offset(self):
+        try:
+            return self.data_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def complete(self):
+        return self.offset == self.size
+
+    def state(self):
+        return {'upload_id': self.upload_id, 'size': self.size, 'offset': self.offset, 'complete': self.complete}
+
+    def write_chunk(self, offset, stream, length):
+        """
+        Tulis `length` byte dari `stream` mulai `offset`. Offset boleh lebih
+        kecil dari yang sudah diterima (chunk terakhir dikirim ulang), tapi
+        tidak boleh melompat.
+        """
+        received = self.offset
+        if offset > received:
+            raise UploadError(f'Expected offset {received}', status=409)
+        if length > MAX_CHUNK_SIZE:
+            raise UploadError(f'Chunk too large (max {MAX_CHUNK_SIZE} bytes)', status=413)
+        if offset + length > self.size:
+            raise UploadError('Chunk exceeds declared upload size')
+
+        written = 0
+        with open(self.data_path, 'r+b') as f:
+            f.seek(offset)
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+            # Potongan yang terputus di tengah dibuang supaya offset tetap benar
+            f.truncate(max(received, offset + written))
+        return self.offset
+
+    def finish(self):
+        """Serahkan data yang sudah lengkap ke ingest sebagai Upload."""
+        if not self.complete:
+            raise UploadError(f'Upload incomplete ({self.offset}/{self.size} bytes)', status=409)
+        target = ingest.ingest_dir('incoming') / f'{self.upload_id}.part'
+        os.replace(self.data_path, target)
+        self.meta_path.unlink(missing_ok=True)
+        try:
+            return ingest.inspect_upload(target, self.size)
+        except ingest.InvalidImage as e:
+            raise UploadError(str(e)) from e
+
+
+def cleanup_stale_uploads(older_than=SESSION_MAX_AGE):
+    """Hapus sesi resumable yang ditinggalkan client. Mengembalikan jumlahnya."""
+    cutoff = time.time() - older_than
+    removed = 0
+    for meta_path in ingest.ingest_dir('uploads').glob('*.json'):
+        data_path = meta_path.with_suffix('.part')
+        try:
+            last_touch = max(meta_path.stat().st_mtime, data_path.stat().st_mtime if data_path.exists() else 0)
+        except FileNotFoundError:
+            continue
+        if last_touch < cutoff:
+            data_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -15,8 +15,12 @@ urlpatterns = [
 
 
     path('api/timeline/', views.timeline_json, name='api_timeline'),
+    path('api/timeline/home/', views.home_feed_json, name='api_home_feed'),
     path('is-admin', views.is_admin, name='is_admin'),
     path('api/create_post/', views.create_post_api, name='create_post_api'),
+    path('api/create_post/upload/', views.create_post_upload_api, name='create_post_upload_api'),
+    path('api/uploads/', views.start_upload_api, name='start_upload_api'),
+    path('api/uploads/<str:upload_id>/', views.upload_chunk_api, name='upload_chunk_api'),
     path('api/post/<int:pk>/edit/', views.edit_post_api, name='edit_post_api'),
     path('api/post/<int:pk>/delete/', views.delete_post_api, name='delete_post_api'),    
     path('api/post/<int:pk>/like/', views.toggle_like_api, name='like_post_api'),
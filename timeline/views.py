@@ -1,23 +1,28 @@
-import json, base64
-from django.core.files.base import ContentFile
+import json
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseForbidden
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
-from django.template.loader import render_to_string
+from . import attachments, cards, counters, ingest, uploads
+from .export import streaming_export
+from .fanout import home_feed
+from .feed import InvalidCursor, cursor_for_page, latest_comments, mark_liked, next_query, paginate, parse_limit
 from .forms import PostForm, CommentForm
-from .models import Post, Comment, Resource, SportswearBrand
+from .models import Post, Comment
 
 def is_admin(user):
     return user.is_superuser or user.is_staff
 
 def timeline_list(request):
-    posts_qs = Post.objects.select_related('author').prefetch_related('likes', 'comments__author').all().order_by('created_at')
-    paginator = Paginator(posts_qs, 10)
-    page = request.GET.get('page', 1)
-    posts = paginator.get_page(page)
+    # Komentar di-prefetch oleh attach_cards hanya untuk kartu yang belum di-cache
+    posts_qs = Post.objects.select_related('author')
+    try:
+        posts = paginate(posts_qs, request.GET.get('cursor'), parse_limit(request.GET.get('limit')))
+    except InvalidCursor:
+        posts = paginate(posts_qs, None, parse_limit(request.GET.get('limit')))
+    mark_liked(request.user, posts.items)
+    cards.attach_cards(posts.items, request)
 
     post_form = PostForm()
     comment_form = CommentForm()
@@ -36,22 +41,18 @@ def create_post(request):
         return JsonResponse({'success': False, 'errors': form.errors}, status=400)
     post = form.save(commit=False)
     post.author = request.user
+    if post.image:
+        post.image_status = Post.IMAGE_READY
     post.save()
 
-    html = render_to_string('_post.html', {'post': post, 'user': request.user}, request=request)
+    html = cards.render_card(post, request)
     return JsonResponse({'success': True, 'html': html})
 
 @login_required
 @require_POST
 def toggle_like(request, pk):
     post = get_object_or_404(Post, pk=pk)
-    user = request.user
-    if user in post.likes.all():
-        post.likes.remove(user)
-        action = 'unliked'
-    else:
-        post.likes.add(user)
-        action = 'liked'
+    action = 'liked' if counters.toggle_like(post, request.user) else 'unliked'
     return JsonResponse({'success': True, 'action': action, 'like_count': post.like_count})
 
 @login_required
@@ -62,7 +63,7 @@ def add_comment(request, pk):
     if not content:
         return JsonResponse({'error': 'empty'}, status=400)
 
-    comment = Comment.objects.create(post=post, author=request.user, text=content)
+    comment = counters.add_comment(post, request.user, content)
     return JsonResponse({
         'id': comment.id,
         'author_username': comment.author.username,
@@ -70,7 +71,9 @@ def add_comment(request, pk):
     }, status=201)
 
 def post_detail(request, pk):
-    post = get_object_or_404(Post.objects.select_related('author').prefetch_related('comments__author', 'likes'), pk=pk)
+    post = get_object_or_404(Post.objects.select_related('author'), pk=pk)
+    mark_liked(request.user, [post])
+    cards.attach_cards([post], request, detail=True)
     comment_form = CommentForm()
     return render(request, 'post_detail.html', {'post': post, 'comment_form': comment_form})
 
@@ -84,8 +87,10 @@ def edit_post(request, pk):
             return JsonResponse({'success': False, 'error': 'empty_text'}, status=400)
 
         post.text = text
-        post.save()
-        html = render_to_string('_post.html', {'post': post, 'user': request.user}, request=request)
+        # update_fields supaya like_count/comment_count yang sudah basi tidak ikut ditulis
+        post.save(update_fields=['text', 'updated_at'])
+        mark_liked(request.user, [post])
+        html = cards.render_card(post, request)
         return JsonResponse({'success': True, 'html': html})
     else:
         return JsonResponse({'success': False, 'error': 'permission_denied'}, status=403)
@@ -101,36 +106,52 @@ def delete_post(request, pk):
         return JsonResponse({'success': False, 'error': 'permission_denied'}, status=403)
 
 def show_json(request):
-    posts = Post.objects.all().order_by('-created_at')
-    data = []
-    for post in posts:
-        data.append({
-            "username": post.author.username,
-            "text": post.text,
-            "image": post.image.url if post.image else "",
-            "created_at": post.created_at.isoformat(),
-        })
-    return JsonResponse(data, safe=False)
+    try:
+        return streaming_export(request.GET.get('format', 'json'))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
 
 
 
 
-def timeline_json(request):
-    page = int(request.GET.get('page', 1))
-    posts_qs = (
+def _feed_queryset():
+    return (
         Post.objects
         .select_related('author')
-        .prefetch_related('comments__author', 'likes') 
-        .order_by('-created_at')
+        .prefetch_related(latest_comments())
     )
 
-    paginator = Paginator(posts_qs, 10)
-    page_obj = paginator.get_page(page)
+def timeline_json(request):
+    limit = parse_limit(request.GET.get('limit'))
+    cursor = request.GET.get('cursor')
+    try:
+        if not cursor and 'page' in request.GET:
+            # ?page= lama masih diterima selama masa transisi; pakai `next`
+            cursor = cursor_for_page(Post.objects.all(), request.GET['page'], limit)
+        page_obj = paginate(_feed_queryset(), cursor, limit)
+    except InvalidCursor:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid cursor or page; follow the `next` query string (cursor) instead of page',
+        }, status=400)
+    return _feed_response(request, page_obj, limit)
 
-    next_url = f"?page={page_obj.next_page_number()}" if page_obj.has_next() else None
+@login_required
+def home_feed_json(request):
+    limit = parse_limit(request.GET.get('limit'))
+    try:
+        page_obj = home_feed(request.user, request.GET.get('cursor'), limit, prefetch=[latest_comments()])
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+    return _feed_response(request, page_obj, limit)
+
+def _feed_response(request, page_obj, limit):
+    next_url = next_query(page_obj, limit)
+    mark_liked(request.user, page_obj.items)
+    attachments.resolve(page_obj.items)
 
     results = []
-    for p in page_obj.object_list:
+    for p in page_obj:
         comments_list = [
             {
                 'id': c.id,
@@ -138,42 +159,23 @@ def timeline_json(request):
                 'content': c.text,
                 'created_at': c.created_at.isoformat(),
             }
-            for c in p.comments.all().order_by('-created_at')
+            for c in p.latest_comments
         ]
 
-        attachment_data = None
-        if p.resource: 
-            attachment_data = {
-                "type": "Resources",
-                "id": p.resource.id,
-                "name": p.resource.title,
-                "thumbnail": p.resource.thumbnail_url if p.resource.thumbnail_url else "",
-                "link": p.resource.youtube_url if p.resource.youtube_url else "",
-            }
-        elif p.sportswear: 
-            attachment_data = {
-                "type": "Sportswear",
-                "id": p.sportswear.id,
-                "name": p.sportswear.brand_name,
-                "thumbnail": p.sportswear.thumbnail_url if p.sportswear.thumbnail_url else "",
-                "link": p.sportswear.link if p.sportswear.link else "",
-            }
-
-        is_liked = False
-        if request.user.is_authenticated:
-            is_liked = request.user in p.likes.all()
-
         results.append({
             'id': p.id,
             'author_username': p.author.username,
             'text': p.text,
             'image': p.image.url if p.image else "",
+            'image_webp': p.image_webp.url if p.image_webp else "",
+            'image_placeholder': p.image_placeholder,
+            'image_status': p.image_status,
             'like_count': p.like_count,
-            'liked_by_user': is_liked,  
-            'comment_count': len(comments_list),
+            'liked_by_user': p.liked_by_user,
+            'comment_count': p.comment_count,
             'comments': comments_list,
             'created_at': p.created_at.isoformat(),
-            'attachment': attachment_data, 
+            'attachment': p.attachment,
             'is_owner': request.user == p.author or request.user.is_superuser or request.user.is_staff,
         })
 
@@ -183,57 +185,114 @@ def timeline_json(request):
         'previous': None,
     })
 
+def _publish_post(request, text, attachment, upload):
+    """Bagian bersama create_post_api dan create_post_upload_api."""
+    post = Post.objects.create(
+        author=request.user,
+        text=text or '',
+        image_status=Post.IMAGE_PENDING if upload else Post.IMAGE_NONE,
+        **attachments.parse(attachment),
+    )
+    if upload:
+        ingest.enqueue(post, upload)
+    return JsonResponse({
+        "status": "success",
+        "message": "Post created successfully!",
+        "id": post.pk,
+        "image_status": post.image_status,
+    })
+
 @csrf_exempt
 @login_required
 @require_POST
 def create_post_api(request):
     try:
         data = json.loads(request.body)
-        text = data.get('text')
-        
-        post = Post.objects.create(
-            author=request.user,
-            text=text or ''
-        )
-
-        image_data = data.get('image')
-        if image_data:
-            try:
-                format, imgstr = None, image_data
-                if ';base64,' in image_data:
-                    format, imgstr = image_data.split(';base64,')
-                
-                ext = format.split('/')[-1] if format else 'jpg'
-
-                data_file = ContentFile(base64.b64decode(imgstr), name=f'{post.id}_image.{ext}')
-                
-                post.image.save(data_file.name, data_file)
-            except Exception as e:
-                print(f"Error saving image: {e}")
-
-        attachment = data.get('attachment')
-        if attachment:
-            atype = attachment.get('type')
-            aid = attachment.get('id')
-            if not aid and 'data' in attachment:
-                aid = attachment['data'].get('id')
-
-            if aid:
-                if atype == 'Resources':
-                    if Resource.objects.filter(id=aid).exists():
-                        post.resource_id = aid
-                elif atype == 'Sportswear':
-                    if SportswearBrand.objects.filter(id=aid).exists():
-                        post.sportswear_id = aid
-        
-        post.save()
-        return JsonResponse({"status": "success", "message": "Post created successfully!"})
+
+        # Gambar hanya divalidasi di sini; encode ulang dikerjakan worker ingest
+        upload = None
+        try:
+            if data.get('upload_id'):
+                upload = uploads.ResumableUpload.load(data['upload_id'], request.user).finish()
+            elif data.get('image'):
+                upload = ingest.decode_base64_upload(data['image'])
+        except uploads.UploadError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=e.status)
+        except ingest.InvalidImage as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+        return _publish_post(request, data.get('text'), data.get('attachment'), upload)
 
     except json.JSONDecodeError:
         return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
+@csrf_exempt
+@login_required
+@require_POST
+def create_post_upload_api(request):
+    """
+    Sama dengan create_post_api tapi multipart/form-data: field `text`,
+    `attachment` (JSON, opsional) dan file `image`.
+    """
+    handler = uploads.IngestUploadHandler(request)
+    request.upload_handlers = [handler]
+
+    image = request.FILES.get('image')
+    if handler.errors:
+        return JsonResponse({'status': 'error', 'message': handler.errors.popitem()[1]}, status=413)
+    try:
+        attachment = json.loads(request.POST['attachment']) if request.POST.get('attachment') else None
+    except json.JSONDecodeError:
+        if image:
+            image.discard()
+        return JsonResponse({'status': 'error', 'message': 'Invalid attachment JSON'}, status=400)
+
+    upload = None
+    if image:
+        try:
+            upload = image.to_upload()
+        except ingest.InvalidImage as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return _publish_post(request, request.POST.get('text'), attachment, upload)
+
+@csrf_exempt
+@login_required
+@require_POST
+def start_upload_api(request):
+    try:
+        data = json.loads(request.body)
+        upload = uploads.ResumableUpload.create(request.user, data.get('size'))
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    except uploads.UploadError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=e.status)
+    return JsonResponse({'status': 'success', 'chunk_size': uploads.CHUNK_SIZE, **upload.state()}, status=201)
+
+@csrf_exempt
+@login_required
+@require_http_methods(['GET', 'PUT', 'POST'])
+def upload_chunk_api(request, upload_id):
+    """GET: offset yang sudah diterima. PUT/POST: body mentah mulai header Upload-Offset."""
+    try:
+        upload = uploads.ResumableUpload.load(upload_id, request.user)
+    except uploads.UploadError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=e.status)
+
+    if request.method != 'GET':
+        try:
+            offset = int(request.headers.get('Upload-Offset', request.GET.get('offset', '')))
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Upload-Offset header is required'}, status=400)
+        try:
+            upload.write_chunk(offset, request, length)
+        except uploads.UploadError as e:
+            # Offset ikut dikirim supaya client tahu harus melanjutkan dari mana
+            return JsonResponse({'status': 'error', 'message': str(e), 'offset': upload.offset}, status=e.status)
+    return JsonResponse({'status': 'success', **upload.state()})
+
 @csrf_exempt
 @login_required
 @require_POST
@@ -249,7 +308,7 @@ def edit_post_api(request, pk):
                 return JsonResponse({'status': 'error', 'message': 'Text cannot be empty'}, status=400)
 
             post.text = text
-            post.save()
+            post.save(update_fields=['text', 'updated_at'])
 
             return JsonResponse({'status': 'success', 'message': 'Post updated successfully'})
 
@@ -275,16 +334,8 @@ def delete_post_api(request, pk):
 @require_POST
 def toggle_like_api(request, pk):
     post = get_object_or_404(Post, pk=pk)
-    user = request.user
-
-    if user in post.likes.all():
-        post.likes.remove(user)
-        message = 'Unliked'
-    else:
-        post.likes.add(user)
-        message = 'Liked'
-
-    return JsonResponse({'status': 'success', 'message': message})
+    message = 'Liked' if counters.toggle_like(post, request.user) else 'Unliked'
+    return JsonResponse({'status': 'success', 'message': message, 'like_count': post.like_count})
 
 @csrf_exempt
 @login_required
@@ -299,11 +350,7 @@ def add_comment_api(request, pk):
         if not content:
             return JsonResponse({'status': 'error', 'message': 'Content cannot be empty'}, status=400)
 
-        comment = Comment.objects.create(
-            post=post,
-            author=request.user,
-            text=content
-        )
+        comment = counters.add_comment(post, request.user, content)
 
         return JsonResponse({
             'status': 'success',
@@ -335,6 +382,7 @@ def edit_comment_api(request, pk):
 
             comment.text = content
             comment.save()
+            cards.invalidate(comment.post_id)
 
             return JsonResponse({'status': 'success', 'message': 'Comment updated successfully'})
 
@@ -350,14 +398,25 @@ def delete_comment_api(request, pk):
     comment = get_object_or_404(Comment, pk=pk)
 
     if comment.author == request.user or is_admin(request.user):
-        comment.delete()
+        counters.delete_comment(comment)
         return JsonResponse({'status': 'success', 'message': 'Comment deleted successfully'})
     else:
         return JsonResponse({'status': 'error', 'message': 'Permission denied'}, status=403)
     
 def get_post_comments(request, post_id):
-    comments = Comment.objects.filter(post_id=post_id).order_by('-created_at')
-    
+    comments = Comment.objects.filter(post_id=post_id).select_related('author')
+
+    # Tanpa ?cursor/?limit tetap list polos seperti sebelumnya (client lama)
+    paged = 'cursor' in request.GET or 'limit' in request.GET
+    if paged:
+        limit = parse_limit(request.GET.get('limit'))
+        try:
+            comments = paginate(comments, request.GET.get('cursor'), limit)
+        except InvalidCursor:
+            return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+    else:
+        comments = comments.order_by('-created_at', '-id')
+
     data = [
         {
             'id': c.id,
@@ -367,5 +426,10 @@ def get_post_comments(request, post_id):
         }
         for c in comments
     ]
-    
-    return JsonResponse(data, safe=False)
\ No newline at end of file
+
+    if not paged:
+        return JsonResponse(data, safe=False)
+    return JsonResponse({
+        'results': data,
+        'next': next_query(comments, limit),
+    })